@@ -17,7 +17,7 @@ from .transaction import Transaction
 from .account import Account
 from .journal_entry import JournalEntry
 from .storage import BaseStorage, InMemoryStorage, SQLStorage
-from .bank_import import import_releve
+from .bank_import import import_releve, iter_releve, importer_releve_par_lots
 from .categorization import (
     categoriser_automatiquement,
     rapport_par_categorie,
@@ -48,6 +48,8 @@ __all__ = [
     "InMemoryStorage",
     "SQLStorage",
     "import_releve",
+    "iter_releve",
+    "importer_releve_par_lots",
     "categoriser_automatiquement",
     "rapport_par_categorie",
     "CATEGORIES_KEYWORDS",
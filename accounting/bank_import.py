@@ -11,18 +11,27 @@ import logging
 import logger_setup  # noqa: F401  # configure logging
 import os
 import unicodedata
-from typing import List
+from typing import Callable, Iterator, List, Sequence, Tuple
+from uuid import uuid4
 
 import pandas as pd
+from openpyxl import load_workbook
 
 from .transaction import Transaction
 from .storage import BaseStorage
-from .categorization import categoriser_automatiquement
+from .categorization import categoriser_libelles
 from .errors import ComptaImportError, ComptaValidationError
 
 
 logger = logging.getLogger(__name__)
 
+# Format essayé en premier pour la colonne date (ISO, colonne entière)
+DATE_FORMAT = "%Y-%m-%d"
+# Lignes lues par lot lors d'un import en flux
+CHUNKSIZE = 50_000
+# Nombre d'erreurs détaillées dans le message d'une ComptaValidationError
+MAX_ERREURS_MESSAGE = 10
+
 
 def _norm(text: str) -> str:
     """Normalise un texte (minuscules, sans accents)."""
@@ -31,29 +40,130 @@ def _norm(text: str) -> str:
     return tmp.lower().strip()
 
 
+def _parse_dates(col: pd.Series, date_format: str | None) -> pd.Series:
+    """Convertit la colonne date d'un bloc, ``NaT`` pour les valeurs invalides.
+
+    Avec *date_format* le format est strict ; sinon les dates ISO sont lues
+    d'un coup et seules les autres passent par la détection de pandas.
+    """
+    if date_format:
+        return pd.to_datetime(col, format=date_format, errors="coerce")
+    dates = pd.to_datetime(col, format=DATE_FORMAT, errors="coerce")
+    retry = dates.isna() & col.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(col[retry].astype(str), format="mixed", errors="coerce")
+    return dates
+
+
+def _valider(df: pd.DataFrame, date_format: str | None = None, lignes: Sequence[int] | None = None):
+    """Valide un relevé aux colonnes normalisées et retourne ses colonnes converties.
+
+    Toutes les lignes sont validées colonne par colonne ; les erreurs sont
+    levées ensemble dans une :class:`ComptaValidationError`. *lignes* donne
+    le numéro de chaque ligne dans le fichier (en-tête = ligne 1), à partir
+    de 2 par défaut. Retourne les dates, les montants et le masque des débits.
+    """
+    dates = _parse_dates(df["date"], date_format)
+    montants = pd.to_numeric(df["montant"], errors="coerce")
+    types_bruts = df["type"].astype(str)
+    types = types_bruts.map({v: _norm(v) for v in types_bruts.unique()})
+    debit = types.str.startswith("debit").to_numpy(dtype=bool)
+    credit = types.str.startswith("credit").to_numpy(dtype=bool)
+
+    lignes = pd.RangeIndex(len(df)) + 2 if lignes is None else pd.Index(lignes)
+    trouvees: List[Tuple[int, str]] = []
+    checks = [
+        (dates.isna(), "Date invalide", df["date"]),
+        (montants.isna(), "Montant invalide", df["montant"]),
+        (montants < 0, "Montant négatif", df["montant"]),
+        (pd.Series(~(debit | credit), index=df.index), "Type invalide", df["type"]),
+    ]
+    for masque, libelle, valeurs in checks:
+        for ligne, valeur in zip(lignes[masque.to_numpy()], valeurs[masque]):
+            trouvees.append((int(ligne), f"Ligne {ligne} : {libelle} : {valeur}"))
+    if trouvees:
+        trouvees.sort(key=lambda e: e[0])
+        erreurs = [e for _, e in trouvees]
+        nb_lignes = len({ligne for ligne, _ in trouvees})
+        logger.error("%d erreur(s) de validation dans le relevé", len(erreurs))
+        msg = "\n".join(erreurs[:MAX_ERREURS_MESSAGE])
+        if len(erreurs) > MAX_ERREURS_MESSAGE:
+            msg += f"\n... et {len(erreurs) - MAX_ERREURS_MESSAGE} autre(s)"
+        raise ComptaValidationError(f"{nb_lignes} ligne(s) invalide(s) :\n{msg}", erreurs)
+    return dates, montants, debit
+
+
+def _transactions(
+    df: pd.DataFrame, date_format: str | None = None, lignes: Sequence[int] | None = None
+) -> List[Transaction]:
+    """Construit les transactions d'un relevé aux colonnes normalisées."""
+    if df.empty:
+        return []
+    dates, montants, debit = _valider(df, date_format, lignes)
+    libelles = df["libelle"].fillna("").astype(str)
+    categories = categoriser_libelles(libelles)
+    ids = [uuid4().hex for _ in range(len(df))]
+    return [
+        Transaction(d, lib, m, debit="BANQUE" if est_debit else "", credit="" if est_debit else "BANQUE",
+                    categorie=cat, id=id_)
+        for d, lib, m, est_debit, cat, id_ in zip(
+            dates.dt.date, libelles, montants.astype(float).tolist(), debit.tolist(), categories, ids
+        )
+    ]
+
+
+def _extension(path: str) -> str:
+    """Retourne l'extension de *path* après avoir vérifié le fichier."""
+    if not os.path.isfile(path):
+        logger.error("Fichier introuvable: %s", path)
+        raise ComptaImportError(f"Fichier introuvable: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".csv", ".xls", ".xlsx"):
+        raise ComptaImportError("Format de fichier non support\u00e9")
+    return ext
+
+
+def _normaliser_colonnes(df: pd.DataFrame) -> pd.DataFrame:
+    """Renomme les colonnes obligatoires (casse et accents ignorés)."""
+    col_map = {_norm(str(c)): c for c in df.columns}
+    required = ["date", "libelle", "montant", "type"]
+    missing = [c for c in required if c not in col_map]
+    if missing:
+        logger.error("Colonnes manquantes: %s", ", ".join(missing))
+        msg = ", ".join(missing)
+        raise ComptaValidationError("Colonnes manquantes : " + msg)
+    return df.rename(columns={col_map[k]: k for k in required})
+
+
+def _enregistrer(storage: BaseStorage, txs: List[Transaction]) -> None:
+    try:
+        storage.add_transactions(txs)
+    except Exception as e:
+        logger.exception("Erreur lors de l'enregistrement: %s", e)
+        msg = f"Erreur lors de l'enregistrement : {e}"
+        raise ComptaImportError(msg) from None
+
+
 def import_releve(
-    path: str, storage: BaseStorage | None = None
+    path: str, storage: BaseStorage | None = None, date_format: str | None = None
 ) -> List[Transaction]:
     """Lit un relevé bancaire et retourne une liste de :class:`Transaction`.
 
     Le fichier peut être au format CSV ou Excel. En option, un objet
     :class:`BaseStorage` peut être passé pour enregistrer automatiquement
-    les transactions importées.
+    les transactions importées, en une seule écriture groupée.
+
+    *date_format* (par ex. ``"%d/%m/%Y"``) impose le format de la colonne
+    date. Les lignes invalides sont toutes signalées dans une même
+    :class:`ComptaValidationError` et rien n'est enregistré.
+
+    Le fichier est lu en entier ; pour les très gros relevés, voir
+    :func:`importer_releve_par_lots`.
     """
     logger.info("D\u00e9but import du fichier %s", path)
+    ext = _extension(path)
     try:
-        if not os.path.isfile(path):
-            raise FileNotFoundError(path)
-        ext = os.path.splitext(path)[1].lower()
-        if ext == ".csv":
-            df = pd.read_csv(path)
-        elif ext in [".xls", ".xlsx"]:
-            df = pd.read_excel(path)
-        else:
-            raise ComptaImportError("Format de fichier non support\u00e9")
-    except FileNotFoundError:
-        logger.exception("Fichier introuvable: %s", path)
-        raise ComptaImportError(f"Fichier introuvable: {path}") from None
+        df = pd.read_csv(path) if ext == ".csv" else pd.read_excel(path)
     except Exception as e:  # lecture/parse errors
         logger.exception("Erreur lors de la lecture du fichier %s", path)
         msg = f"Erreur lors de la lecture du fichier {path} : {e}"
@@ -61,47 +171,141 @@ def import_releve(
 
     logger.info("%d lignes lues depuis %s", len(df), path)
 
-    # normaliser les noms de colonnes
-    col_map = {_norm(c): c for c in df.columns}
-    required = ["date", "libelle", "montant", "type"]
-    missing = [c for c in required if c not in col_map]
-    if missing:
-        logger.error("Colonnes manquantes: %s", ", ".join(missing))
-        msg = ", ".join(missing)
-        raise ComptaValidationError("Colonnes manquantes : " + msg)
-
-    df = df.rename(columns={col_map[k]: k for k in required})
-
-    txs: List[Transaction] = []
-    for _, row in df.iterrows():
-        try:
-            dt = pd.to_datetime(row["date"]).date()
-        except Exception as e:
-            logger.exception("Date invalide %s: %s", row.get("date"), e)
-            msg = f"Date invalide : {row.get('date')}"
-            raise ComptaValidationError(msg) from None
-        desc = str(row["libelle"]) if not pd.isna(row["libelle"]) else ""
-        montant = float(row["montant"])
-        type_val = _norm(str(row["type"]))
-        if type_val.startswith("debit"):
-            tx = Transaction(dt, desc, montant, debit="BANQUE", credit="")
-        elif type_val.startswith("credit"):
-            tx = Transaction(dt, desc, montant, debit="", credit="BANQUE")
-        else:
-            logger.error("Type invalide: %s", row["type"])
-            raise ComptaValidationError(f"Type invalide : {row['type']}")
-        categoriser_automatiquement(tx)
-        txs.append(tx)
-        if storage:
-            try:
-                storage.add_transaction(tx)
-            except Exception as e:
-                logger.exception("Erreur lors de l'enregistrement: %s", e)
-                msg = f"Erreur lors de l'enregistrement : {e}"
-                raise ComptaImportError(msg) from None
+    txs = _transactions(_normaliser_colonnes(df), date_format)
+    if storage:
+        _enregistrer(storage, txs)
     logger.info(
         "Import du fichier %s termine : %d lignes traitees",
         path,
         len(txs),
     )
     return txs
+
+
+def _blocs_csv(path: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    taille = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        with pd.read_csv(f, chunksize=chunksize) as lecteur:
+            for df in lecteur:
+                # La position est en avance d'un tampon : progression approchée
+                yield df.set_axis(df.index + 2), min(f.tell() / taille, 1.0)
+
+
+def _blocs_xlsx(path: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        lignes = ws.iter_rows(values_only=True)
+        entete = next(lignes, None)
+        if entete is None:
+            return
+        total = max((ws.max_row or 0) - 1, 1)
+        bloc: list = []
+        numeros: list = []
+        for numero, ligne in enumerate(lignes, start=2):
+            if all(v is None for v in ligne):
+                continue
+            bloc.append(ligne)
+            numeros.append(numero)
+            if len(bloc) >= chunksize:
+                yield pd.DataFrame(bloc, columns=entete, index=numeros), min((numero - 1) / total, 1.0)
+                bloc, numeros = [], []
+        if bloc:
+            yield pd.DataFrame(bloc, columns=entete, index=numeros), 1.0
+    finally:
+        wb.close()
+
+
+def _blocs_xls(path: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, float]]:
+    # Pas de lecture en flux pour l'ancien format : découpage après lecture
+    df = pd.read_excel(path)
+    for debut in range(0, len(df), chunksize):
+        bloc = df.iloc[debut:debut + chunksize]
+        yield bloc.set_axis(bloc.index + 2), min((debut + chunksize) / len(df), 1.0)
+
+
+def iter_releve(
+    path: str,
+    chunksize: int = CHUNKSIZE,
+    date_format: str | None = None,
+    progress_callback: Callable[[int], None] | None = None,
+) -> Iterator[List[Transaction]]:
+    """Lit un relevé par blocs de *chunksize* lignes et produit des lots de transactions.
+
+    Les CSV sont lus avec ``pd.read_csv(chunksize=...)`` et les fichiers
+    ``.xlsx`` avec openpyxl en lecture seule : la mémoire utilisée ne dépend
+    pas de la taille du fichier. *progress_callback* reçoit le pourcentage
+    lu après chaque lot. Une ligne invalide lève une
+    :class:`ComptaValidationError` pour son lot ; les lots précédents ont
+    déjà été produits.
+    """
+    for df, fraction, lignes in _blocs(path, chunksize):
+        yield _transactions(df, date_format, lignes)
+        if progress_callback:
+            progress_callback(int(fraction * 100))
+
+
+def _blocs(path: str, chunksize: int) -> Iterator[Tuple[pd.DataFrame, float, pd.Index]]:
+    """Produit les blocs normalisés de *path* avec la fraction lue et leurs numéros de ligne.
+
+    Les lecteurs indexent chaque bloc par le numéro de ligne de ses
+    enregistrements dans le fichier ; les lignes vides ignorées n'en
+    décalent donc pas la numérotation.
+    """
+    ext = _extension(path)
+    lire = {".csv": _blocs_csv, ".xlsx": _blocs_xlsx, ".xls": _blocs_xls}[ext]
+    blocs = lire(path, chunksize)
+    while True:
+        try:
+            df, fraction = next(blocs)
+        except StopIteration:
+            return
+        except Exception as e:  # lecture/parse errors
+            logger.exception("Erreur lors de la lecture du fichier %s", path)
+            msg = f"Erreur lors de la lecture du fichier {path} : {e}"
+            raise ComptaImportError(msg) from None
+        lignes = df.index
+        yield _normaliser_colonnes(df.reset_index(drop=True)), fraction, lignes
+
+
+def importer_releve_par_lots(
+    path: str,
+    storage: BaseStorage,
+    chunksize: int = CHUNKSIZE,
+    date_format: str | None = None,
+    progress_callback: Callable[[int], None] | None = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> int:
+    """Importe un relevé dans *storage* lot par lot et retourne le nombre de lignes.
+
+    Le fichier est lu deux fois : un premier passage valide toutes les
+    lignes, puis chaque lot de :func:`iter_releve` est enregistré dès sa
+    lecture. Une ligne invalide n'enregistre donc rien, et la mémoire
+    utilisée reste constante même pour des exports de plusieurs Go.
+    La signature convient au ``Worker`` Qt (progression et arrêt) ; la
+    validation compte pour la première moitié de la progression.
+    """
+    logger.info("D\u00e9but import par lots du fichier %s", path)
+    for df, fraction, lignes in _blocs(path, chunksize):
+        if not df.empty:
+            _valider(df, date_format, lignes)
+        if progress_callback:
+            progress_callback(int(fraction * 50))
+        if should_stop():
+            logger.info("Import du fichier %s interrompu pendant la validation", path)
+            return 0
+
+    def progression(pourcentage: int) -> None:
+        if progress_callback:
+            progress_callback(50 + pourcentage // 2)
+
+    total = 0
+    for lot in iter_releve(path, chunksize, date_format, progression):
+        _enregistrer(storage, lot)
+        total += len(lot)
+        if should_stop():
+            logger.info("Import du fichier %s interrompu apr\u00e8s %d lignes", path, total)
+            break
+    else:
+        logger.info("Import du fichier %s termine : %d lignes traitees", path, total)
+    return total
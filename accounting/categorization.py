@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import re
 from datetime import date
 from typing import Dict, List
 
+import pandas as pd
+
 from .transaction import Transaction
 
 # Mots-clés par catégorie
@@ -27,6 +30,26 @@ def categoriser_automatiquement(tx: Transaction) -> str:
     return "Autre"
 
 
+def categoriser_libelles(libelles: pd.Series) -> pd.Series:
+    """Version vectorisée de :func:`categoriser_automatiquement`.
+
+    Retourne la catégorie de chaque libellé ; la première catégorie dont
+    un mot-clé apparaît l'emporte, comme pour une transaction seule.
+    Chaque libellé distinct n'est examiné qu'une fois.
+    """
+    libelles = libelles.fillna("").astype(str)
+    uniques = pd.Series(libelles.unique())
+    texte = uniques.str.lower()
+    categories = pd.Series("Autre", index=uniques.index, dtype=object)
+    libres = pd.Series(True, index=uniques.index)
+    for categorie, mots in CATEGORIES_KEYWORDS.items():
+        motif = "|".join(re.escape(m) for m in mots)
+        trouve = libres & texte.str.contains(motif, regex=True)
+        categories[trouve] = categorie
+        libres &= ~trouve
+    return libelles.map(dict(zip(uniques, categories)))
+
+
 def rapport_par_categorie(
     transactions: List[Transaction],
     start: date | None = None,
@@ -19,11 +19,19 @@ class ComptaImportError(ComptaError):
 class ComptaValidationError(ComptaError):
     """Erreur de validation des données.
 
+    ``errors`` liste les erreurs ligne par ligne lorsqu'un import en a
+    relevé plusieurs.
+
     ---
 
-    Data validation error.
+    Data validation error.  ``errors`` lists the row-level errors when an
+    import found several.
     """
 
+    def __init__(self, message: str = "", errors: list[str] | None = None) -> None:
+        super().__init__(message)
+        self.errors = list(errors or [])
+
 
 class ComptaExportError(ComptaError):
     """Erreur lors de l'export de données.
@@ -6,6 +6,7 @@ from abc import ABC, abstractmethod
 from typing import List
 
 from sqlalchemy import Column, String, Float, Date, ForeignKey
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from db import SessionLocal, engine
 from db.models import Base
@@ -55,6 +56,11 @@ class BaseStorage(ABC):
     def add_transaction(self, tx: Transaction) -> None:
         """Sauvegarde une transaction."""
 
+    def add_transactions(self, txs: List[Transaction]) -> None:
+        """Sauvegarde plusieurs transactions, une par une par défaut."""
+        for tx in txs:
+            self.add_transaction(tx)
+
     @abstractmethod
     def add_entry(self, entry: JournalEntry) -> None:
         """Sauvegarde une écriture."""
@@ -89,6 +95,10 @@ class InMemoryStorage(BaseStorage):
         """Enregistre une transaction en mémoire."""
         self._transactions.append(tx)
 
+    def add_transactions(self, txs: List[Transaction]) -> None:
+        """Enregistre plusieurs transactions en mémoire."""
+        self._transactions.extend(txs)
+
     def add_entry(self, entry: JournalEntry) -> None:
         """Enregistre une écriture en mémoire."""
         self._entries.append(entry)
@@ -136,6 +146,32 @@ class SQLStorage(BaseStorage):
             session.merge(obj)
             session.commit()
 
+    def add_transactions(self, txs: List[Transaction]) -> None:
+        """Insère toutes les transactions en une requête et un commit."""
+        rows = [
+            {
+                "id": tx.id,
+                "date": tx.date,
+                "description": tx.description,
+                "montant": tx.montant,
+                "debit": tx.debit,
+                "credit": tx.credit,
+                "categorie": tx.categorie,
+                "journal_entry_id": tx.journal_entry_id,
+            }
+            for tx in txs
+        ]
+        if not rows:
+            return
+        stmt = sqlite_insert(TransactionModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TransactionModel.id],
+            set_={k: stmt.excluded[k] for k in rows[0] if k != "id"},
+        )
+        with self._session() as session:
+            session.execute(stmt, rows)
+            session.commit()
+
     def add_entry(self, entry: JournalEntry) -> None:
         with self._session() as session:
             obj = JournalEntryModel(
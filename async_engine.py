@@ -0,0 +1,139 @@
+"""Bounded asyncio work engine used by the concurrent scraping mode.
+
+Scraping tasks are fed through a bounded queue to a fixed number of
+workers so memory stays flat whatever the number of URLs.  Requests to a
+given host go through a token bucket instead of fixed random sleeps, and
+Playwright pages are reused from a small per-context pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Iterable
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Classic token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """Keep one :class:`TokenBucket` per host name."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    async def wait(self, url: str) -> None:
+        host = urlparse(url).netloc or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        await bucket.acquire()
+
+
+class PagePool:
+    """Reuse up to ``size`` Playwright pages opened in a single context.
+
+    *route*, when given, handles every request of the context (see
+    :meth:`resource_blocking.ResourcePolicy.route`).
+    """
+
+    def __init__(self, browser, size: int, route=None):
+        self.browser = browser
+        self.size = max(1, int(size))
+        self.route = route
+        self._context = None
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+
+    async def acquire(self):
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            if self._context is None:
+                self._context = await self.browser.new_context()
+                if self.route is not None:
+                    await self._context.route("**/*", self.route)
+            return await self._context.new_page()
+        return await self._idle.get()
+
+    def release(self, page) -> None:
+        self._idle.put_nowait(page)
+
+    async def close(self) -> None:
+        if self._context is not None:
+            await self._context.close()
+            self._context = None
+
+
+async def run_bounded(
+    items: Iterable[Any],
+    handler: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+    on_result: Callable[[Any, Any, BaseException | None], None],
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Run ``handler`` over *items* with at most *concurrency* in flight.
+
+    The producer blocks once the queue holds ``2 * concurrency`` items, so
+    results are consumed as fast as they are produced.  ``on_result`` is
+    called with ``(item, result, error)`` for every processed item.
+    *items* may also be an asynchronous iterable.
+    """
+    concurrency = max(1, int(concurrency))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    done = object()
+
+    async def produce():
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                if should_stop():
+                    break
+                await queue.put(item)
+        else:
+            for item in items:
+                if should_stop():
+                    break
+                await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(done)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            try:
+                result = await handler(item)
+            except Exception as e:
+                on_result(item, None, e)
+            else:
+                on_result(item, result, None)
+
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
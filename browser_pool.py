@@ -0,0 +1,200 @@
+"""Bounded pool of warm Selenium Chrome drivers.
+
+Launching Chrome is by far the slowest step of a short scraping run, so the
+scraper keeps a few drivers alive and hands them out to every scraping
+method instead of starting a fresh browser each time.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+class BrowserPool:
+    """Hand out Chrome drivers, recycling them on page count or memory.
+
+    At most ``max_size`` drivers exist at the same time; :meth:`acquire`
+    blocks until one is released.  Idle drivers are health-checked before
+    being reused and a driver is restarted once it has loaded ``max_pages``
+    pages or its JS heap exceeds ``max_memory_mb``.
+    """
+
+    def __init__(
+        self,
+        driver_path,
+        binary_path=None,
+        headless=True,
+        max_size=2,
+        max_pages=50,
+        max_memory_mb=1024,
+    ):
+        self.driver_path = driver_path
+        self.binary_path = binary_path
+        self.headless = headless
+        self.max_size = max(1, int(max_size))
+        self.max_pages = max(1, int(max_pages))
+        self.max_memory_mb = max_memory_mb
+
+        self._idle = deque()
+        self._pages = {}
+        self._blocked = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # --- Driver lifecycle ----------------------------------------------
+    def _build_options(self):
+        options = webdriver.ChromeOptions()
+        if self.binary_path:
+            options.binary_location = self.binary_path
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+        if self.headless:
+            options.add_argument("--headless")
+        return options
+
+    def _launch(self):
+        service = Service(executable_path=self.driver_path)
+        driver = webdriver.Chrome(service=service, options=self._build_options())
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_SCRIPT})
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+        except Exception:
+            pass
+        with self._cond:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _quit(self, driver):
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._blocked.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.debug("Failed to quit driver: %s", e)
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _memory_mb(driver) -> float | None:
+        """Return the JS heap used by *driver* in MB, if Chrome reports it."""
+        try:
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}) or {}
+        except Exception:
+            return None
+        for metric in metrics.get("metrics", []):
+            if metric.get("name") == "JSHeapUsedSize":
+                return metric.get("value", 0) / (1024 * 1024)
+        return None
+
+    # --- Public API ------------------------------------------------------
+    def acquire(self):
+        """Return a healthy driver, launching one if the pool has room."""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("browser pool is closed")
+                while self._idle:
+                    driver = self._idle.popleft()
+                    if self._is_healthy(driver):
+                        return driver
+                    logging.info("Driver hors service, remplacement")
+                    self._quit(driver)
+                    self._created -= 1
+                if self._created < self.max_size:
+                    self._created += 1
+                    break
+                self._cond.wait()
+        try:
+            return self._launch()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, driver) -> None:
+        """Give *driver* back to the pool so another caller can reuse it.
+
+        A driver the pool already quit (a failed restart in
+        :meth:`recycle_if_needed`) no longer counts and is dropped.
+        """
+        with self._cond:
+            if id(driver) in self._pages:
+                if self._closed:
+                    self._quit(driver)
+                    self._created -= 1
+                else:
+                    self._idle.append(driver)
+            self._cond.notify()
+
+    def recycle_if_needed(self, driver):
+        """Count one page load on *driver* and restart it when worn out.
+
+        Returns the driver the caller should keep using, which is a fresh
+        instance when the page or memory budget was exceeded.
+        """
+        with self._cond:
+            count = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = count
+        reason = None
+        if count >= self.max_pages:
+            reason = f"{count} pages"
+        elif self.max_memory_mb:
+            mem = self._memory_mb(driver)
+            if mem is not None and mem > self.max_memory_mb:
+                reason = f"{mem:.0f} Mo de heap JS"
+        if reason is None:
+            return driver
+        logging.info("🔄 Redémarrage du navigateur (%s)", reason)
+        self._quit(driver)
+        try:
+            return self._launch()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def block_urls(self, driver, patterns=()) -> None:
+        """Make *driver* refuse requests whose URL matches *patterns*.
+
+        Patterns use the ``*`` wildcards of CDP ``Network.setBlockedURLs``;
+        an empty list lifts the block.  Drivers are shared between scraping
+        methods, so each one sets the patterns it needs before loading pages.
+        """
+        patterns = list(patterns)
+        with self._cond:
+            if self._blocked.get(id(driver), []) == patterns:
+                return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            with self._cond:
+                self._blocked[id(driver)] = patterns
+        except Exception as e:
+            logging.debug("Failed to block URLs: %s", e)
+
+    def close(self) -> None:
+        """Quit idle drivers; drivers still in use quit on release."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._quit(self._idle.popleft())
+                self._created -= 1
+            self._cond.notify_all()
@@ -1,4 +1,5 @@
 import argparse
+import multiprocessing
 import os
 import logger_setup  # noqa: F401
 import config
@@ -6,6 +7,7 @@ import config_manager
 from scraper_core import ScraperCore
 from optimizer import ImageOptimizer
 from image_pipeline import run_pipeline, replay_workflow
+import work_queue
 
 
 def run_scrape(args):
@@ -25,6 +27,8 @@ def run_scrape(args):
         headless=args.headless,
         concurrent=args.concurrent,
         resume=args.resume,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
     )
     print(summary)
 
@@ -44,17 +48,65 @@ def run_scrape_images(args):
         binary_path=config.CHROME_BINARY_PATH,
         suffix=args.suffix,
         headless=args.headless,
+        near_duplicate_distance=args.near_duplicates,
+        workers=args.workers,
     )
     print(result)
 
 
 def run_optimize(args):
-    optimizer = ImageOptimizer(config.OPTIPNG_PATH, config.CWEBP_PATH)
-    logs = optimizer.optimize_folder(args.folder)
-    for line in logs:
+    optimizer = ImageOptimizer(
+        config.OPTIPNG_PATH,
+        config.CWEBP_PATH,
+        workers=args.workers,
+        use_manifest=not args.force,
+    )
+    for line in optimizer.iter_optimize_folder(args.folder, ordered=False):
         print(line)
 
 
+def _queue_steps(value):
+    steps = [s.strip() for s in value.split(",") if s.strip()]
+    unknown = set(steps) - set(work_queue.STEPS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown step(s): {', '.join(sorted(unknown))}")
+    return steps
+
+
+def run_enqueue(args):
+    core = ScraperCore(
+        base_dir=config.BASE_DIR,
+        chrome_driver_path=config.CHROME_DRIVER_PATH,
+        chrome_binary_path=config.CHROME_BINARY_PATH,
+    )
+    id_url_map = core.charger_liens_avec_id(config.LINKS_FILE_PATH)
+    queue = work_queue.WorkQueue()
+    for step in args.steps:
+        queue.enqueue(step, id_url_map, reset=args.reset)
+        print(f"{step}: {queue.counts(step)}")
+
+
+def run_work(args):
+    processes = work_queue.start_workers(
+        args.workers,
+        config.BASE_DIR,
+        args.steps,
+        batch_size=args.batch_size,
+        lease_seconds=args.lease,
+        driver_path=config.CHROME_DRIVER_PATH,
+        binary_path=config.CHROME_BINARY_PATH,
+        headless=args.headless,
+        concurrent=args.concurrent,
+        concurrency=args.concurrency,
+        incremental=args.incremental,
+    )
+    for process in processes:
+        process.join()
+    queue = work_queue.WorkQueue()
+    for step in args.steps:
+        print(f"{step}: {queue.counts(step)}")
+
+
 def run_resume(args):
     args.resume = True
     run_scrape(args)
@@ -100,23 +152,54 @@ def build_parser() -> argparse.ArgumentParser:
     p_scrape = sub.add_parser("scrape", help="Scrape product descriptions")
     p_scrape.add_argument("--headless", action="store_true", help="Run Chrome headless")
     p_scrape.add_argument("--concurrent", action="store_true", help="Use async scraping")
+    p_scrape.add_argument("--concurrency", type=int, default=None, help="Async workers (with --concurrent)")
+    p_scrape.add_argument("--incremental", action="store_true",
+                          help="Skip pages unchanged since the previous run")
     p_scrape.add_argument("--resume", action="store_true", help="Resume from checkpoint")
     p_scrape.set_defaults(func=run_scrape)
 
     p_images = sub.add_parser("scrape-images", help="Scrape product images")
     p_images.add_argument("--headless", action="store_true", help="Run Chrome headless")
     p_images.add_argument("--suffix", default="image-produit", help="Suffix for alt text")
+    p_images.add_argument("--near-duplicates", type=int, default=0, metavar="BITS",
+                          help="Skip images within BITS of a stored perceptual hash (0 disables)")
+    p_images.add_argument("--workers", type=int, default=1,
+                          help="Browser processes sharing the product pages")
     p_images.set_defaults(func=run_scrape_images)
 
     p_opt = sub.add_parser("optimize", help="Optimize an image folder")
     p_opt.add_argument("folder", help="Folder containing images")
+    p_opt.add_argument("--workers", type=int, default=None, help="Parallel optimizations (default: CPU count)")
+    p_opt.add_argument("--force", action="store_true", help="Re-optimize files listed in the manifest")
     p_opt.set_defaults(func=run_optimize)
 
     p_resume = sub.add_parser("resume", help="Resume a previous scraping run")
     p_resume.add_argument("--headless", action="store_true", help="Run Chrome headless")
     p_resume.add_argument("--concurrent", action="store_true", help="Use async scraping")
+    p_resume.add_argument("--concurrency", type=int, default=None, help="Async workers (with --concurrent)")
+    p_resume.add_argument("--incremental", action="store_true",
+                          help="Skip pages unchanged since the previous run")
     p_resume.set_defaults(func=run_resume)
 
+    p_enqueue = sub.add_parser("enqueue", help="Queue the links file for scraping workers")
+    p_enqueue.add_argument("--steps", type=_queue_steps, default=list(work_queue.STEPS),
+                           help="Comma separated steps (default: variantes,concurrents)")
+    p_enqueue.add_argument("--reset", action="store_true", help="Queue done and failed items again")
+    p_enqueue.set_defaults(func=run_enqueue)
+
+    p_worker = sub.add_parser("work", help="Run scraping workers fed from the queue")
+    p_worker.add_argument("--workers", type=int, default=1, help="Worker processes to start")
+    p_worker.add_argument("--steps", type=_queue_steps, default=list(work_queue.STEPS),
+                          help="Comma separated steps (default: variantes,concurrents)")
+    p_worker.add_argument("--batch-size", type=int, default=20, help="Items claimed at a time")
+    p_worker.add_argument("--lease", type=float, default=120.0, help="Seconds before a silent worker's items return")
+    p_worker.add_argument("--headless", action="store_true", help="Run Chrome headless")
+    p_worker.add_argument("--concurrent", action="store_true", help="Use async scraping")
+    p_worker.add_argument("--concurrency", type=int, default=None, help="Async workers (with --concurrent)")
+    p_worker.add_argument("--incremental", action="store_true",
+                          help="Skip pages unchanged since the previous run")
+    p_worker.set_defaults(func=run_work)
+
     p_plugin = sub.add_parser("plugin", help="Manage scraping plugins")
     p_plugin.add_argument("--list", action="store_true", help="List available plugins")
     p_plugin.add_argument("--use", metavar="MODULE", help="Activate plugin module")
@@ -141,4 +224,5 @@ def main(argv=None):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     raise SystemExit(main())
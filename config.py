@@ -21,11 +21,20 @@ WP_UPLOAD_PATH = _cfg["WP_UPLOAD_PATH"]
 IMAGE_NAME_PATTERN = _cfg["IMAGE_NAME_PATTERN"]
 SCRAPER_PLUGIN = _cfg.get("SCRAPER_PLUGIN", "plugins.woocommerce")
 ENABLE_FLASK_API = _cfg.get("ENABLE_FLASK_API", "false")
+SQLITE_JOURNAL_MODE = _cfg["SQLITE_JOURNAL_MODE"]
+SQLITE_SYNCHRONOUS = _cfg["SQLITE_SYNCHRONOUS"]
+SQLITE_BUSY_TIMEOUT_MS = _cfg["SQLITE_BUSY_TIMEOUT_MS"]
+SQLITE_CACHE_SIZE_KB = _cfg["SQLITE_CACHE_SIZE_KB"]
+SQLITE_MMAP_SIZE_MB = _cfg["SQLITE_MMAP_SIZE_MB"]
+SQLITE_POOL_SIZE = _cfg["SQLITE_POOL_SIZE"]
+BLOCK_RESOURCE_TYPES = _cfg["BLOCK_RESOURCE_TYPES"]
+BLOCK_URL_PATTERNS = _cfg["BLOCK_URL_PATTERNS"]
+RESULTS_FORMAT = _cfg["RESULTS_FORMAT"]
 
 
 def reload() -> Dict[str, str | None]:
     """Reload configuration from disk and update module globals."""
-    global BASE_DIR, CHROME_DRIVER_PATH, CHROME_BINARY_PATH, OPTIPNG_PATH, CWEBP_PATH, SUFFIX_FILE_PATH, LINKS_FILE_PATH, ROOT_FOLDER, THEME, WP_DOMAIN, WP_UPLOAD_PATH, IMAGE_NAME_PATTERN, SCRAPER_PLUGIN, ENABLE_FLASK_API
+    global BASE_DIR, CHROME_DRIVER_PATH, CHROME_BINARY_PATH, OPTIPNG_PATH, CWEBP_PATH, SUFFIX_FILE_PATH, LINKS_FILE_PATH, ROOT_FOLDER, THEME, WP_DOMAIN, WP_UPLOAD_PATH, IMAGE_NAME_PATTERN, SCRAPER_PLUGIN, ENABLE_FLASK_API, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE_MB, SQLITE_POOL_SIZE, BLOCK_RESOURCE_TYPES, BLOCK_URL_PATTERNS, RESULTS_FORMAT
     _new = config_manager.load()
     BASE_DIR = _new["BASE_DIR"]
     CHROME_DRIVER_PATH = _new["CHROME_DRIVER_PATH"]
@@ -41,4 +50,13 @@ def reload() -> Dict[str, str | None]:
     IMAGE_NAME_PATTERN = _new["IMAGE_NAME_PATTERN"]
     SCRAPER_PLUGIN = _new.get("SCRAPER_PLUGIN", "plugins.woocommerce")
     ENABLE_FLASK_API = _new.get("ENABLE_FLASK_API", "false")
+    SQLITE_JOURNAL_MODE = _new["SQLITE_JOURNAL_MODE"]
+    SQLITE_SYNCHRONOUS = _new["SQLITE_SYNCHRONOUS"]
+    SQLITE_BUSY_TIMEOUT_MS = _new["SQLITE_BUSY_TIMEOUT_MS"]
+    SQLITE_CACHE_SIZE_KB = _new["SQLITE_CACHE_SIZE_KB"]
+    SQLITE_MMAP_SIZE_MB = _new["SQLITE_MMAP_SIZE_MB"]
+    SQLITE_POOL_SIZE = _new["SQLITE_POOL_SIZE"]
+    BLOCK_RESOURCE_TYPES = _new["BLOCK_RESOURCE_TYPES"]
+    BLOCK_URL_PATTERNS = _new["BLOCK_URL_PATTERNS"]
+    RESULTS_FORMAT = _new["RESULTS_FORMAT"]
     return _new
@@ -25,6 +25,15 @@ DEFAULTS = {
     "IMAGE_NAME_PATTERN": "{id}:{variant}-{name}.webp",
     "SCRAPER_PLUGIN": "plugins.woocommerce",
     "ENABLE_FLASK_API": "false",
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": "5000",
+    "SQLITE_CACHE_SIZE_KB": "65536",
+    "SQLITE_MMAP_SIZE_MB": "256",
+    "SQLITE_POOL_SIZE": "5",
+    "BLOCK_RESOURCE_TYPES": "image,font,media",
+    "BLOCK_URL_PATTERNS": "",
+    "RESULTS_FORMAT": "xlsx",
 }
 
 
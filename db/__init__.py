@@ -1,26 +1,80 @@
 from __future__ import annotations
 
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
+import config
 from .models import Base
 
 engine = None
 SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
 
-def init_engine(path: str | Path):
+
+def sqlite_profile() -> dict:
+    """Return the connection settings configured in ``config``.
+
+    Values come from ``config.toml`` as strings; invalid ones raise
+    ``ValueError`` instead of reaching a ``PRAGMA`` statement.
+    """
+    journal = str(config.SQLITE_JOURNAL_MODE).upper()
+    synchronous = str(config.SQLITE_SYNCHRONOUS).upper()
+    if journal not in _JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {journal}")
+    if synchronous not in _SYNCHRONOUS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {synchronous}")
+    return {
+        "journal_mode": journal,
+        "synchronous": synchronous,
+        "busy_timeout": int(config.SQLITE_BUSY_TIMEOUT_MS),
+        "cache_size": -int(config.SQLITE_CACHE_SIZE_KB),
+        "mmap_size": int(config.SQLITE_MMAP_SIZE_MB) * 1024 * 1024,
+        "pool_size": int(config.SQLITE_POOL_SIZE),
+    }
+
+
+def init_engine(path: str | Path, profile: dict | None = None):
     """Initialise the global engine and session factory.
 
     Ensures the parent directory exists before opening the SQLite
     database so that ``create_engine`` does not fail if the file or its
-    folder is missing.
+    folder is missing.  Every pooled connection gets the pragmas of
+    *profile* (default :func:`sqlite_profile`): WAL lets the UI read
+    while the scraper and the scheduler write.
     """
     global engine, SessionLocal
     db_path = Path(path)
     if db_path.parent and not db_path.parent.exists():
         db_path.parent.mkdir(parents=True, exist_ok=True)
-    engine = create_engine(f"sqlite:///{db_path}")
+    profile = profile or sqlite_profile()
+    pragmas = [
+        ("journal_mode", profile["journal_mode"]),
+        ("synchronous", profile["synchronous"]),
+        ("busy_timeout", int(profile["busy_timeout"])),
+        ("cache_size", int(profile["cache_size"])),
+        ("mmap_size", int(profile["mmap_size"])),
+    ]
+    if engine is not None:
+        engine.dispose()
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        pool_size=int(profile["pool_size"]),
+        max_overflow=int(profile["pool_size"]),
+        connect_args={
+            "check_same_thread": False,
+            "timeout": int(profile["busy_timeout"]) / 1000,
+        },
+    )
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
     SessionLocal.configure(bind=engine)
     return engine
@@ -0,0 +1,104 @@
+"""Schema upgrades for databases created by older versions.
+
+``Base.metadata.create_all`` only creates missing tables; it never adds
+columns or indexes to existing ones.  Each step below runs once per
+database and the last applied step is tracked in ``PRAGMA user_version``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+def _columns(conn, table: str) -> set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+
+
+def _add_image_phash(conn) -> None:
+    if "phash" not in _columns(conn, "image_hashes"):
+        conn.exec_driver_sql("ALTER TABLE image_hashes ADD COLUMN phash VARCHAR")
+
+
+def _add_hot_indexes(conn) -> None:
+    for table, column in (
+        ("competitors", "status"),
+        ("competitors", "product_id"),
+        ("images", "product_id"),
+        ("logs", "created"),
+    ):
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})")
+
+
+def _add_products_fts(conn) -> None:
+    """Index product names for substring search (trigram FTS5)."""
+    try:
+        conn.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts "
+            "USING fts5(product_id UNINDEXED, name, tokenize='trigram')"
+        )
+    except OperationalError as e:
+        # SQLite built without FTS5 or older than 3.34: search keeps using LIKE
+        logging.warning("Product full-text index unavailable: %s", e)
+        return
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN "
+        "INSERT INTO products_fts(rowid, product_id, name) VALUES (new.rowid, new.product_id, new.name); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN "
+        "DELETE FROM products_fts WHERE rowid = old.rowid; END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF product_id, name ON products BEGIN "
+        "DELETE FROM products_fts WHERE rowid = old.rowid; "
+        "INSERT INTO products_fts(rowid, product_id, name) VALUES (new.rowid, new.product_id, new.name); END"
+    )
+    rebuild_products_fts(conn)
+
+
+def rebuild_products_fts(conn) -> None:
+    """Refill ``products_fts`` from ``products`` (e.g. after a ``VACUUM``)."""
+    conn.exec_driver_sql("DELETE FROM products_fts")
+    conn.exec_driver_sql(
+        "INSERT INTO products_fts(rowid, product_id, name) SELECT rowid, product_id, name FROM products"
+    )
+
+
+def _add_checkpoint_retry_columns(conn) -> None:
+    columns = _columns(conn, "checkpoint_items")
+    if "error_class" not in columns:
+        conn.exec_driver_sql("ALTER TABLE checkpoint_items ADD COLUMN error_class VARCHAR")
+    if "next_attempt" not in columns:
+        conn.exec_driver_sql("ALTER TABLE checkpoint_items ADD COLUMN next_attempt DATETIME")
+
+
+def _add_selector_field(conn) -> None:
+    if "field" not in _columns(conn, "selectors"):
+        conn.exec_driver_sql("ALTER TABLE selectors ADD COLUMN field VARCHAR")
+
+
+MIGRATIONS = [
+    _add_image_phash,
+    _add_hot_indexes,
+    _add_products_fts,
+    _add_checkpoint_retry_columns,
+    _add_selector_field,
+]
+
+
+def schema_version(conn) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def upgrade(engine) -> int:
+    """Apply pending migrations to *engine* and return the schema version."""
+    with engine.begin() as conn:
+        version = schema_version(conn)
+        for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            step(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {number}")
+            logging.info("Database schema upgraded to version %d (%s)", number, step.__name__)
+    return max(version, len(MIGRATIONS))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Float
 
 Base = declarative_base()
 
@@ -29,18 +29,18 @@ class Variant(Base):
 class Competitor(Base):
     __tablename__ = 'competitors'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    product_id = Column(String, ForeignKey('products.product_id'))
+    product_id = Column(String, ForeignKey('products.product_id'), index=True)
     title = Column(String)
     url = Column(String)
     file_path = Column(String)
-    status = Column(String)
+    status = Column(String, index=True)
 
     product = relationship('Product', back_populates='competitors')
 
 class Image(Base):
     __tablename__ = 'images'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    product_id = Column(String, ForeignKey('products.product_id'))
+    product_id = Column(String, ForeignKey('products.product_id'), index=True)
     variant = Column(String)
     url_competitor = Column(String)
     filename = Column(String)
@@ -48,6 +48,60 @@ class Image(Base):
 
     product = relationship('Product', back_populates='images')
 
+
+class ImageHash(Base):
+    """Content digest of an image file on disk, keyed by its path."""
+
+    __tablename__ = 'image_hashes'
+
+    path = Column(String, primary_key=True)
+    size = Column(Integer)
+    mtime = Column(Float)
+    digest = Column(String, index=True)
+    phash = Column(String)
+
+class CheckpointItem(Base):
+    """Progress of one item of a scraping step, used to resume a run."""
+
+    __tablename__ = 'checkpoint_items'
+
+    step = Column(String, primary_key=True)
+    item_id = Column(String, primary_key=True)
+    status = Column(String, index=True)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    error_class = Column(String)
+    next_attempt = Column(DateTime)
+    output_path = Column(String)
+    updated = Column(DateTime)
+
+class FetchMeta(Base):
+    """HTTP validators and extracted-fields digest of a scraped URL."""
+
+    __tablename__ = 'fetch_meta'
+
+    url = Column(String, primary_key=True)
+    etag = Column(String)
+    last_modified = Column(String)
+    content_hash = Column(String)
+    updated = Column(DateTime)
+
+class QueueItem(Base):
+    """Item of a scraping step shared by worker processes, see work_queue."""
+
+    __tablename__ = 'queue_items'
+
+    step = Column(String, primary_key=True)
+    item_id = Column(String, primary_key=True)
+    url = Column(String)
+    status = Column(String, index=True)
+    worker = Column(String)
+    lease = Column(String, index=True)
+    lease_until = Column(DateTime)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    updated = Column(DateTime)
+
 class ScheduledTask(Base):
     __tablename__ = 'scheduled_tasks'
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -58,7 +112,7 @@ class ScheduledTask(Base):
 class Log(Base):
     __tablename__ = 'logs'
     id = Column(Integer, primary_key=True, autoincrement=True)
-    created = Column(DateTime)
+    created = Column(DateTime, index=True)
     level = Column(String)
     message = Column(Text)
 
@@ -80,6 +134,8 @@ class Selector(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     domain = Column(String, unique=True)
     selector = Column(String)
+    # Extraction profile field the selector reads, if any
+    field = Column(String)
 
 class Workflow(Base):
     __tablename__ = 'workflows'
@@ -0,0 +1,292 @@
+"""Per-domain extraction profiles.
+
+An :class:`ExtractionProfile` lists, for every field the scrapers read,
+the CSS selectors to try in order.  :class:`ProfileRegistry` maps domains
+to profiles loaded from ``extraction_profiles.json``::
+
+    {
+        "shop.example": {
+            "title": ["h1.product__title"],
+            "price": [".price ins .amount", ".price"],
+            "gallery": ".woocommerce-product-gallery img"
+        }
+    }
+
+Fields left out keep the values of :data:`DEFAULT_PROFILE`.  The selector
+saved for a domain with the visual selector is tried first for the
+description.  Each profile builds its parse strainer and the arguments of
+:data:`EXTRACT_JS` once.  That script reads every field from a live page
+in one ``execute_script`` or ``page.evaluate`` call.
+
+:func:`variation_images` reads the images of every variant from the
+``data-product_variations`` JSON WooCommerce embeds in product pages, so
+variants need not be clicked one by one.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, fields, replace
+from functools import cached_property
+from urllib.parse import urlparse
+
+from html_parse import ElementStrainer, strainer_for
+
+PROFILES_FILENAME = "extraction_profiles.json"
+
+_PRICE = re.compile(r"([0-9]+(?:[\\.,][0-9]{2})?)")
+_COLOR_ATTRIBUTE = re.compile(r"colou?r|couleur", re.IGNORECASE)
+
+VARIATIONS_SELECTOR = "form.variations_form[data-product_variations]"
+VARIATIONS_STRAINER = ElementStrainer(classes={"variations_form"})
+
+# Reads all fields of a profile from the live DOM in a single round-trip.
+EXTRACT_JS = """(P) => {
+    const first = (sels) => {
+        for (const s of sels) {
+            const el = document.querySelector(s);
+            if (el) return el;
+        }
+        return null;
+    };
+    const title = first(P.title);
+    let price = "";
+    for (const s of P.price) {
+        const el = document.querySelector(s);
+        if (el && el.innerText.trim()) { price = el.innerText.trim(); break; }
+    }
+    const swatches = [];
+    for (const label of document.querySelectorAll(P.swatch)) {
+        if (!label.getClientRects().length) continue;
+        const name = label.querySelector(P.swatch_name);
+        if (name && name.textContent.trim()) swatches.push(name.textContent.trim());
+    }
+    const gallery = Array.from(document.querySelectorAll(P.gallery), (img) => img.src).filter(Boolean);
+    return {title: title ? title.innerText.trim() : "", price, swatches, gallery};
+}"""
+
+SELENIUM_EXTRACT_JS = f"return ({EXTRACT_JS})(arguments[0]);"
+
+
+def parse_price(text: str) -> str:
+    """Return the first amount of *text* with a dot decimal separator."""
+    match = _PRICE.search(text or "")
+    return match.group(1).replace(",", ".") if match else ""
+
+
+@dataclass(frozen=True)
+class ExtractionProfile:
+    """CSS selectors used to read a product or fiche page, by field."""
+
+    title: tuple[str, ...] = ("h1.product-single__title", "h1.product-info__title", "h1")
+    price: tuple[str, ...] = ("sale-price.text-lg", ".price", ".product-price", ".woocommerce-Price-amount")
+    swatch: str = "label.color-swatch"
+    swatch_name: str = "span.sr-only"
+    gallery: str = ".product-gallery__media img"
+    description: tuple[str, ...] = ("#product_description", ".accordion__content .prose", "div.prose")
+
+    @classmethod
+    def from_dict(cls, data: dict, base: "ExtractionProfile | None" = None) -> "ExtractionProfile":
+        """Build a profile from JSON *data*, other fields come from *base*."""
+        base = base or cls()
+        known = {f.name: f for f in fields(cls)}
+        values = {}
+        for key, value in data.items():
+            if key not in known:
+                raise ValueError(f"Unknown extraction field: {key}")
+            if isinstance(getattr(base, key), tuple):
+                value = (value,) if isinstance(value, str) else tuple(value)
+            values[key] = value
+        return replace(base, **values)
+
+    @cached_property
+    def ready_selectors(self) -> tuple[str, ...]:
+        """Selector group whose presence means a live page has rendered."""
+        return (", ".join(self.title),)
+
+    @cached_property
+    def product_required(self) -> tuple[str, ...]:
+        """Selector groups a raw product page must contain to skip the browser."""
+        return (", ".join(self.title), ", ".join(self.price))
+
+    @cached_property
+    def fiche_required(self) -> tuple[str, ...]:
+        return (", ".join(self.title), ", ".join(self.description))
+
+    @cached_property
+    def js_args(self) -> dict:
+        """Arguments of :data:`EXTRACT_JS` for this profile."""
+        return {
+            "title": list(self.title),
+            "price": list(self.price),
+            "swatch": self.swatch,
+            "swatch_name": self.swatch_name,
+            "gallery": self.gallery,
+        }
+
+    @cached_property
+    def product_strainer(self) -> ElementStrainer | None:
+        """Strainer keeping the product fields, ``None`` for a full parse."""
+        return strainer_for(self.title + self.price + (self.swatch,))
+
+    @cached_property
+    def fiche_strainer(self) -> ElementStrainer | None:
+        return strainer_for(self.title + self.description)
+
+    # --- Parsed HTML -----------------------------------------------------
+    @staticmethod
+    def _first(soup, selectors):
+        for selector in selectors:
+            el = soup.select_one(selector)
+            if el is not None:
+                return el
+        return None
+
+    def product_fields(self, soup) -> tuple[str, str, list[str]]:
+        """Return ``(name, price, variant names)`` from a parsed page."""
+        title = self._first(soup, self.title)
+        name = title.get_text(strip=True) if title else ""
+        price = ""
+        for selector in self.price:
+            el = soup.select_one(selector)
+            if el and el.text.strip():
+                price = parse_price(el.text.strip())
+                break
+        variants = [
+            el.get_text(strip=True)
+            for el in soup.select(f"{self.swatch} {self.swatch_name}")
+        ]
+        return name, price, variants
+
+    def fiche_parts(self, soup):
+        """Return the ``(title, description)`` tags of a parsed fiche page."""
+        return self._first(soup, self.title), self._first(soup, self.description)
+
+    # --- Live pages ------------------------------------------------------
+    def extract_driver(self, driver) -> dict:
+        """Read all fields from a Selenium page in one script call."""
+        return driver.execute_script(SELENIUM_EXTRACT_JS, self.js_args) or {}
+
+    async def extract_page(self, page) -> dict:
+        """Read all fields from a Playwright page in one ``evaluate``."""
+        return await page.evaluate(EXTRACT_JS, self.js_args) or {}
+
+
+DEFAULT_PROFILE = ExtractionProfile()
+# Fields a saved selector may be bound to
+PROFILE_FIELDS = tuple(f.name for f in fields(ExtractionProfile))
+
+
+def _domain(url: str) -> str:
+    domain = (urlparse(url).netloc or url).lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class ProfileRegistry:
+    """Profiles by domain, falling back to *default*."""
+
+    def __init__(self, profiles: dict | None = None, default: ExtractionProfile = DEFAULT_PROFILE):
+        self.default = default
+        self._profiles = {_domain(d): p for d, p in (profiles or {}).items()}
+
+    @classmethod
+    def load(cls, path: str | None = None, saved_selectors: dict | None = None) -> "ProfileRegistry":
+        """Read profiles from the JSON file at *path* and saved selectors.
+
+        *saved_selectors* is the ``{domain: {field: selector}}`` mapping of
+        :func:`storage.load_field_selectors`; each selector becomes the first
+        candidate of its field (or replaces a single-selector field) for
+        its domain.
+        """
+        raw = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    raw = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error("Invalid extraction profiles %s: %s", path, e)
+        profiles = {}
+        for domain, data in raw.items():
+            try:
+                profiles[_domain(domain)] = ExtractionProfile.from_dict(data)
+            except (TypeError, ValueError, AttributeError) as e:
+                logging.error("Invalid extraction profile for %s: %s", domain, e)
+        for domain, by_field in (saved_selectors or {}).items():
+            key = _domain(domain)
+            for field, selector in by_field.items():
+                if field not in PROFILE_FIELDS or not selector:
+                    logging.error("Ignoring saved selector %r for field %r of %s", selector, field, domain)
+                    continue
+                base = profiles.get(key, DEFAULT_PROFILE)
+                current = getattr(base, field)
+                if isinstance(current, tuple):
+                    value = current if selector in current else (selector,) + current
+                else:
+                    value = selector
+                profiles[key] = replace(base, **{field: value})
+        return cls(profiles)
+
+    def for_url(self, url: str) -> ExtractionProfile:
+        return self._profiles.get(_domain(url), self.default)
+
+
+def _variation_sources(variation: dict) -> list[str]:
+    images = [variation.get("image")] + list(variation.get("variation_gallery_images") or [])
+    sources = []
+    for image in images:
+        if not isinstance(image, dict):
+            continue
+        # ``src`` is what WooCommerce puts in the gallery when the variant is picked
+        src = image.get("src") or image.get("full_src") or image.get("url")
+        if src and src not in sources:
+            sources.append(src)
+    return sources
+
+
+def variation_images(soup) -> dict[str, list[str]] | None:
+    """Map variant names to image URLs from ``data-product_variations``.
+
+    Variants are named after their colour attribute when the product has
+    one, otherwise after all attributes, using the option labels of the
+    variation form.  Returns ``None`` when the page embeds no usable data
+    (simple product, or ``false`` when WooCommerce loads variations over
+    AJAX) so the caller can click the swatches instead.
+    """
+    form = soup.select_one(VARIATIONS_SELECTOR)
+    if form is None:
+        return None
+    try:
+        variations = json.loads(form.get("data-product_variations") or "")
+    except ValueError:
+        return None
+    if not isinstance(variations, list):
+        return None
+
+    labels = {}
+    for select in form.select("select"):
+        attribute = select.get("data-attribute_name") or select.get("name")
+        labels[attribute] = {
+            opt.get("value"): opt.get_text(strip=True) for opt in select.find_all("option") if opt.get("value")
+        }
+    keys = []
+    for variation in variations:
+        for key in variation.get("attributes") or {}:
+            if key not in keys:
+                keys.append(key)
+    keys = [k for k in keys if _COLOR_ATTRIBUTE.search(k)] or keys
+
+    result: dict[str, list[str]] = {}
+    for variation in variations:
+        attributes = variation.get("attributes") or {}
+        name = " ".join(
+            labels.get(key, {}).get(attributes[key], attributes[key]) for key in keys if attributes.get(key)
+        )
+        sources = _variation_sources(variation)
+        if not name or not sources:
+            continue
+        known = result.setdefault(name, [])
+        known.extend(src for src in sources if src not in known)
+    return result or None
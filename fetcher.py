@@ -0,0 +1,167 @@
+"""HTTP-first page fetching for server-rendered shops.
+
+Most WooCommerce product pages already contain the title, price and
+swatch markup in the raw HTML.  :class:`HttpFetcher` tries a pooled
+``requests.Session`` first and only reports a miss when the selectors the
+caller needs are absent, in which case the scraper falls back to a real
+browser.  The tier that worked is remembered per domain; a domain is
+only switched to the browser after several of its raw pages lacked the
+selector marking a rendered page, not after a failed request or a page
+missing an optional field such as the price of an out-of-stock product.
+
+Incremental runs pass the ``ETag`` and ``Last-Modified`` stored for a
+URL; the server may then answer ``304 Not Modified`` and the page is
+neither downloaded nor parsed again.
+"""
+
+from __future__ import annotations
+
+import logging
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import html_parse
+import storage
+
+HTTP = "http"
+BROWSER = "browser"
+
+# Statuses asking the client to slow down; a browser would get them too
+THROTTLING_STATUSES = (429, 503)
+
+# Raw pages of a domain that must miss before it is sent to the browser
+BROWSER_AFTER_MISSES = 3
+
+
+class _NotModified:
+    def __repr__(self):
+        return "NOT_MODIFIED"
+
+
+# Returned by :meth:`HttpFetcher.fetch` when a conditional request got a 304
+NOT_MODIFIED = _NotModified()
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+}
+
+
+def has_selectors(html: str, required) -> bool:
+    """Return ``True`` when every CSS selector group of *required* matches.
+
+    Each entry may be a selector list such as ``"#a, .b"`` which matches
+    when any of its alternatives is present.  Only the elements those
+    selectors can match are parsed.
+    """
+    if not required:
+        return True
+    soup = html_parse.parse(html, html_parse.strainer_for(tuple(required)))
+    return all(soup.select_one(sel) is not None for sel in required)
+
+
+class HttpFetcher:
+    """Fetch pages over plain HTTP and remember which tier each domain needs."""
+
+    def __init__(self, timeout=15, pool_size=10, headers=None):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self._tiers: dict[str, str] = {}
+        # url -> (etag, last_modified) of the last page fetched
+        self.validators: dict[str, tuple] = {}
+        # URLs whose raw HTML did not look rendered, and their count per domain
+        self._missed: set[str] = set()
+        self._misses: dict[str, int] = {}
+
+    @staticmethod
+    def _domain(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def tier(self, url: str) -> str | None:
+        """Return the tier that last worked for the domain of *url*."""
+        domain = self._domain(url)
+        if domain not in self._tiers:
+            try:
+                self._tiers[domain] = storage.get_preference(f"fetch_tier:{domain}")
+            except Exception:
+                self._tiers[domain] = None
+        return self._tiers[domain]
+
+    def record_tier(self, url: str, tier: str) -> None:
+        """Remember that *tier* worked for the domain of *url*.
+
+        :data:`BROWSER` is only recorded once :data:`BROWSER_AFTER_MISSES`
+        HTTP fetches of the domain got a page without its first selector
+        group, so a timeout, a server error or a single odd page does not
+        send the whole domain to the browser for good.
+        """
+        domain = self._domain(url)
+        if tier == BROWSER:
+            if url not in self._missed:
+                return
+            self._missed.discard(url)
+            self._misses[domain] = self._misses.get(domain, 0) + 1
+            if self._misses[domain] < BROWSER_AFTER_MISSES:
+                return
+        else:
+            self._misses.pop(domain, None)
+        if self._tiers.get(domain) == tier:
+            return
+        self._tiers[domain] = tier
+        try:
+            storage.set_preference(f"fetch_tier:{domain}", tier)
+        except Exception as e:
+            logging.debug("Failed to persist fetch tier for %s: %s", domain, e)
+
+    def fetch(self, url: str, required=(), validators=None):
+        """Return the page HTML, or ``None`` when a browser is needed.
+
+        Domains already known to need a browser are not requested at all.
+        *validators* is the ``(etag, last_modified)`` pair of a previous
+        fetch; when the page did not change since, :data:`NOT_MODIFIED` is
+        returned.  The validators of a fetched page are kept in
+        :attr:`validators`.  The first group of *required* marks a rendered
+        page; the others, which a page may legitimately lack, only send this
+        page to the browser.  A 429 or 503 answer raises
+        :class:`requests.HTTPError` so the retry queue backs off the host
+        instead of hitting it again with a browser.
+        """
+        if self.tier(url) == BROWSER:
+            return None
+        headers = {}
+        etag, last_modified = validators or (None, None)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            resp = self.session.get(url, timeout=self.timeout, headers=headers or None)
+            if resp.status_code == 304 and headers:
+                return NOT_MODIFIED
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            if getattr(e.response, "status_code", None) in THROTTLING_STATUSES:
+                raise
+            logging.info("HTTP fetch failed for %s: %s", url, e)
+            return None
+        html = resp.text
+        if not has_selectors(html, required):
+            if not has_selectors(html, required[:1]):
+                self._missed.add(url)
+            return None
+        self.record_tier(url, HTTP)
+        self.validators[url] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return html
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,183 @@
+"""Incremental export of competitor descriptions to JSON batches.
+
+Each ``.txt`` fiche keeps the batch and id it was first exported with.
+New fiches fill the last batch before opening a new one, and a manifest
+remembers the ``(id, mtime, size)`` of every member as last written, so
+a re-run only rewrites the batches whose fiches were added, edited or
+removed.  Batches are streamed one fiche at a time, as a JSON array
+(``batch_N.json``) or as JSON lines (``batch_N.ndjson``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import textwrap
+
+MANIFEST_NAME = "export_manifest.json"
+FORMATS = ("json", "ndjson")
+
+_H1 = re.compile(r"<h1[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+
+
+def extract_h1(html: str) -> str:
+    match = _H1.search(html)
+    return match.group(1).strip() if match else ""
+
+
+def batch_filename(number: int, fmt: str) -> str:
+    return f"batch_{number}.{fmt}"
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: str, manifest: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _signature(members, stats) -> str:
+    h = hashlib.sha1()
+    for name, ident in members:
+        h.update(json.dumps([name, ident, stats.get(name)]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _record(source_dir: str, name: str, ident: int) -> dict:
+    with open(os.path.join(source_dir, name), "r", encoding="utf-8") as f:
+        contenu = f.read()
+    return {
+        "id": ident,
+        "id_source": os.path.splitext(name)[0],
+        "nom": name,
+        "h1": extract_h1(contenu),
+        "html": contenu.strip(),
+    }
+
+
+def _write_batch(path: str, records, fmt: str) -> int:
+    """Stream *records* to *path* and return how many were written.
+
+    The JSON layout matches ``json.dump(records, indent=2)``.
+    """
+    tmp = path + ".tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        if fmt == "ndjson":
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        else:
+            for rec in records:
+                f.write(",\n" if count else "[\n")
+                f.write(textwrap.indent(json.dumps(rec, ensure_ascii=False, indent=2), "  "))
+                count += 1
+            f.write("\n]" if count else "[]")
+    os.replace(tmp, path)
+    return count
+
+
+def export_batches(
+    source_dir: str,
+    output_dir: str,
+    batch_size: int = 50,
+    fmt: str = "json",
+    log=print,
+    progress_callback=None,
+    should_stop=lambda: False,
+) -> tuple[int, int]:
+    """Export the fiches of *source_dir* and return ``(written, total)`` batches."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+    if manifest.get("batch_size") != batch_size or manifest.get("format") != fmt:
+        for number in manifest.get("written", {}):
+            old = os.path.join(output_dir, batch_filename(int(number), manifest.get("format", "json")))
+            if os.path.exists(old):
+                os.remove(old)
+        manifest = {}
+    assigned = manifest.get("assigned", {})  # name -> [batch, id]
+    written = manifest.get("written", {})  # batch -> signature
+
+    stats = {}
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".txt") and entry.is_file():
+                st = entry.stat()
+                stats[entry.name] = [st.st_mtime_ns, st.st_size]
+
+    assigned = {name: pos for name, pos in assigned.items() if name in stats}
+    batches: dict[int, list] = {}
+    for name, (number, ident) in assigned.items():
+        batches.setdefault(number, []).append((name, ident))
+    next_id = max((ident for _, ident in assigned.values()), default=0) + 1
+    last = max(batches, default=1)
+    for name in sorted(set(stats) - set(assigned)):
+        if len(batches.get(last, [])) >= batch_size:
+            last += 1
+        batches.setdefault(last, []).append((name, next_id))
+        assigned[name] = [last, next_id]
+        next_id += 1
+
+    for number in [n for n in map(int, written) if n not in batches]:
+        stale = os.path.join(output_dir, batch_filename(number, fmt))
+        if os.path.exists(stale):
+            os.remove(stale)
+        written.pop(str(number))
+
+    dirty = []
+    for number in sorted(batches):
+        members = sorted(batches[number], key=lambda m: m[1])
+        signature = _signature(members, stats)
+        path = os.path.join(output_dir, batch_filename(number, fmt))
+        if written.get(str(number)) != signature or not os.path.exists(path):
+            dirty.append((number, members, signature, path))
+
+    manifest = {"batch_size": batch_size, "format": fmt, "assigned": assigned, "written": written}
+    total = sum(len(members) for _, members, _, _ in dirty)
+    processed = 0
+
+    def records(members):
+        nonlocal processed
+        for name, ident in members:
+            try:
+                rec = _record(source_dir, name, ident)
+            except Exception as e:
+                log(f"  ⚠️ Erreur lecture {name}: {e}")
+                continue
+            log(f"  ✅ {name} — h1: {rec['h1'][:50]}...")
+            yield rec
+            processed += 1
+            if progress_callback and total:
+                progress_callback(int(processed / total * 100))
+
+    done = 0
+    for number, members, signature, path in dirty:
+        if should_stop():
+            log("⏹ Interruption demandée.")
+            break
+        log(f"\n🔹 Batch {number} : {len(members)} fichier(s)")
+        count = _write_batch(path, records(members), fmt)
+        if count == len(members):
+            written[str(number)] = signature
+        else:
+            # Unreadable fiches were skipped: export the batch again next time
+            written.pop(str(number), None)
+        _save_manifest(manifest_path, manifest)
+        done += 1
+        log(f"    ➡️ Batch sauvegardé : {os.path.basename(path)} ({count} produits)")
+    _save_manifest(manifest_path, manifest)
+    return done, len(batches)
@@ -0,0 +1,120 @@
+"""HTML parsing backend for the scrapers.
+
+Product and fiche pages are parsed only to read a title, a price, the
+colour swatches and one description block.  :func:`parse` uses the lxml
+tree builder when it is installed (``html.parser`` otherwise), and an
+:class:`ElementStrainer` keeps only the elements those extractions look
+at, so BeautifulSoup does not build the rest of the page.
+
+Run ``python html_parse.py [page.html ...]`` to compare the backends on
+saved pages (``projet-scrap/samples/example.html`` by default).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    BACKEND = "lxml"
+except Exception:  # pragma: no cover - optional dependency may be missing
+    BACKEND = "html.parser"
+
+_SIMPLE_COMPOUND = re.compile(r"^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+
+
+class ElementStrainer(SoupStrainer):
+    """Keep tags matching any of *names*, *classes* or *ids*, with their subtree."""
+
+    def __init__(self, names=(), classes=(), ids=()):
+        super().__init__()
+        self.names = frozenset(names)
+        self.classes = frozenset(classes)
+        self.ids = frozenset(ids)
+
+    def wanted(self, name, attrs) -> bool:
+        if name in self.names:
+            return True
+        attrs = dict(attrs or {})
+        if attrs.get("id") in self.ids:
+            return True
+        classes = attrs.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.classes.isdisjoint(classes)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.wanted(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # BeautifulSoup < 4.13 filters through this method instead
+        name = getattr(markup_name, "name", markup_name)
+        attrs = getattr(markup_name, "attrs", markup_attrs)
+        return markup_name if self.wanted(name, attrs) else None
+
+
+@lru_cache(maxsize=64)
+def strainer_for(selectors: tuple[str, ...]) -> ElementStrainer | None:
+    """Strainer keeping what the CSS selector groups *selectors* can match.
+
+    Only the outermost compound of each selector is kept, with its whole
+    subtree.  Returns ``None`` (a full parse) when a selector starts with
+    something else than a tag, class or id.
+    """
+    names, classes, ids = set(), set(), set()
+    for group in selectors:
+        for selector in group.split(","):
+            # Keeping the outermost element keeps everything inside it
+            match = _SIMPLE_COMPOUND.match(selector.strip().split()[0]) if selector.strip() else None
+            if not match or not (match.group(1) or match.group(2)):
+                return None
+            tokens = re.findall(r"[.#][\w-]+", match.group(2))
+            id_tokens = [t[1:] for t in tokens if t[0] == "#"]
+            class_tokens = [t[1:] for t in tokens if t[0] == "."]
+            if id_tokens:
+                ids.add(id_tokens[0])
+            elif class_tokens:
+                classes.add(class_tokens[0])
+            else:
+                names.add(match.group(1))
+    return ElementStrainer(names=names, classes=classes, ids=ids)
+
+
+def parse(html: str, strainer: SoupStrainer | None = None, backend: str | None = None) -> BeautifulSoup:
+    """Parse *html* with the fastest available backend."""
+    return BeautifulSoup(html, backend or BACKEND, parse_only=strainer)
+
+
+def benchmark(html: str, strainer: SoupStrainer, repeat: int = 20) -> dict[str, float]:
+    """Return the mean parse time in milliseconds of each configuration."""
+    configs = {"html.parser": ("html.parser", None), "html.parser+strainer": ("html.parser", strainer)}
+    if BACKEND != "html.parser":
+        configs[BACKEND] = (BACKEND, None)
+        configs[f"{BACKEND}+strainer"] = (BACKEND, strainer)
+    timings = {}
+    for label, (backend, parse_only) in configs.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parse(html, parse_only, backend)
+        timings[label] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+if __name__ == "__main__":
+    from extraction import DEFAULT_PROFILE
+
+    pages = sys.argv[1:] or [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "projet-scrap", "samples", "example.html")
+    ]
+    for page in pages:
+        with open(page, "r", encoding="utf-8") as f:
+            content = f.read()
+        print(f"{page} ({len(content)} octets)")
+        for label, ms in benchmark(content, DEFAULT_PROFILE.product_strainer).items():
+            print(f"  {label:<24} {ms:8.3f} ms")
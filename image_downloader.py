@@ -0,0 +1,82 @@
+"""Threaded image downloader with connection reuse.
+
+Gallery images used to be fetched one by one with ``urlretrieve`` on the
+thread that drives Chrome.  :class:`ImageDownloader` streams them to disk
+from a thread pool sharing one keep-alive ``requests.Session`` while
+limiting how many requests hit the same host at once.  An optional
+``accept`` callback sees the header probed by :mod:`image_probe` first,
+so rejected images cost a few KB instead of a full download.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetcher import DEFAULT_HEADERS
+from image_probe import probe_url
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageDownloader:
+    """Download files concurrently, at most ``per_host`` per host."""
+
+    def __init__(self, max_workers=8, per_host=4, timeout=30, session=None):
+        self.timeout = timeout
+        self.per_host = max(1, int(per_host))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+        self.session = session
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="img-dl")
+        self._hosts = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._hosts_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            return self._hosts[host]
+
+    def _download(self, url: str, path: str, accept=None) -> str | None:
+        part = path + ".part"
+        with self._host_slot(url):
+            if accept is not None:
+                info = probe_url(self.session, url, timeout=self.timeout)
+                if info is not None and not accept(info):
+                    return None
+            with self.session.get(url, stream=True, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                with open(part, "wb") as f:
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+        os.replace(part, path)
+        return path
+
+    def submit(self, url: str, path: str, accept=None) -> Future:
+        """Schedule *url* to be saved at *path*; the future yields *path*.
+
+        When *accept* is given it is called with the probed
+        :class:`image_probe.ImageInfo`; a falsy answer skips the download
+        and the future yields ``None``.
+        """
+        return self._executor.submit(self._download, url, path, accept)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -48,7 +48,9 @@ def _execute(cfg: dict, wf_id: int) -> None:
             )
         elif step == "optimize":
             _log(session, wf_id, f"optimize {dest}")
-            optimizer = ImageOptimizer(config.OPTIPNG_PATH, config.CWEBP_PATH)
+            optimizer = ImageOptimizer(
+                config.OPTIPNG_PATH, config.CWEBP_PATH, workers=cfg.get("optimize_workers")
+            )
             for msg in optimizer.iter_optimize_folder(dest):
                 _log(session, wf_id, msg)
         else:
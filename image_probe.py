@@ -0,0 +1,161 @@
+"""Read image type and dimensions from the first bytes of a file.
+
+``scrap_images`` rejects thumbnails by size and format.  Instead of
+downloading and decoding every file, :func:`probe_url` asks for the first
+few KB with an HTTP ``Range`` request and :func:`image_info` reads the
+dimensions from the PNG, GIF, JPEG, WebP or AVIF header.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+import requests
+
+PROBE_BYTES = 32 * 1024
+
+_TYPES = {
+    "jpg": "jpeg",
+    "jpeg": "jpeg",
+    "png": "png",
+    "gif": "gif",
+    "webp": "webp",
+    "avif": "avif",
+}
+
+# Start-of-frame markers carrying the image size (DHT, JPG and DAC excluded)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class ImageInfo(NamedTuple):
+    format: str | None
+    width: int | None = None
+    height: int | None = None
+
+
+def normalize_type(value: str | None) -> str | None:
+    """Map an extension or MIME subtype (``jpg``, ``image/jpeg``) to a format."""
+    if not value:
+        return None
+    value = value.split(";", 1)[0].strip().lower()
+    value = value.rsplit("/", 1)[-1].lstrip(".")
+    return _TYPES.get(value)
+
+
+def url_type(url: str) -> str | None:
+    """Return the image format implied by the extension of *url*."""
+    return normalize_type(os.path.splitext(urlparse(url).path)[1])
+
+
+def _jpeg_size(data: bytes):
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in _JPEG_SOF:
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        (length,) = struct.unpack(">H", data[i + 2:i + 4])
+        i += 2 + length
+    return None
+
+
+def _webp_size(data: bytes):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+        w, h = struct.unpack("<HH", data[26:30])
+        return w & 0x3FFF, h & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        (bits,) = struct.unpack("<I", data[21:25])
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        w = int.from_bytes(data[24:27], "little") + 1
+        h = int.from_bytes(data[27:30], "little") + 1
+        return w, h
+    return None
+
+
+def _avif_size(data: bytes):
+    # The primary item is the largest ``ispe`` (thumbnails and alpha come smaller)
+    best = None
+    start = data.find(b"ispe")
+    while start != -1 and start + 16 <= len(data):
+        w, h = struct.unpack(">II", data[start + 8:start + 16])
+        if best is None or w * h > best[0] * best[1]:
+            best = (w, h)
+        start = data.find(b"ispe", start + 4)
+    return best
+
+
+def image_info(data: bytes) -> ImageInfo | None:
+    """Return the format and size encoded in the header *data*, if known."""
+    size = None
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and data[12:16] == b"IHDR":
+        fmt = "png"
+        size = struct.unpack(">II", data[16:24]) if len(data) >= 24 else None
+    elif data[:6] in (b"GIF87a", b"GIF89a"):
+        fmt = "gif"
+        size = struct.unpack("<HH", data[6:10]) if len(data) >= 10 else None
+    elif data.startswith(b"\xff\xd8"):
+        fmt = "jpeg"
+        size = _jpeg_size(data)
+    elif data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        fmt = "webp"
+        size = _webp_size(data)
+    elif data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        fmt = "avif"
+        size = _avif_size(data)
+    else:
+        return None
+    if size is None:
+        return ImageInfo(fmt)
+    return ImageInfo(fmt, int(size[0]), int(size[1]))
+
+
+def probe_file(path: str, nbytes: int = PROBE_BYTES) -> ImageInfo | None:
+    """Read the header of the file at *path*."""
+    try:
+        with open(path, "rb") as f:
+            return image_info(f.read(nbytes))
+    except OSError:
+        return None
+
+
+def probe_url(session, url: str, nbytes: int = PROBE_BYTES, timeout=10) -> ImageInfo | None:
+    """Fetch the first *nbytes* of *url* and return what its header tells.
+
+    Servers ignoring ``Range`` are handled by closing the stream once
+    enough bytes were read.  The format falls back on the
+    ``Content-Type`` header when the bytes are not recognised.
+    """
+    data = b""
+    try:
+        with session.get(
+            url, headers={"Range": f"bytes=0-{nbytes - 1}"}, stream=True, timeout=timeout
+        ) as resp:
+            resp.raise_for_status()
+            content_type = resp.headers.get("Content-Type")
+            for chunk in resp.iter_content(8192):
+                data += chunk
+                if len(data) >= nbytes:
+                    break
+    except requests.RequestException as e:
+        logging.debug("Image probe failed for %s: %s", url, e)
+        return None
+    info = image_info(data)
+    if info is None:
+        fmt = normalize_type(content_type)
+        return ImageInfo(fmt) if fmt else None
+    return info
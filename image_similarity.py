@@ -0,0 +1,95 @@
+"""Perceptual hashing to catch re-encoded or resized duplicate images.
+
+The same product photo is often served by CDNs at several sizes
+(``-800``, ``-1024``...) or compression levels, which defeats SHA-256
+deduplication.  A 64-bit difference hash (dHash) stays almost identical
+across such variants; a :class:`BKTree` finds stored hashes within a small
+Hamming distance without comparing against every image.
+
+Pillow is optional: without it :func:`dhash` returns ``None`` and
+near-duplicate detection is simply skipped.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from PIL import Image
+except Exception:  # pragma: no cover - optional dependency may be missing
+    Image = None
+
+
+def available() -> bool:
+    """Return ``True`` when perceptual hashes can be computed."""
+    return Image is not None
+
+
+def dhash(path: str, size: int = 8) -> int | None:
+    """Return the ``size * size`` bit difference hash of the image at *path*."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            small = img.convert("L").resize((size + 1, size), Image.LANCZOS)
+            pixels = np.asarray(small, dtype=np.int16)
+    except Exception:
+        return None
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_hex(value: int) -> str:
+    return format(value, "016x")
+
+
+def from_hex(value: str) -> int:
+    return int(value, 16)
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes using Hamming distance."""
+
+    def __init__(self, hashes=()):
+        self._root = None
+        self._size = 0
+        for h in hashes:
+            self.add(h)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = (value, {})
+            return
+        node = self._root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                return
+            child = node[1].get(dist)
+            if child is None:
+                node[1][dist] = (value, {})
+                return
+            node = child
+
+    def find(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """Return ``(distance, hash)`` pairs within *max_distance* of *value*."""
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_value, children = stack.pop()
+            dist = hamming(value, node_value)
+            if dist <= max_distance:
+                found.append((dist, node_value))
+            lo, hi = dist - max_distance, dist + max_distance
+            stack.extend(child for d, child in children.items() if lo <= d <= hi)
+        return sorted(found)
@@ -1,19 +1,51 @@
+import hashlib
+import json
 import os
 import subprocess
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MANIFEST_NAME = ".optimizer_manifest.json"
+
+PNG_ARGS = ["-o7"]
+WEBP_ARGS = ["-lossless"]
+JPEG_ARGS = ["--strip-all", "--all-progressive"]
+
+
+def _digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
 
 class ImageOptimizer:
-    def __init__(self, optipng_path, cwebp_path, jpegoptim_path=None):
+    """Run optipng/cwebp/jpegoptim over images.
+
+    Folders are processed by ``workers`` threads (the work happens in the
+    external tools, so threads keep every core busy).  A manifest stored in
+    the folder maps the SHA-256 of each optimized output to the tool
+    settings used, so unchanged files are skipped on the next run.
+    """
+
+    def __init__(self, optipng_path, cwebp_path, jpegoptim_path=None, workers=None, use_manifest=True):
         self.optipng_path = optipng_path
         self.cwebp_path = cwebp_path
         self.jpegoptim_path = jpegoptim_path  # facultatif
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.use_manifest = use_manifest
 
-    def optimize_file(self, filepath):
+    def _optimize(self, filepath):
+        """Optimize *filepath* and return ``(succeeded, log)``."""
         ext = os.path.splitext(filepath)[1].lower()
         log = f"[{filepath}] "
+        ok = False
         try:
             if ext == ".png":
-                result = subprocess.run([self.optipng_path, "-o7", filepath], capture_output=True, text=True)
+                result = subprocess.run([self.optipng_path, *PNG_ARGS, filepath], capture_output=True, text=True)
                 if result.returncode == 0:
+                    ok = True
                     log += "PNG optimisé avec optipng."
                 else:
                     log += f"Erreur optipng: {result.stderr.strip()}"
@@ -21,20 +53,22 @@ class ImageOptimizer:
                 # "Optimisation" sans perte = recoder à qualité max (pas toujours utile, mais pour exemple)
                 tmpfile = filepath + ".tmp.webp"
                 result = subprocess.run(
-                    [self.cwebp_path, "-lossless", filepath, "-o", tmpfile],
+                    [self.cwebp_path, *WEBP_ARGS, filepath, "-o", tmpfile],
                     capture_output=True,
                     text=True,
                 )
                 if result.returncode == 0:
                     os.replace(tmpfile, filepath)
+                    ok = True
                     log += "WebP optimisé avec cwebp."
                 else:
                     if os.path.exists(tmpfile):
                         os.remove(tmpfile)
                     log += f"Erreur cwebp: {result.stderr.strip()}"
             elif ext in [".jpg", ".jpeg"] and self.jpegoptim_path:
-                result = subprocess.run([self.jpegoptim_path, "--strip-all", "--all-progressive", filepath], capture_output=True, text=True)
+                result = subprocess.run([self.jpegoptim_path, *JPEG_ARGS, filepath], capture_output=True, text=True)
                 if result.returncode == 0:
+                    ok = True
                     log += "JPEG optimisé avec jpegoptim."
                 else:
                     log += f"Erreur jpegoptim: {result.stderr.strip()}"
@@ -42,21 +76,110 @@ class ImageOptimizer:
                 log += "Format non supporté ou exe manquant."
         except Exception as e:
             log += f"Exception: {str(e)}"
-        return log
+        return ok, log
+
+    def optimize_file(self, filepath):
+        return self._optimize(filepath)[1]
+
+    @staticmethod
+    def settings_key(filepath):
+        """Identify the tool settings applied to *filepath*."""
+        ext = os.path.splitext(filepath)[1].lower()
+        if ext == ".png":
+            return "optipng " + " ".join(PNG_ARGS)
+        if ext == ".webp":
+            return "cwebp " + " ".join(WEBP_ARGS)
+        return "jpegoptim " + " ".join(JPEG_ARGS)
 
-    def iter_optimize_folder(self, folder):
-        """Yield optimization logs for each eligible file in *folder*."""
+    def _eligible(self, folder):
         for root, _, files in os.walk(folder):
             for f in files:
                 ext = os.path.splitext(f)[1].lower()
                 if ext in [".png", ".webp"] or (
                     self.jpegoptim_path and ext in [".jpg", ".jpeg"]
                 ):
-                    path = os.path.join(root, f)
-                    yield self.optimize_file(path)
+                    yield os.path.join(root, f)
+
+    @staticmethod
+    def load_manifest(folder):
+        try:
+            with open(os.path.join(folder, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    @staticmethod
+    def save_manifest(folder, files):
+        path = os.path.join(folder, MANIFEST_NAME)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": files}, f)
+        os.replace(tmp, path)
+
+    def _optimize_cached(self, path, known):
+        """Optimize *path* unless *known* says it already was.
+
+        Returns the log line and, on success, the ``(digest, settings)``
+        entry to add to the manifest.
+        """
+        if known is None:
+            return self._optimize(path)[1], None
+        key = self.settings_key(path)
+        try:
+            if known.get(_digest(path)) == key:
+                return f"[{path}] Déjà optimisé, ignoré.", None
+        except OSError as e:
+            return f"[{path}] Exception: {e}", None
+        ok, log = self._optimize(path)
+        if ok:
+            try:
+                return log, (_digest(path), key)
+            except OSError:
+                pass
+        return log, None
+
+    def iter_optimize_folder(self, folder, ordered=True):
+        """Yield optimization logs for each eligible file in *folder*.
+
+        With *ordered* the logs follow the walk order, otherwise they are
+        yielded as soon as each file is done.  Closing the generator early
+        cancels the files not started yet.
+        """
+        manifest = self.load_manifest(folder) if self.use_manifest else None
+        known = dict(manifest) if manifest is not None else None
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="optimizer")
+        pending = deque()
+        changed = False
+
+        def collect():
+            nonlocal changed
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    pending.remove(fut)
+            for fut in done:
+                log, entry = fut.result()
+                if entry and manifest is not None:
+                    manifest[entry[0]] = entry[1]
+                    changed = True
+                yield log
+
+        try:
+            for path in self._eligible(folder):
+                pending.append(executor.submit(self._optimize_cached, path, known))
+                if len(pending) >= self.workers * 2:
+                    yield from collect()
+            while pending:
+                yield from collect()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            if changed:
+                self.save_manifest(folder, manifest)
 
-    def optimize_folder(self, folder):
-        return list(self.iter_optimize_folder(folder))
+    def optimize_folder(self, folder, ordered=True):
+        return list(self.iter_optimize_folder(folder, ordered))
 
 # EXEMPLE D'UTILISATION :
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+"""Readiness waits and per-host politeness for the Selenium loops.
+
+The scrapers used to sleep 2.5-4.5 s after every ``driver.get`` and 1 s
+after every swatch click.  :func:`wait_ready` instead polls the page
+until the wanted selectors exist, then gives the network a short, capped
+grace period to go idle.  :func:`wait_gallery_change` returns as
+soon as a variant click has swapped the gallery images.
+:class:`HostScheduler` spaces requests to the same host without
+delaying work on other hosts.
+
+Drivers that cannot run scripts make the waits return immediately.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+READY_JS = """
+const sels = arguments[0];
+return {
+    complete: document.readyState === "complete",
+    found: sels.every((s) => document.querySelector(s) !== null),
+    resources: performance.getEntriesByType("resource").length,
+};
+"""
+
+GALLERY_JS = "return Array.from(document.querySelectorAll(arguments[0]), (img) => img.currentSrc || img.src);"
+
+
+def _script(driver, script, *args):
+    """Run *script*; ``AttributeError`` means the driver cannot run scripts."""
+    try:
+        return driver.execute_script(script, *args)
+    except AttributeError:
+        raise
+    except Exception:
+        # Navigation in progress, stale context...: try again on next poll
+        return None
+
+
+def wait_ready(driver, required=(), timeout=15.0, idle=0.5, grace=1.5, poll=0.1) -> bool | None:
+    """Wait until *required* selectors exist and the document is complete.
+
+    Once ready, the page gets up to *grace* seconds for the network to stay
+    idle for *idle* seconds; pages that keep polling or tracking do not
+    hold the wait longer than that.  Returns ``False`` when *timeout*
+    expired first, ``None`` when the driver cannot tell.
+    """
+    deadline = time.monotonic() + timeout
+    last_count = ready_since = None
+    stable_since = time.monotonic()
+    while True:
+        try:
+            state = _script(driver, READY_JS, list(required))
+        except AttributeError:
+            return None
+        now = time.monotonic()
+        if isinstance(state, dict):
+            if state.get("resources") != last_count:
+                last_count = state.get("resources")
+                stable_since = now
+            if not (state.get("complete") and state.get("found")):
+                ready_since = None
+            elif ready_since is None:
+                ready_since = now
+            if ready_since is not None and (now - stable_since >= idle or now - ready_since >= grace):
+                return True
+        if now >= deadline:
+            return False
+        time.sleep(poll)
+
+
+def gallery_sources(driver, selector):
+    """Return the current image URLs matching *selector*, or ``None``."""
+    try:
+        return _script(driver, GALLERY_JS, selector)
+    except AttributeError:
+        return None
+
+
+def wait_gallery_change(driver, selector, before, timeout=2.0, settle=0.2, poll=0.05) -> bool:
+    """Wait until the gallery differs from *before* and stops changing.
+
+    *before* is the result of :func:`gallery_sources` taken before the
+    click.  Returns ``False`` if nothing changed within *timeout*, e.g.
+    when two variants share the same photos.
+    """
+    if before is None:
+        return False
+    deadline = time.monotonic() + timeout
+    current, changed_at = before, None
+    while True:
+        try:
+            sources = _script(driver, GALLERY_JS, selector)
+        except AttributeError:
+            return False
+        now = time.monotonic()
+        if sources is not None and sources != current:
+            current, changed_at = sources, now
+        if changed_at is not None and now - changed_at >= settle:
+            return True
+        if now >= deadline:
+            return changed_at is not None
+        time.sleep(poll)
+
+
+class HostScheduler:
+    """Space requests to the same host by ``min_interval`` (plus jitter).
+
+    Only the time since the previous request to that host counts, so page
+    loads, parsing and downloads already absorb most of the delay and
+    other hosts are never held back.
+    """
+
+    def __init__(self, min_interval=1.0, jitter=0.5):
+        self.min_interval = float(min_interval)
+        self.jitter = float(jitter)
+        self._next: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def delay(self, url: str) -> float:
+        """Reserve the next slot for the host of *url* and return the wait."""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.min_interval + random.uniform(0, self.jitter)
+            return start - now
+
+    def wait(self, url: str) -> None:
+        pause = self.delay(url)
+        if pause > 0:
+            time.sleep(pause)
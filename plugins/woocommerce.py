@@ -2,18 +2,17 @@ import os
 import re
 import json
 import pandas as pd
-from bs4 import BeautifulSoup
 import unicodedata
-import time
-import random
 import requests
-import urllib.request
 from urllib.parse import urlparse
 import asyncio
 import logging
+import multiprocessing
+import queue
 from logging import getLogger
 from playwright.async_api import async_playwright
-import hashlib
+from contextlib import contextmanager
+from functools import partial
 try:
     from PySide6.QtGui import QImage  # type: ignore
 except Exception:  # pragma: no cover - optional dependency may be missing
@@ -41,12 +40,44 @@ import storage
 import db
 from pathlib import Path
 from .base import BaseScraper
+from browser_pool import BrowserPool
+from async_engine import HostRateLimiter, PagePool, run_bounded
+from fetcher import BROWSER, NOT_MODIFIED, HttpFetcher
+from image_downloader import ImageDownloader
+import html_parse
+import result_sinks
+from result_sinks import RECAP_COLUMNS, WOOCOMMERCE_COLUMNS
+from resource_blocking import ResourcePolicy
+from retry_queue import RetryQueue, classify
+from page_wait import HostScheduler, gallery_sources, wait_gallery_change, wait_ready
+from extraction import (
+    DEFAULT_PROFILE,
+    PROFILES_FILENAME,
+    VARIATIONS_SELECTOR,
+    VARIATIONS_STRAINER,
+    ProfileRegistry,
+    parse_price,
+    variation_images,
+)
+import fiche_export
+import image_probe
+import image_similarity
+from image_similarity import BKTree
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Selectors a raw HTML page must contain to skip the browser
+PRODUCT_REQUIRED = DEFAULT_PROFILE.product_required
+FICHE_REQUIRED = DEFAULT_PROFILE.fiche_required
+# Recap status of fiches an incremental run left untouched
+FICHE_UNCHANGED = "Inchangée"
+# Checkpoint error of ids missing from the links file
+MISSING_ID = "ID introuvable dans le fichier"
+
+# Scraper attributes copied to the processes of a parallel image scrape
+_SHARD_SETTINGS = ("profiles_path", "browser_pool_options", "image_download_options", "page_wait_options")
+
 # === CORE CLASS ===
 
 class WooCommerceScraper(BaseScraper):
@@ -69,15 +100,34 @@ class WooCommerceScraper(BaseScraper):
 
         self.results_dir = ""
         self.json_dir = ""
+        # Legacy JSON checkpoint, imported into the journal on resume
         self.checkpoint_file = os.path.join(self.base_dir, "scraping_checkpoint.json")
+        self.profiles_path = os.path.join(self.base_dir, PROFILES_FILENAME)
 
         self.db_path = storage.db_path(self.base_dir)
         db.init_engine(Path(self.db_path))
         storage.init_db()
+        self.checkpoint = storage.CheckpointJournal()
 
         self._progress = 0
         self._logs = []
 
+        self.browser_pool_options = {"max_size": 2, "max_pages": 50, "max_memory_mb": 1024}
+        self.async_options = {"concurrency": 4, "rate_per_host": 1.0, "burst": 2}
+        self.http_first = True
+        self.fetcher = HttpFetcher()
+        self.image_download_options = {"max_workers": 8, "per_host": 4}
+        self._pool = None
+        self._pool_key = None
+        self._keep_browsers = 0
+        self.profiles = ProfileRegistry()
+        self.page_wait_options = {"timeout": 15.0, "idle": 0.5, "grace": 1.5}
+        self.politeness = HostScheduler(min_interval=1.0, jitter=0.5)
+        # URL whose HTTP attempt just took the host slot, see _load_page
+        self._slot_url = None
+        self.resource_policy = ResourcePolicy.from_config()
+        self.results_format = getattr(config, "RESULTS_FORMAT", "xlsx")
+
     # --- Utility helpers -------------------------------------------------
     @staticmethod
     def clean_name(name):
@@ -181,30 +231,159 @@ class WooCommerceScraper(BaseScraper):
         self._logs.append(msg)
         logging.info(msg)
 
-    def _save_checkpoint(self, step: str, processed: list):
-        data = {"step": step, "processed": processed}
+    def _load_checkpoint(self):
+        """Return the step to resume and the ids already done in it."""
         try:
-            with open(self.checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.checkpoint.import_legacy(self.checkpoint_file)
+            step = self.checkpoint.current_step()
+            return step, self.checkpoint.done_ids(step) if step else set()
         except Exception as e:
-            logging.error("Failed to save checkpoint: %s", e)
-
-    def _load_checkpoint(self):
-        if os.path.isfile(self.checkpoint_file):
-            try:
-                with open(self.checkpoint_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                return data.get("step"), data.get("processed", [])
-            except Exception as e:
-                logging.error("Failed to load checkpoint: %s", e)
-        return None, []
+            logging.error("Failed to load checkpoint: %s", e)
+        return None, set()
 
     def _clear_checkpoint(self):
-        if os.path.isfile(self.checkpoint_file):
-            try:
-                os.remove(self.checkpoint_file)
-            except Exception as e:
-                logging.error("Failed to remove checkpoint: %s", e)
+        try:
+            self.checkpoint.clear()
+        except Exception as e:
+            logging.error("Failed to clear checkpoint: %s", e)
+
+    # --- Browser pool ---------------------------------------------------
+    def load_profiles(self):
+        """Reload extraction profiles from disk and saved selectors."""
+        try:
+            saved = storage.load_field_selectors()
+        except Exception as e:
+            self._log(f"⚠️ Sélecteurs enregistrés indisponibles : {e}")
+            saved = {}
+        self.profiles = ProfileRegistry.load(self.profiles_path, saved)
+        return self.profiles
+
+    def _fetch_http(self, url, required, meta=None):
+        """Fetch *url* over HTTP unless its domain is known to need a browser.
+
+        With the fetch *meta* of an incremental run the request is
+        conditional and may return :data:`fetcher.NOT_MODIFIED`.
+        """
+        if not self.http_first or self.fetcher.tier(url) == BROWSER:
+            return None
+        self.politeness.wait(url)
+        self._slot_url = url
+        if meta is not None:
+            return self.fetcher.fetch(url, required, (meta["etag"], meta["last_modified"]))
+        return self.fetcher.fetch(url, required)
+
+    @staticmethod
+    def _fetch_meta(url, incremental):
+        """Stored fetch metadata of *url* for an incremental run, else ``None``."""
+        if not incremental:
+            return None
+        return storage.get_fetch_meta(url) or {"etag": None, "last_modified": None, "content_hash": None}
+
+    def _fiche_meta(self, url, incremental):
+        """Like :meth:`_fetch_meta`, without the HTTP validators when the fiche is missing.
+
+        A 304 only says the page did not change: it is trusted only while
+        the fiche saved from it is still in :attr:`save_directory`.
+        """
+        meta = self._fetch_meta(url, incremental)
+        if meta and (meta["etag"] or meta["last_modified"]):
+            path = storage.competitor_file(url)
+            saved_here = path and os.path.abspath(os.path.dirname(path)) == os.path.abspath(self.save_directory)
+            if not (saved_here and os.path.exists(path)):
+                meta = dict(meta, etag=None, last_modified=None)
+        return meta
+
+    def _fields_changed(self, url, meta, *fields, buffer=None):
+        """Remember the validators and fields digest of *url*; ``True`` if it changed.
+
+        With *buffer* (a :class:`storage.UpsertBuffer`) they are saved once
+        its rows are written, so a killed run never skips a page it did not
+        store.
+        """
+        digest = storage.fields_hash(*fields)
+        etag, last_modified = self.fetcher.validators.pop(url, (None, None))
+        changed = meta["content_hash"] != digest
+        if changed or (etag, last_modified) != (meta["etag"], meta["last_modified"]):
+            save = partial(storage.save_fetch_meta, url, etag, last_modified, digest)
+            if buffer is None:
+                save()
+            else:
+                buffer.on_flush(save)
+        return changed
+
+    def _load_page(self, pool, driver, url, required=(), block=False):
+        """Open *url* in *driver* once its host may be hit, wait until ready.
+
+        With *block*, the downloads refused by :attr:`resource_policy` are
+        skipped; pages whose images are needed load everything.  A
+        browser fallback right after the HTTP attempt of *url* reuses the
+        host slot that attempt waited for.
+        """
+        if self._slot_url != url:
+            self.politeness.wait(url)
+        self._slot_url = None
+        driver = pool.recycle_if_needed(driver)
+        pool.block_urls(driver, self.resource_policy.url_patterns() if block else ())
+        driver.get(url)
+        if wait_ready(driver, required, **self.page_wait_options) is False:
+            self._log(f"⏳ Page incomplète après {self.page_wait_options['timeout']:.0f} s : {url}")
+        return driver
+
+    def _schedule_retry(self, retries, item_id, url, error):
+        """Queue a failed item again; return ``False`` once it is given up."""
+        delay = retries.schedule(item_id, url, error)
+        if delay is None:
+            return False
+        self._log(f"🔁 Nouvel essai de {item_id} dans {delay:.0f} s ({classify(error)})")
+        return True
+
+    def _end_step(self, retries, next_step):
+        """Make *next_step* the step to resume, unless retries are left.
+
+        Items still waiting (a run stopped during a host cooldown) keep the
+        journal on the current step so a resumed run scrapes them.
+        """
+        if len(retries):
+            self._log(f"🔁 {len(retries)} élément(s) en attente seront réessayés à la reprise")
+            return
+        self.checkpoint.begin(next_step)
+
+    def _resolve_driver_path(self, driver_path=None):
+        driver_path = driver_path or self.chrome_driver_path
+        if driver_path:
+            return driver_path
+        try:
+            return ChromeDriverManager().install()
+        except Exception as e:
+            self._log(f"❌ Impossible de télécharger ChromeDriver : {e}")
+            self._log("➡️ Spécifiez CHROME_DRIVER_PATH pour un mode hors-ligne.")
+            return None
+
+    def _browser_pool(self, driver_path, binary_path, headless):
+        key = (driver_path, binary_path, bool(headless))
+        if self._pool is not None and self._pool_key != key:
+            self._pool.close()
+            self._pool = None
+        if self._pool is None:
+            self._pool = BrowserPool(driver_path, binary_path, headless, **self.browser_pool_options)
+            self._pool_key = key
+        return self._pool
+
+    def _release_browser_pool(self):
+        """Close the pool unless :meth:`shared_browsers` keeps it warm."""
+        if self._pool is not None and not self._keep_browsers:
+            self._pool.close()
+            self._pool = None
+
+    @contextmanager
+    def shared_browsers(self):
+        """Keep pooled browsers alive across several scraping calls."""
+        self._keep_browsers += 1
+        try:
+            yield
+        finally:
+            self._keep_browsers -= 1
+            self._release_browser_pool()
 
     def get_progress(self):
         return self._progress
@@ -213,26 +392,87 @@ class WooCommerceScraper(BaseScraper):
         return "\n".join(self._logs)
 
     # --- Asynchronous helpers ----------------------------------------
-    async def async_scrape_product(self, browser, url):
-        page = await browser.new_page()
-        await page.goto(url)
-        await asyncio.sleep(random.uniform(2.5, 3.5))
-        html = await page.content()
-        await page.close()
-        return html
-
-    async def async_scrape_images(self, browser, url):
-        page = await browser.new_page()
-        await page.goto(url)
-        await asyncio.sleep(random.uniform(2.5, 3.5))
-        images = await page.query_selector_all(".product-gallery__media img")
-        srcs = []
-        for img in images:
-            src = await img.get_attribute("src")
-            if src:
-                srcs.append(src)
-        await page.close()
-        return srcs
+    async def async_scrape_product(self, browser, url, pages=None):
+        page = await pages.acquire() if pages else await browser.new_page()
+        try:
+            await page.goto(url, wait_until="load")
+            return await page.content()
+        finally:
+            if pages:
+                pages.release(page)
+            else:
+                await page.close()
+
+    async def async_scrape_images(self, browser, url, pages=None):
+        page = await pages.acquire() if pages else await browser.new_page()
+        try:
+            await page.goto(url, wait_until="load")
+            fields = await self.profiles.for_url(url).extract_page(page)
+            return fields.get("gallery", [])
+        finally:
+            if pages:
+                pages.release(page)
+            else:
+                await page.close()
+
+    async def _run_async_scrape(
+        self, todo, on_result, should_stop, headless, concurrency=None, required=None, incremental=False,
+        fetch_meta=None,
+    ):
+        """Fetch ``(id, url)`` pairs of *todo* with bounded concurrency.
+
+        Pages are requested over plain HTTP first when :attr:`http_first`
+        is set; Playwright is only launched for pages missing the selectors
+        returned by ``required(url)``.  ``on_result(id, url, html, error)`` is invoked as soon
+        as each page is fetched so the HTML never piles up in memory.  With
+        *incremental* the HTTP requests are conditional and ``html`` is
+        :data:`fetcher.NOT_MODIFIED` for unchanged pages; their validators
+        come from ``fetch_meta(url, incremental)``, :meth:`_fetch_meta` by
+        default.
+        """
+        fetch_meta = fetch_meta or self._fetch_meta
+        opts = self.async_options
+        concurrency = concurrency or opts["concurrency"]
+        limiter = HostRateLimiter(opts["rate_per_host"], opts["burst"])
+        async with async_playwright() as p:
+            browser = None
+            pages = None
+            launch_lock = asyncio.Lock()
+
+            async def fetch(item):
+                nonlocal browser, pages
+                url = item[1]
+                await limiter.wait(url)
+                if self.http_first:
+                    meta = await asyncio.to_thread(fetch_meta, url, incremental)
+                    validators = (meta["etag"], meta["last_modified"]) if meta else None
+                    html = await asyncio.to_thread(
+                        self.fetcher.fetch, url, required(url) if required else (), *([validators] if meta else [])
+                    )
+                    if html is not None:
+                        return html
+                async with launch_lock:
+                    if browser is None:
+                        browser = await p.chromium.launch(headless=headless)
+                        route = self.resource_policy.route if self.resource_policy else None
+                        pages = PagePool(browser, concurrency, route=route)
+                html = await self.async_scrape_product(browser, url, pages=pages)
+                self.fetcher.record_tier(url, BROWSER)
+                return html
+
+            try:
+                await run_bounded(
+                    todo,
+                    fetch,
+                    concurrency,
+                    lambda item, html, err: on_result(item[0], item[1], html, err),
+                    should_stop=should_stop,
+                )
+            finally:
+                if pages is not None:
+                    await pages.close()
+                if browser is not None:
+                    await browser.close()
 
     # --- High level orchestration -------------------------------------
     def start_scraping(
@@ -247,8 +487,15 @@ class WooCommerceScraper(BaseScraper):
         headless=True,
         concurrent=False,
         resume=True,
+        concurrency=None,
+        incremental=False,
     ):
-        """Run selected scraping sections with progress aggregation."""
+        """Run selected scraping sections with progress aggregation.
+
+        With *incremental*, pages unchanged since the previous run (HTTP 304
+        or same extracted fields) are skipped and the outputs only list the
+        products that changed.
+        """
         progress_callback = progress_callback or self._update_progress
         total = len(sections)
         done = 0
@@ -279,38 +526,43 @@ class WooCommerceScraper(BaseScraper):
             overall = int(done / total * 100 + p / total)
             progress_callback(overall)
 
-        if 'variantes' in sections:
-            ok, err = self.scrap_produits_par_ids(
-                id_url_map,
-                ids_for_variantes,
-                processed_ids=processed_variantes,
-                driver_path=driver_path,
-                binary_path=binary_path,
-                progress_callback=scaled,
-                headless=headless,
-                concurrent=concurrent,
-            )
-            summary.append(f"Variantes: {ok} OK, {err} erreurs")
-            done += 1
-
-        if 'concurrents' in sections:
-            ok, err = self.scrap_fiches_concurrents(
-                id_url_map,
-                ids_for_concurrents,
-                processed_ids=processed_concurrents,
-                driver_path=driver_path,
-                binary_path=binary_path,
-                progress_callback=scaled,
-                headless=headless,
-                concurrent=concurrent,
-            )
-            summary.append(f"Concurrents: {ok} OK, {err} erreurs")
-            done += 1
+        with self.shared_browsers():
+            if 'variantes' in sections:
+                ok, err = self.scrap_produits_par_ids(
+                    id_url_map,
+                    ids_for_variantes,
+                    processed_ids=processed_variantes,
+                    driver_path=driver_path,
+                    binary_path=binary_path,
+                    progress_callback=scaled,
+                    headless=headless,
+                    concurrent=concurrent,
+                    concurrency=concurrency,
+                    incremental=incremental,
+                )
+                summary.append(f"Variantes: {ok} OK, {err} erreurs")
+                done += 1
 
-        if 'json' in sections:
-            self.export_fiches_concurrents_json(batch_size, progress_callback=scaled)
-            summary.append("Export JSON termin\u00e9")
-            done += 1
+            if 'concurrents' in sections:
+                ok, err = self.scrap_fiches_concurrents(
+                    id_url_map,
+                    ids_for_concurrents,
+                    processed_ids=processed_concurrents,
+                    driver_path=driver_path,
+                    binary_path=binary_path,
+                    progress_callback=scaled,
+                    headless=headless,
+                    concurrent=concurrent,
+                    concurrency=concurrency,
+                    incremental=incremental,
+                )
+                summary.append(f"Concurrents: {ok} OK, {err} erreurs")
+                done += 1
+
+            if 'json' in sections:
+                self.export_fiches_concurrents_json(batch_size, progress_callback=scaled)
+                summary.append("Export JSON termin\u00e9")
+                done += 1
 
         progress_callback(100)
         return "\n".join(summary)
@@ -327,6 +579,8 @@ class WooCommerceScraper(BaseScraper):
         should_stop=lambda: False,
         headless=True,
         concurrent=False,
+        concurrency=None,
+        incremental=False,
     ):
         if concurrent:
             return asyncio.run(
@@ -337,167 +591,95 @@ class WooCommerceScraper(BaseScraper):
                     progress_callback,
                     should_stop,
                     headless,
+                    concurrency,
+                    incremental,
                 )
             )
 
         processed_ids = set(processed_ids or [])
 
-        driver_path = driver_path or self.chrome_driver_path
+        driver_path = self._resolve_driver_path(driver_path)
         binary_path = binary_path or self.chrome_binary_path
         if not driver_path:
-            try:
-                driver_path = ChromeDriverManager().install()
-            except Exception as e:
-                self._log(f"❌ Impossible de télécharger ChromeDriver : {e}")
-                self._log("➡️ Spécifiez CHROME_DRIVER_PATH pour un mode hors-ligne.")
-                return 0, len(ids_selectionnes)
+            return 0, len(ids_selectionnes)
         progress_callback = progress_callback or self._update_progress
-        options = webdriver.ChromeOptions()
-        if binary_path:
-            options.binary_location = binary_path
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        service = Service(executable_path=driver_path)
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        })
-
-        woocommerce_rows = []
+        profiles = self.load_profiles()
+        pool = self._browser_pool(driver_path, binary_path, headless)
+        driver = None
+
+        db_rows = storage.UpsertBuffer()
         n_ok = 0
         n_err = 0
+        n_unchanged = 0
+        self.checkpoint.begin("variantes", resume=bool(processed_ids))
 
+        retries = RetryQueue(self.checkpoint, "variantes")
+        fresh = ((i, id_url_map.get(i)) for i in ids_selectionnes if i not in processed_ids)
         total = len(ids_selectionnes)
-        self._log(f"\n🚀 Début du scraping de {total} liens...\n")
-        for idx, id_produit in enumerate(ids_selectionnes, start=1):
-            if id_produit in processed_ids:
-                continue
-            if should_stop():
-                self._log("⏹ Interruption demandée.")
-                progress_callback(100)
-                break
-            url = id_url_map.get(id_produit)
-            if not url:
-                self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
-                n_err += 1
-                continue
-
-            self._log(f"🔎 [{idx}/{len(ids_selectionnes)}] {id_produit} → {url}")
-            processed_ids.add(id_produit)
-            try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 3.5))
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);")
-                time.sleep(2)
-
-                product_name = driver.find_element(By.TAG_NAME, "h1").text.strip()
-                base_sku = re.sub(r'\W+', '-', product_name.lower()).strip("-")[:15].upper()
-                product_price = ""
-
-                for selector in ["sale-price.text-lg", ".price", ".product-price", ".woocommerce-Price-amount"]:
-                    try:
-                        elem = driver.find_element(By.CSS_SELECTOR, selector)
-                        if elem and elem.text.strip():
-                            match = re.search(r"([0-9]+(?:[\\.,][0-9]{2})?)", elem.text.strip())
-                            if match:
-                                product_price = match.group(1).replace(",", ".")
-                            break
-                    except Exception:
-                        continue
+        finished = total - sum(1 for i in ids_selectionnes if i not in processed_ids)
+        sink = self._open_results(self.fichier_excel, WOOCOMMERCE_COLUMNS)
 
-                variant_labels = driver.find_elements(By.CSS_SELECTOR, "label.color-swatch")
-                visible_labels = [label for label in variant_labels if label.is_displayed()]
-                variant_names = []
-
-                for label in visible_labels:
-                    try:
-                        name = label.find_element(By.CSS_SELECTOR, "span.sr-only").text.strip()
-                        variant_names.append(name)
-                    except Exception:
-                        continue
-
-                nom_dossier = self.clean_name(product_name).replace(" ", "-")
-                storage.upsert_product(
-                    id_produit,
-                    product_name,
-                    base_sku,
-                    product_price if len(variant_names) <= 1 else "",
-                    nom_dossier,
-                    self.base_dir,
-                )
-
-                if len(variant_names) <= 1:
-                    woocommerce_rows.append({
-                        "ID Produit": id_produit,
-                        "Type": "simple",
-                        "SKU": base_sku,
-                        "Name": product_name,
-                        "Regular price": product_price,
-                        "Nom du dossier": nom_dossier
-                    })
-                    storage.upsert_variant(
-                        id_produit,
-                        base_sku,
-                        "",
-                        product_price,
-                        self.base_dir,
-                    )
+        try:
+            self._log(f"\n🚀 Début du scraping de {total} liens...\n")
+            for id_produit, url in retries.iter_work(fresh, should_stop):
+                if not url:
+                    self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
+                    self.checkpoint.record("variantes", id_produit, "error", error=MISSING_ID)
+                    n_err += 1
+                    finished += 1
                     continue
 
-                woocommerce_rows.append({
-                    "ID Produit": id_produit,
-                    "Type": "variable",
-                    "SKU": base_sku,
-                    "Name": product_name,
-                    "Parent": "",
-                    "Attribute 1 name": "Couleur",
-                    "Attribute 1 value(s)": " | ".join(variant_names),
-                    "Attribute 1 default": variant_names[0],
-                    "Regular price": "",
-                    "Nom du dossier": nom_dossier
-                })
-
-                for v in variant_names:
-                    clean_v = re.sub(r'\W+', '', v).upper()
-                    child_sku = f"{base_sku}-{clean_v}"
-                    woocommerce_rows.append({
-                        "ID Produit": id_produit,
-                        "Type": "variation",
-                        "SKU": child_sku,
-                        "Name": "",
-                        "Parent": base_sku,
-                        "Attribute 1 name": "Couleur",
-                        "Attribute 1 value(s)": v,
-                        "Regular price": product_price,
-                        "Nom du dossier": nom_dossier
-                    })
-                    storage.upsert_variant(
-                        id_produit,
-                        child_sku,
-                        v,
-                        product_price,
-                        self.base_dir,
-                    )
-
-            except Exception as e:
-                self._log(f"❌ Erreur sur {url} → {e}\n")
-                n_err += 1
-                continue
-            else:
-                n_ok += 1
-
-            if progress_callback:
-                progress_callback(int(idx / total * 100))
-            self._save_checkpoint("variantes", list(processed_ids))
+                self._log(f"🔎 [{finished + 1}/{total}] {id_produit} → {url}")
+                processed_ids.add(id_produit)
+                profile = profiles.for_url(url)
+                meta = self._fetch_meta(url, incremental)
+                try:
+                    html = self._fetch_http(url, profile.product_required, meta)
+                    if html is NOT_MODIFIED:
+                        fields = None
+                    elif html is not None:
+                        fields = self._product_fields_from_html(html, profile)
+                    else:
+                        if driver is None:
+                            driver = pool.acquire()
+                        driver = self._load_page(pool, driver, url, profile.ready_selectors, block=True)
+                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);")
+                        # Let lazy-loaded blocks triggered by the scroll finish
+                        settle = {**self.page_wait_options, "timeout": 3.0}
+                        if wait_ready(driver, **settle) is False:
+                            self._log("⏳ Blocs différés encore en chargement après défilement")
+                        fields = self._product_fields_from_driver(driver, profile)
+                        self.fetcher.record_tier(url, BROWSER)
+                    if fields is None or (meta and not self._fields_changed(url, meta, *fields, buffer=db_rows)):
+                        self._log("⏭️ Produit inchangé")
+                        n_unchanged += 1
+                    else:
+                        sink.write_many(self._product_rows(id_produit, *fields, db_rows))
+                except Exception as e:
+                    self._log(f"❌ Erreur sur {url} → {e}\n")
+                    if self._schedule_retry(retries, id_produit, url, e):
+                        continue
+                    n_err += 1
+                else:
+                    n_ok += 1
+                    # Journaled once the product rows are committed
+                    db_rows.on_flush(partial(self.checkpoint.record, "variantes", id_produit, "done"))
 
-        driver.quit()
-        df = pd.DataFrame(woocommerce_rows)
-        df.to_excel(self.fichier_excel, index=False)
-        self._log(f"\n📁 Données sauvegardées dans : {self.fichier_excel}")
-        self._save_checkpoint("concurrents", [])
+                finished += 1
+                if progress_callback:
+                    progress_callback(int(finished / total * 100))
+            if should_stop():
+                self._log("⏹ Interruption demandée.")
+                progress_callback(100)
+        finally:
+            db_rows.flush()
+            self.checkpoint.flush()
+            if driver is not None:
+                pool.release(driver)
+            self._release_browser_pool()
+            self._close_product_rows(sink, n_unchanged)
+
+        self._end_step(retries, "concurrents")
         return n_ok, n_err
 
     async def _scrap_produits_par_ids_async(
@@ -508,129 +690,163 @@ class WooCommerceScraper(BaseScraper):
         progress_callback,
         should_stop,
         headless,
+        concurrency=None,
+        incremental=False,
     ):
         progress_callback = progress_callback or self._update_progress
+        profiles = self.load_profiles()
         processed_ids = set(processed_ids)
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless)
-            tasks = {}
-            for id_produit in ids_selectionnes:
-                if should_stop():
-                    break
-                if id_produit in processed_ids:
-                    continue
-                url = id_url_map.get(id_produit)
-                if not url:
-                    self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
-                    continue
-                task = asyncio.create_task(self.async_scrape_product(browser, url))
-                tasks[task] = (id_produit, url)
-
-            results = []
-            n_ok = 0
-            n_err = 0
-            total = len(tasks)
-            for idx, task in enumerate(asyncio.as_completed(tasks), start=1):
-                id_prod, url = tasks[task]
-                try:
-                    html = await task
-                    results.append((id_prod, html))
-                    n_ok += 1
-                except Exception as e:
-                    self._log(f"❌ Erreur sur {url} → {e}")
-                    n_err += 1
-                processed_ids.add(id_prod)
-                progress_callback(int(idx / total * 100))
-                self._save_checkpoint("variantes", list(processed_ids))
+        todo, missing = [], []
+        for id_produit in ids_selectionnes:
+            if id_produit in processed_ids:
+                continue
+            url = id_url_map.get(id_produit)
+            if not url:
+                self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
+                missing.append(id_produit)
+                continue
+            todo.append((id_produit, url))
+
+        db_rows = storage.UpsertBuffer()
+        sink = self._open_results(self.fichier_excel, WOOCOMMERCE_COLUMNS)
+        counts = {"ok": 0, "err": 0, "done": 0, "unchanged": 0}
+        total = len(todo)
+        self.checkpoint.begin("variantes", resume=bool(processed_ids))
+        for id_produit in missing:
+            self.checkpoint.record("variantes", id_produit, "error", error=MISSING_ID)
+        retries = RetryQueue(self.checkpoint, "variantes")
+
+        def on_result(id_produit, url, html, error):
+            retries.settle()
+            if error is not None:
+                self._log(f"❌ Erreur sur {url} → {error}")
+                if self._schedule_retry(retries, id_produit, url, error):
+                    return
+                counts["err"] += 1
+            else:
+                meta = self._fetch_meta(url, incremental)
+                fields = None if html is NOT_MODIFIED else self._product_fields_from_html(html, profiles.for_url(url))
+                if fields is None or (meta and not self._fields_changed(url, meta, *fields, buffer=db_rows)):
+                    counts["unchanged"] += 1
+                else:
+                    sink.write_many(self._product_rows(id_produit, *fields, db_rows))
+                counts["ok"] += 1
+                db_rows.on_flush(partial(self.checkpoint.record, "variantes", id_produit, "done"))
+            counts["done"] += 1
+            processed_ids.add(id_produit)
+            progress_callback(int(counts["done"] / total * 100))
 
-            await browser.close()
+        try:
+            with db_rows:
+                await self._run_async_scrape(
+                    retries.aiter_work(todo, should_stop), on_result, should_stop, headless, concurrency,
+                    lambda url: profiles.for_url(url).product_required, incremental,
+                )
+        finally:
+            self.checkpoint.flush()
+            self._close_product_rows(sink, counts["unchanged"])
+
+        self._end_step(retries, "concurrents")
+        return counts["ok"], counts["err"]
+
+    def _open_results(self, path, columns):
+        """Streaming sink for a results file in :attr:`results_format`."""
+        return result_sinks.open_sink(path, columns, self.results_format)
+
+    def _close_product_rows(self, sink, n_unchanged=0):
+        """Publish the WooCommerce rows of the products scraped in this run."""
+        if n_unchanged:
+            self._log(f"\n⏭️ {n_unchanged} produit(s) inchangé(s) ignoré(s)")
+            if not sink.count:
+                sink.discard()
+                self._log(f"📁 Aucun produit modifié, {sink.path} n'est pas réécrit")
+                return
+        sink.close()
+        self._log(f"\n📁 Données sauvegardées dans : {sink.path}")
 
-        woocommerce_rows = []
-        for id_produit, html in results:
-            soup = BeautifulSoup(html, "html.parser")
-            try:
-                product_name = soup.find("h1").get_text(strip=True)
-            except Exception:
-                product_name = ""
-            base_sku = re.sub(r"\W+", "-", product_name.lower()).strip("-")[:15].upper()
-            product_price = ""
-            for selector in ["sale-price.text-lg", ".price", ".product-price", ".woocommerce-Price-amount"]:
-                elem = soup.select_one(selector)
-                if elem and elem.text.strip():
-                    match = re.search(r"([0-9]+(?:[\\.,][0-9]{2})?)", elem.text.strip())
-                    if match:
-                        product_price = match.group(1).replace(",", ".")
-                    break
+    @staticmethod
+    def _product_fields_from_html(html, profile=DEFAULT_PROFILE):
+        """Return ``(name, price, variant names)`` from a raw product page."""
+        return profile.product_fields(html_parse.parse(html, profile.product_strainer))
 
-            variant_names = [e.get_text(strip=True) for e in soup.select("label.color-swatch span.sr-only")]
-            nom_dossier = self.clean_name(product_name).replace(" ", "-")
-            storage.upsert_product(
+    @staticmethod
+    def _product_fields_from_driver(driver, profile=DEFAULT_PROFILE):
+        """Read ``(name, price, variant names)`` from a Selenium page."""
+        fields = profile.extract_driver(driver)
+        product_name = fields.get("title", "")
+        if not product_name:
+            raise ValueError("Titre produit introuvable")
+        return product_name, parse_price(fields.get("price", "")), list(fields.get("swatches", []))
+
+    def _product_rows(self, id_produit, product_name, product_price, variant_names, buffer=None):
+        """Store a product and its variants, return its WooCommerce rows.
+
+        Database writes go to *buffer* (a :class:`storage.UpsertBuffer`) when
+        given, otherwise they are written immediately.
+        """
+        if buffer is None:
+            with storage.UpsertBuffer() as buffer:
+                return self._product_rows(id_produit, product_name, product_price, variant_names, buffer)
+        base_sku = re.sub(r"\W+", "-", product_name.lower()).strip("-")[:15].upper()
+        nom_dossier = self.clean_name(product_name).replace(" ", "-")
+        buffer.add_product(
+            id_produit,
+            product_name,
+            base_sku,
+            product_price if len(variant_names) <= 1 else "",
+            nom_dossier,
+        )
+
+        if len(variant_names) <= 1:
+            buffer.add_variant(
                 id_produit,
-                product_name,
                 base_sku,
-                product_price if len(variant_names) <= 1 else "",
-                nom_dossier,
-                self.base_dir,
+                "",
+                product_price,
             )
-
-            if len(variant_names) <= 1:
-                woocommerce_rows.append({
-                    "ID Produit": id_produit,
-                    "Type": "simple",
-                    "SKU": base_sku,
-                    "Name": product_name,
-                    "Regular price": product_price,
-                    "Nom du dossier": nom_dossier,
-                })
-                storage.upsert_variant(
-                    id_produit,
-                    base_sku,
-                    "",
-                    product_price,
-                    self.base_dir,
-                )
-                continue
-
-            woocommerce_rows.append({
+            return [{
                 "ID Produit": id_produit,
-                "Type": "variable",
+                "Type": "simple",
                 "SKU": base_sku,
                 "Name": product_name,
-                "Parent": "",
+                "Regular price": product_price,
+                "Nom du dossier": nom_dossier,
+            }]
+
+        rows = [{
+            "ID Produit": id_produit,
+            "Type": "variable",
+            "SKU": base_sku,
+            "Name": product_name,
+            "Parent": "",
+            "Attribute 1 name": "Couleur",
+            "Attribute 1 value(s)": " | ".join(variant_names),
+            "Attribute 1 default": variant_names[0] if variant_names else "",
+            "Regular price": "",
+            "Nom du dossier": nom_dossier,
+        }]
+
+        for v in variant_names:
+            clean_v = re.sub(r"\W+", "", v).upper()
+            child_sku = f"{base_sku}-{clean_v}"
+            rows.append({
+                "ID Produit": id_produit,
+                "Type": "variation",
+                "SKU": child_sku,
+                "Name": "",
+                "Parent": base_sku,
                 "Attribute 1 name": "Couleur",
-                "Attribute 1 value(s)": " | ".join(variant_names),
-                "Attribute 1 default": variant_names[0] if variant_names else "",
-                "Regular price": "",
+                "Attribute 1 value(s)": v,
+                "Regular price": product_price,
                 "Nom du dossier": nom_dossier,
             })
-
-            for v in variant_names:
-                clean_v = re.sub(r"\W+", "", v).upper()
-                child_sku = f"{base_sku}-{clean_v}"
-                woocommerce_rows.append({
-                    "ID Produit": id_produit,
-                    "Type": "variation",
-                    "SKU": child_sku,
-                    "Name": "",
-                    "Parent": base_sku,
-                    "Attribute 1 name": "Couleur",
-                    "Attribute 1 value(s)": v,
-                    "Regular price": product_price,
-                    "Nom du dossier": nom_dossier,
-                })
-                storage.upsert_variant(
-                    id_produit,
-                    child_sku,
-                    v,
-                    product_price,
-                    self.base_dir,
-                )
-
-        df = pd.DataFrame(woocommerce_rows)
-        df.to_excel(self.fichier_excel, index=False)
-        self._log(f"\n📁 Données sauvegardées dans : {self.fichier_excel}")
-        self._save_checkpoint("concurrents", [])
-        return n_ok, n_err
+            buffer.add_variant(
+                id_produit,
+                child_sku,
+                v,
+                product_price,
+            )
+        return rows
 
 # === SCRAPING FICHES CONCURRENTS ===
     def scrap_fiches_concurrents(
@@ -644,7 +860,14 @@ class WooCommerceScraper(BaseScraper):
         should_stop=lambda: False,
         headless=True,
         concurrent=False,
+        concurrency=None,
+        incremental=False,
     ):
+        """Save the description of each competitor page to a text file.
+
+        With *incremental*, fiches whose page answered 304 or whose saved
+        content would be identical are left untouched.
+        """
         if concurrent:
             return asyncio.run(
                 self._scrap_fiches_concurrents_async(
@@ -654,137 +877,141 @@ class WooCommerceScraper(BaseScraper):
                     progress_callback,
                     should_stop,
                     headless,
+                    concurrency,
+                    incremental,
                 )
             )
 
         processed_ids = set(processed_ids or [])
 
-        driver_path = driver_path or self.chrome_driver_path
+        driver_path = self._resolve_driver_path(driver_path)
         binary_path = binary_path or self.chrome_binary_path
         if not driver_path:
-            try:
-                driver_path = ChromeDriverManager().install()
-            except Exception as e:
-                self._log(f"❌ Impossible de télécharger ChromeDriver : {e}")
-                self._log("➡️ Spécifiez CHROME_DRIVER_PATH pour un mode hors-ligne.")
-                return 0, len(ids_selectionnes)
+            return 0, len(ids_selectionnes)
         progress_callback = progress_callback or self._update_progress
-        service = Service(executable_path=driver_path)
-        options = webdriver.ChromeOptions()
-        if binary_path:
-            options.binary_location = binary_path
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        if headless:
-            options.add_argument("--headless")
-
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
-            "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
-        })
+        profiles = self.load_profiles()
+        pool = self._browser_pool(driver_path, binary_path, headless)
+        driver = None
 
         os.makedirs(self.save_directory, exist_ok=True)
-        recap_data = []
+        recap_sink = self._open_results(self.recap_excel_path, RECAP_COLUMNS)
         n_ok = 0
         n_err = 0
         total = len(ids_selectionnes)
-        for idx, id_produit in enumerate(ids_selectionnes, start=1):
-            if id_produit in processed_ids:
-                continue
-            if should_stop():
-                self._log("⏹ Interruption demandée.")
-                progress_callback(100)
-                break
-            url = id_url_map.get(id_produit)
-            if not url:
-                self._log(f"\n❌ ID introuvable dans le fichier : {id_produit}")
-                recap_data.append(("?", "?", id_produit, "ID non trouvé"))
-                n_err += 1
-                continue
-
-            self._log(f"\n📦 {idx} / {total}")
-            self._log(f"🔗 {url} — ")
+        self.checkpoint.begin("concurrents", resume=bool(processed_ids))
+        retries = RetryQueue(self.checkpoint, "concurrents")
+        fresh = ((i, id_url_map.get(i)) for i in ids_selectionnes if i not in processed_ids)
+        finished = total - sum(1 for i in ids_selectionnes if i not in processed_ids)
+        try:
+            for id_produit, url in retries.iter_work(fresh, should_stop):
+                if not url:
+                    self._log(f"\n❌ ID introuvable dans le fichier : {id_produit}")
+                    recap_sink.write(("?", "?", id_produit, "ID non trouvé"))
+                    self.checkpoint.record("concurrents", id_produit, "error", error=MISSING_ID)
+                    n_err += 1
+                    finished += 1
+                    continue
 
-            processed_ids.add(id_produit)
-            try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 4.2))  # anti-bot
+                self._log(f"\n📦 {finished + 1} / {total}")
+                self._log(f"🔗 {url} — ")
 
-                html = driver.page_source
-                soup = BeautifulSoup(html, "html.parser")
+                processed_ids.add(id_produit)
+                profile = profiles.for_url(url)
+                meta = self._fiche_meta(url, incremental)
+                try:
+                    html = self._fetch_http(url, profile.fiche_required, meta)
+                    if html is NOT_MODIFIED:
+                        self._log("⏭️ Fiche inchangée (304)")
+                        recap_sink.write(("?", "?", url, FICHE_UNCHANGED))
+                        n_ok += 1
+                        self.checkpoint.record("concurrents", id_produit, "done")
+                        finished += 1
+                        progress_callback(int(finished / total * 100))
+                        continue
+                    from_browser = html is None
+                    if from_browser:
+                        if driver is None:
+                            driver = pool.acquire()
+                        driver = self._load_page(pool, driver, url, profile.ready_selectors, block=True)
+                        html = driver.page_source
+                    soup = html_parse.parse(html, profile.fiche_strainer)
+
+                    title_tag, description_div = profile.fiche_parts(soup)
+                    if not title_tag:
+                        raise Exception("❌ Titre produit introuvable")
+                    title = title_tag.get_text(strip=True)
+                    filename = self.clean_filename(title) + ".txt"
+                    txt_path = os.path.join(self.save_directory, filename)
+
+                    if not description_div:
+                        raise Exception("❌ Description introuvable")
+
+                    def convert_links(tag):
+                        for a in tag.find_all("a", href=True):
+                            text = a.get_text(strip=True)
+                            href = a['href']
+                            markdown = f"[{text}]({href})"
+                            a.replace_with(markdown)
+
+                    convert_links(description_div)
+                    raw_html = str(description_div)
+
+                    txt_content = f"<h1>{title}</h1>\n\n{raw_html}"
+                    if meta and not self._fields_changed(url, meta, txt_content) and os.path.exists(txt_path):
+                        self._log(f"⏭️ Fiche inchangée ({filename})")
+                        recap_sink.write((filename, title, url, FICHE_UNCHANGED))
+                        n_ok += 1
+                        self.checkpoint.record("concurrents", id_produit, "done", output_path=txt_path)
+                        finished += 1
+                        progress_callback(int(finished / total * 100))
+                        continue
+                    with open(txt_path, "w", encoding="utf-8") as f2:
+                        f2.write(txt_content)
 
-                title_tag = (
-                    soup.find("h1", class_="product-single__title") or
-                    soup.find("h1", class_="product-info__title") or
-                    soup.find("h1")
-                )
-                if not title_tag:
-                    raise Exception("❌ Titre produit introuvable")
-                title = title_tag.get_text(strip=True)
-                filename = self.clean_filename(title) + ".txt"
-                txt_path = os.path.join(self.save_directory, filename)
-
-                description_div = None
-                description_div = soup.find("div", {"id": "product_description"})
-                if not description_div:
-                    container = soup.find("div", class_="accordion__content")
-                    if container:
-                        description_div = container.find("div", class_="prose")
-                if not description_div:
-                    description_div = soup.find("div", class_="prose")
-                if not description_div:
-                    raise Exception("❌ Description introuvable")
-
-                def convert_links(tag):
-                    for a in tag.find_all("a", href=True):
-                        text = a.get_text(strip=True)
-                        href = a['href']
-                        markdown = f"[{text}]({href})"
-                        a.replace_with(markdown)
-
-                convert_links(description_div)
-                raw_html = str(description_div)
-
-                txt_content = f"<h1>{title}</h1>\n\n{raw_html}"
-                with open(txt_path, "w", encoding="utf-8") as f2:
-                    f2.write(txt_content)
-
-                self._log(f"✅ Extraction OK ({filename})")
-                storage.record_competitor(
-                    id_produit,
-                    title,
-                    url,
-                    txt_path,
-                    "OK",
-                    self.base_dir,
-                )
-                recap_data.append((filename, title, url, "Extraction OK"))
-                n_ok += 1
-            except Exception as e:
-                self._log(f"❌ Extraction Échec — {str(e)}")
-                storage.record_competitor(
-                    id_produit,
-                    "",
-                    url,
-                    "",
-                    "Erreur",
-                    self.base_dir,
-                )
-                recap_data.append(("?", "?", url, "Extraction Échec"))
-                n_err += 1
+                    self._log(f"✅ Extraction OK ({filename})")
+                    if from_browser:
+                        self.fetcher.record_tier(url, BROWSER)
+                    storage.record_competitor(
+                        id_produit,
+                        title,
+                        url,
+                        txt_path,
+                        "OK",
+                    )
+                    recap_sink.write((filename, title, url, "Extraction OK"))
+                    n_ok += 1
+                    self.checkpoint.record("concurrents", id_produit, "done", output_path=txt_path)
+                except Exception as e:
+                    self._log(f"❌ Extraction Échec — {str(e)}")
+                    if self._schedule_retry(retries, id_produit, url, e):
+                        continue
+                    storage.record_competitor(
+                        id_produit,
+                        "",
+                        url,
+                        "",
+                        "Erreur",
+                    )
+                    recap_sink.write(("?", "?", url, "Extraction Échec"))
+                    n_err += 1
 
-            if progress_callback:
-                progress_callback(int(idx / total * 100))
-            self._save_checkpoint("concurrents", list(processed_ids))
+                finished += 1
+                if progress_callback:
+                    progress_callback(int(finished / total * 100))
+            if should_stop():
+                self._log("⏹ Interruption demandée.")
+                progress_callback(100)
+        finally:
+            self.checkpoint.flush()
+            if driver is not None:
+                pool.release(driver)
+            self._release_browser_pool()
+            recap_sink.close()
 
-        df = pd.DataFrame(recap_data, columns=["Nom du fichier", "H1", "Lien", "Statut"])
-        df.to_excel(self.recap_excel_path, index=False)
-        driver.quit()
         self._log("\n🎉 Extraction terminée. Résultats enregistrés dans :")
         self._log(f"- 📁 Fiches : {self.save_directory}")
-        self._log(f"- 📊 Récapitulatif : {self.recap_excel_path}")
-        self._save_checkpoint("json", [])
+        self._log(f"- 📊 Récapitulatif : {recap_sink.path}")
+        self._end_step(retries, "json")
         return n_ok, n_err
 
     async def _scrap_fiches_concurrents_async(
@@ -795,184 +1022,138 @@ class WooCommerceScraper(BaseScraper):
         progress_callback,
         should_stop,
         headless,
+        concurrency=None,
+        incremental=False,
     ):
         progress_callback = progress_callback or self._update_progress
+        profiles = self.load_profiles()
         processed_ids = set(processed_ids)
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless)
-            tasks = {}
-            for id_produit in ids_selectionnes:
-                if should_stop():
-                    break
-                if id_produit in processed_ids:
-                    continue
-                url = id_url_map.get(id_produit)
-                if not url:
-                    self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
-                    continue
-                task = asyncio.create_task(self.async_scrape_product(browser, url))
-                tasks[task] = (id_produit, url)
-
-            results = []
-            n_ok = 0
-            n_err = 0
-            total = len(tasks)
-            for idx, task in enumerate(asyncio.as_completed(tasks), start=1):
-                id_prod, url = tasks[task]
-                try:
-                    html = await task
-                    results.append((id_prod, url, html))
-                    n_ok += 1
-                except Exception as e:
-                    self._log(f"❌ Extraction Échec — {e}")
-                    results.append((id_prod, url, None))
-                    n_err += 1
-                processed_ids.add(id_prod)
-                progress_callback(int(idx / total * 100))
-                self._save_checkpoint("concurrents", list(processed_ids))
-
-            await browser.close()
-
-        os.makedirs(self.save_directory, exist_ok=True)
-        recap_data = []
-        for id_produit, url, html in results:
-            if html is None:
-                storage.record_competitor(
-                    id_produit,
-                    "",
-                    url,
-                    "",
-                    "Erreur",
-                    self.base_dir,
-                )
-                recap_data.append(("?", "?", url, "Extraction Échec"))
-                continue
-            soup = BeautifulSoup(html, "html.parser")
-            title_tag = (
-                soup.find("h1", class_="product-single__title")
-                or soup.find("h1", class_="product-info__title")
-                or soup.find("h1")
-            )
-            if not title_tag:
-                storage.record_competitor(
-                    id_produit,
-                    "",
-                    url,
-                    "",
-                    "Titre introuvable",
-                    self.base_dir,
-                )
-                recap_data.append(("?", "?", url, "Titre introuvable"))
+        todo, missing = [], []
+        for id_produit in ids_selectionnes:
+            if id_produit in processed_ids:
                 continue
-            title = title_tag.get_text(strip=True)
-            filename = self.clean_filename(title) + ".txt"
-            txt_path = os.path.join(self.save_directory, filename)
-
-            description_div = (
-                soup.find("div", {"id": "product_description"})
-                or (soup.find("div", class_="accordion__content") or {}).find("div", class_="prose")
-                or soup.find("div", class_="prose")
-            )
-            if not description_div:
-                storage.record_competitor(
-                    id_produit,
-                    title,
-                    url,
-                    "",
-                    "Description introuvable",
-                    self.base_dir,
-                )
-                recap_data.append(("?", title, url, "Description introuvable"))
+            url = id_url_map.get(id_produit)
+            if not url:
+                self._log(f"❌ ID introuvable dans le fichier : {id_produit}")
+                missing.append(id_produit)
                 continue
+            todo.append((id_produit, url))
 
-            for a in description_div.find_all("a", href=True):
-                text = a.get_text(strip=True)
-                href = a["href"]
-                a.replace_with(f"[{text}]({href})")
-
-            txt_content = f"<h1>{title}</h1>\n\n{description_div}"
-            with open(txt_path, "w", encoding="utf-8") as f:
-                f.write(txt_content)
+        os.makedirs(self.save_directory, exist_ok=True)
+        recap_sink = self._open_results(self.recap_excel_path, RECAP_COLUMNS)
+        counts = {"ok": 0, "err": 0, "done": 0}
+        total = len(todo)
+        self.checkpoint.begin("concurrents", resume=bool(processed_ids))
+        for id_produit in missing:
+            self.checkpoint.record("concurrents", id_produit, "error", error=MISSING_ID)
+        retries = RetryQueue(self.checkpoint, "concurrents")
+
+        def on_result(id_produit, url, html, error):
+            retries.settle()
+            if error is not None:
+                self._log(f"❌ Extraction Échec — {error}")
+                if self._schedule_retry(retries, id_produit, url, error):
+                    return
+                storage.record_competitor(id_produit, "", url, "", "Erreur")
+                recap_sink.write(("?", "?", url, "Extraction Échec"))
+                counts["err"] += 1
+            else:
+                if html is NOT_MODIFIED:
+                    recap = ("?", "?", url, FICHE_UNCHANGED)
+                else:
+                    recap = self._save_fiche_from_html(
+                        id_produit, url, html, meta=self._fetch_meta(url, incremental)
+                    )
+                if recap[3] in ("Extraction OK", FICHE_UNCHANGED):
+                    counts["ok"] += 1
+                    path = os.path.join(self.save_directory, recap[0]) if recap[0] != "?" else None
+                    self.checkpoint.record("concurrents", id_produit, "done", output_path=path)
+                elif self._schedule_retry(retries, id_produit, url, LookupError(recap[3])):
+                    return
+                else:
+                    title = recap[1] if recap[1] != "?" else ""
+                    storage.record_competitor(id_produit, title, url, "", recap[3])
+                    counts["err"] += 1
+                recap_sink.write(recap)
+            counts["done"] += 1
+            processed_ids.add(id_produit)
+            progress_callback(int(counts["done"] / total * 100))
 
-            storage.record_competitor(
-                id_produit,
-                title,
-                url,
-                txt_path,
-                "OK",
-                self.base_dir,
+        try:
+            await self._run_async_scrape(
+                retries.aiter_work(todo, should_stop), on_result, should_stop, headless, concurrency,
+                lambda url: profiles.for_url(url).fiche_required, incremental, self._fiche_meta,
             )
-            recap_data.append((filename, title, url, "Extraction OK"))
+        finally:
+            self.checkpoint.flush()
+            recap_sink.close()
 
-        df = pd.DataFrame(recap_data, columns=["Nom du fichier", "H1", "Lien", "Statut"])
-        df.to_excel(self.recap_excel_path, index=False)
         self._log("\n🎉 Extraction terminée. Résultats enregistrés dans :")
         self._log(f"- 📁 Fiches : {self.save_directory}")
-        self._log(f"- 📊 Récapitulatif : {self.recap_excel_path}")
-        self._save_checkpoint("json", [])
-        return n_ok, n_err
+        self._log(f"- 📊 Récapitulatif : {recap_sink.path}")
+        self._end_step(retries, "json")
+        return counts["ok"], counts["err"]
+
+    def _save_fiche_from_html(self, id_produit, url, html, profile=None, meta=None):
+        """Extract and save a competitor description, return its recap row.
+
+        With the fetch *meta* of an incremental run, an existing file whose
+        content did not change is kept as is.  A page missing its title or
+        description is not recorded: the caller may still retry it.
+        """
+        profile = profile or self.profiles.for_url(url)
+        soup = html_parse.parse(html, profile.fiche_strainer)
+        title_tag, description_div = profile.fiche_parts(soup)
+        if not title_tag:
+            return ("?", "?", url, "Titre introuvable")
+        title = title_tag.get_text(strip=True)
+        filename = self.clean_filename(title) + ".txt"
+        txt_path = os.path.join(self.save_directory, filename)
+
+        if not description_div:
+            return ("?", title, url, "Description introuvable")
+
+        for a in description_div.find_all("a", href=True):
+            text = a.get_text(strip=True)
+            href = a["href"]
+            a.replace_with(f"[{text}]({href})")
+
+        txt_content = f"<h1>{title}</h1>\n\n{description_div}"
+        if meta and not self._fields_changed(url, meta, txt_content) and os.path.exists(txt_path):
+            return (filename, title, url, FICHE_UNCHANGED)
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(txt_content)
+
+        storage.record_competitor(id_produit, title, url, txt_path, "OK")
+        return (filename, title, url, "Extraction OK")
 
 # === EXPORT JSON PAR BATCH ===
-    def export_fiches_concurrents_json(self, taille_batch=50, progress_callback=None, should_stop=lambda: False):
+    def export_fiches_concurrents_json(
+        self, taille_batch=50, progress_callback=None, should_stop=lambda: False, format="json"
+    ):
+        """Export the descriptions to ``batch_N.json`` (or ``.ndjson``) files.
+
+        Only batches whose fiches changed since the previous export are
+        rewritten, see :mod:`fiche_export`.
+        """
         progress_callback = progress_callback or self._update_progress
         dossier_source = self.save_directory
         dossier_sortie = self.json_dir if self.json_dir else os.path.join(dossier_source, "batches_json")
-        os.makedirs(dossier_sortie, exist_ok=True)
-        fichiers_txt = [f for f in os.listdir(dossier_source) if f.endswith(".txt")]
-        fichiers_txt.sort()
-        total = len(fichiers_txt)
-        id_global = 1
-
-        def extraire_h1(html):
-            match = re.search(r"<h1[^>]*>(.*?)</h1>", html, re.IGNORECASE | re.DOTALL)
-            return match.group(1).strip() if match else ""
-
-        processed = 0
-        nb_fichiers = 0
-        for i in range(0, len(fichiers_txt), taille_batch):
-            if should_stop():
-                self._log("⏹ Interruption demandée.")
-                progress_callback(100)
-                break
-            batch = fichiers_txt[i:i+taille_batch]
-            data_batch = []
-
-            nb_fichiers += 1
-            self._log(f"\n🔹 Batch {nb_fichiers} : {len(batch)} fichier(s)")
-            for fichier in batch:
-                if should_stop():
-                    progress_callback(100)
-                    break
-                chemin = os.path.join(dossier_source, fichier)
-                try:
-                    with open(chemin, "r", encoding="utf-8") as f:
-                        contenu = f.read()
-                    h1 = extraire_h1(contenu)
-                    id_source = os.path.splitext(fichier)[0]
-                    data_batch.append({
-                        "id": id_global,
-                        "id_source": id_source,
-                        "nom": fichier,
-                        "h1": h1,
-                        "html": contenu.strip()
-                    })
-                    self._log(f"  ✅ {fichier} — h1: {h1[:50]}...")
-                except Exception as e:
-                    self._log(f"  ⚠️ Erreur lecture {fichier}: {e}")
-                    continue
-                id_global += 1
-                processed += 1
-                if progress_callback:
-                    progress_callback(int(processed / total * 100))
-
-            nom_fichier_sortie = f"batch_{i//taille_batch + 1}.json"
-            chemin_sortie = os.path.join(dossier_sortie, nom_fichier_sortie)
-            with open(chemin_sortie, "w", encoding="utf-8") as f_json:
-                json.dump(data_batch, f_json, ensure_ascii=False, indent=2)
-
-        self._log(f"    ➡️ Batch sauvegardé : {nom_fichier_sortie} ({len(batch)} produits)")
+        nb_ecrits, nb_batches = fiche_export.export_batches(
+            dossier_source,
+            dossier_sortie,
+            batch_size=taille_batch,
+            fmt=format,
+            log=self._log,
+            progress_callback=progress_callback,
+            should_stop=should_stop,
+        )
+        if should_stop():
+            progress_callback(100)
 
-        self._log(f"\n✅ Export JSON terminé : {nb_fichiers} fichier(s) généré(s) dans : {dossier_sortie}")
+        self._log(
+            f"\n✅ Export JSON terminé : {nb_ecrits}/{nb_batches} batch(s) mis à jour dans : {dossier_sortie}"
+        )
         self._clear_checkpoint()
 
     # === SCRAPING IMAGES ===
@@ -992,146 +1173,306 @@ class WooCommerceScraper(BaseScraper):
         min_height=0,
         min_ratio=0.0,
         file_type="",
+        near_duplicate_distance=0,
+        workers=1,
     ):
-        driver_path = driver_path or self.chrome_driver_path
+        """Download the gallery of every product page of *urls*.
+
+        With *workers* > 1 the URLs are split across as many processes,
+        each driving its own browser, see :meth:`_scrap_images_parallel`.
+        """
+        driver_path = self._resolve_driver_path(driver_path)
         binary_path = binary_path or self.chrome_binary_path
         if not driver_path:
-            try:
-                driver_path = ChromeDriverManager().install()
-            except Exception as e:
-                self._log(f"❌ Impossible de télécharger ChromeDriver : {e}")
-                self._log("➡️ Spécifiez CHROME_DRIVER_PATH pour un mode hors-ligne.")
-                return "Erreur téléchargement ChromeDriver"
+            return "Erreur téléchargement ChromeDriver"
+        options = dict(
+            suffix=suffix,
+            headless=headless,
+            collect_only=collect_only,
+            min_width=min_width,
+            min_height=min_height,
+            min_ratio=min_ratio,
+            file_type=file_type,
+            near_duplicate_distance=near_duplicate_distance,
+        )
         progress_callback = progress_callback or self._update_progress
-
-        options = webdriver.ChromeOptions()
-        if binary_path:
-            options.binary_location = binary_path
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        if headless:
-            options.add_argument("--headless")
-        service = Service(executable_path=driver_path)
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_cdp_cmd(
-            "Page.addScriptToEvaluateOnNewDocument",
-            {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"},
+        if workers and workers > 1 and len(urls) > 1:
+            return self._scrap_images_parallel(
+                urls, dest_folder, min(workers, len(urls)), driver_path, binary_path,
+                progress_callback, preview_callback, should_stop, options,
+            )
+        return self._scrap_images(
+            urls, dest_folder, driver_path, binary_path, progress_callback, preview_callback, should_stop, **options
         )
 
+    def _scrap_images_parallel(self, urls, dest_folder, workers, driver_path, binary_path,
+                               progress_callback, preview_callback, should_stop, options):
+        """Run :meth:`scrap_images` on *workers* shards of *urls* in processes.
+
+        The shared state is prepared once here: the journal step is reset
+        and the hash index of *dest_folder* synced.  Shards then check the
+        digests of their downloads against that index, so an image found by
+        two processes is saved once.  Near-duplicates are only checked
+        against the images indexed before the run and those of the same
+        shard: two shards may each keep a slightly different copy of a
+        picture.  Logs, previews and progress come back through a queue;
+        progress is the average of the shards weighted by their size.
+        """
+        os.makedirs(dest_folder, exist_ok=True)
+        self.checkpoint.forget("images")
+        if not options["collect_only"]:
+            distance = options["near_duplicate_distance"]
+            storage.sync_image_index(dest_folder, perceptual=bool(distance) and image_similarity.available())
+        shards = [urls[k::workers] for k in range(workers)]
+        settings = {
+            "base_dir": self.base_dir,
+            "driver_path": driver_path,
+            "binary_path": binary_path,
+            **{name: getattr(self, name) for name in _SHARD_SETTINGS},
+        }
+        ctx = multiprocessing.get_context("spawn")
+        events = ctx.Queue()
+        stop = ctx.Event()
+        processes = [
+            ctx.Process(
+                target=_scrap_images_shard,
+                args=(k, shard, dest_folder, settings, options, events, stop),
+                name=f"images-{k}",
+            )
+            for k, shard in enumerate(shards)
+        ]
+        self._log(f"🚀 {len(urls)} produit(s) répartis sur {workers} processus")
+        for process in processes:
+            process.start()
+
+        progress = [0] * workers
+        running = workers
+        try:
+            while running:
+                if should_stop():
+                    stop.set()
+                try:
+                    kind, k, value = events.get(timeout=0.2)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processes):
+                        self._log("❌ Un processus d'images s'est arrêté sans terminer")
+                        break
+                    continue
+                if kind == "log":
+                    self._log(value)
+                elif kind == "progress":
+                    progress[k] = value
+                    progress_callback(int(sum(p * len(s) for p, s in zip(progress, shards)) / len(urls)))
+                elif kind == "preview":
+                    if preview_callback:
+                        preview_callback(*value)
+                elif kind == "done":
+                    running -= 1
+        finally:
+            if running:
+                stop.set()
+            for process in processes:
+                process.join()
+        progress_callback(100)
+        return "Scraping images terminé"
+
+    def _scrap_images(
+        self,
+        urls,
+        dest_folder,
+        driver_path,
+        binary_path,
+        progress_callback,
+        preview_callback=None,
+        should_stop=lambda: False,
+        suffix="image-produit",
+        headless=True,
+        collect_only=False,
+        min_width=0,
+        min_height=0,
+        min_ratio=0.0,
+        file_type="",
+        near_duplicate_distance=0,
+        shard=None,
+    ):
+        """Scrape images of *urls* in this process.
+
+        A *shard* number means the run is one of several processes sharing
+        *dest_folder*: the index was synced by the parent and each saved
+        digest is claimed in it first.
+        """
+        profiles = self.load_profiles()
+        pool = self._browser_pool(driver_path, binary_path, headless)
+        driver = pool.acquire()
+
         os.makedirs(dest_folder, exist_ok=True)
         failed = []
         total = len(urls)
-        def file_hash(path):
-            h = hashlib.sha256()
-            with open(path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            return h.hexdigest()
-
+        if shard is None:
+            self.checkpoint.forget("images")
+        retries = RetryQueue(self.checkpoint, "images")
+        finished = 0
         existing_hashes = set()
+        near_tree = None
         if not collect_only:
-            for root, _, files in os.walk(dest_folder):
-                for f in files:
-                    fp = os.path.join(root, f)
-                    try:
-                        existing_hashes.add(file_hash(fp))
-                    except Exception:
-                        pass
-        for idx, url in enumerate(urls, start=1):
-            if should_stop():
-                self._log("⏹ Interruption demandée.")
-                progress_callback(100)
-                break
-            self._log(f"\n🔍 Produit {idx}/{total} : {url}")
-            if idx > 1 and idx % 25 == 0:
-                self._log("🔄 Redémarrage du navigateur pour libérer la mémoire...")
-                driver.quit()
-                time.sleep(3)
-                driver = webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
-                driver.execute_cdp_cmd(
-                    "Page.addScriptToEvaluateOnNewDocument",
-                    {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"},
-                )
-
-            try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 4.5))
-
-                raw_title = driver.title.strip().split("|")[0].strip()
-                folder_name = self.clean_filename(raw_title)
-                folder = os.path.join(dest_folder, folder_name)
-                os.makedirs(folder, exist_ok=True)
-
-                images = driver.find_elements(By.CSS_SELECTOR, ".product-gallery__media img")
-                self._log(f"🖼️ {len(images)} image(s) trouvée(s)")
-
-                for i, img in enumerate(images):
-                    if should_stop():
-                        progress_callback(100)
-                        break
-                    src = img.get_attribute("src")
-                    if not src:
+            perceptual = bool(near_duplicate_distance) and image_similarity.available()
+            if near_duplicate_distance and not perceptual:
+                self._log("⚠️ Pillow absent : détection des quasi-doublons désactivée.")
+            if shard is None:
+                existing_hashes = storage.sync_image_index(dest_folder, perceptual=perceptual)
+            else:
+                existing_hashes = storage.image_digests(dest_folder)
+            if perceptual:
+                near_tree = BKTree(storage.image_phashes(dest_folder))
+        downloader = ImageDownloader(**self.image_download_options)
+        pending = None
+        wanted_type = (image_probe.normalize_type(file_type) or file_type.lower()) if file_type else None
+
+        def acceptable(info):
+            """Apply the type and size filters to a probed image header."""
+            if wanted_type and info.format and info.format != wanted_type:
+                return False
+            w, h = info.width, info.height
+            if w is None or h is None:
+                return True
+            if (min_width and w < min_width) or (min_height and h < min_height):
+                return False
+            if min_ratio and h and (w / h) < min_ratio:
+                return False
+            return True
+
+        probe = acceptable if (wanted_type or min_width or min_height or min_ratio) else None
+
+        def finish(job, final=False):
+            """Filter, deduplicate and rename the downloads of one product.
+
+            A product with failed downloads is queued again as a whole, unless
+            it is the *final* one; the images already saved are then skipped
+            as duplicates.
+            """
+            page_url, folder, folder_name, downloads = job
+            errors = []
+            for i, src, temp_path, future in downloads:
+                if should_stop():
+                    future.cancel()
+                    if future.done() and not future.cancelled() and os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    continue
+                try:
+                    if future.result() is None:
                         continue
-                    try:
-                        temp_path = os.path.join(folder, f"temp_{i}.webp")
-                        urllib.request.urlretrieve(src, temp_path)
 
+                    info = image_probe.probe_file(temp_path)
+                    if info is None or info.width is None:
                         qimg = QImage(temp_path)
-                        w, h = qimg.width(), qimg.height()
-                        if (min_width and w < min_width) or (min_height and h < min_height):
-                            os.remove(temp_path)
-                            continue
-                        if min_ratio and h and (w / h) < min_ratio:
-                            os.remove(temp_path)
-                            continue
-                        ext = os.path.splitext(urlparse(src).path)[1].lower().lstrip(".")
-                        if file_type and ext != file_type.lower():
-                            os.remove(temp_path)
-                            continue
+                        info = image_probe.ImageInfo(
+                            info.format if info else image_probe.url_type(src),
+                            qimg.width(),
+                            qimg.height(),
+                        )
+                    if not acceptable(info):
+                        os.remove(temp_path)
+                        continue
 
-                        name = os.path.splitext(os.path.basename(urlparse(src).path))[0]
-                        name = re.sub(r"-\d{3,4}", "", name)
-                        name = re.sub(r"[-]+", "-", name).strip("-")
-                        alt_text = f"{name.replace('-', ' ')} – {suffix}"
-                        filename = self.clean_filename(alt_text) + ".webp"
-                        final_path = os.path.join(folder, filename)
+                    name = os.path.splitext(os.path.basename(urlparse(src).path))[0]
+                    name = re.sub(r"-\d{3,4}", "", name)
+                    name = re.sub(r"[-]+", "-", name).strip("-")
+                    alt_text = f"{name.replace('-', ' ')} – {suffix}"
+                    filename = self.clean_filename(alt_text) + ".webp"
+                    final_path = os.path.join(folder, filename)
 
-                        if collect_only:
-                            if preview_callback:
-                                preview_callback(temp_path, final_path)
-                            continue
+                    if collect_only:
+                        if preview_callback:
+                            preview_callback(temp_path, final_path)
+                        continue
 
-                        file_h = file_hash(temp_path)
-                        if file_h in existing_hashes:
+                    file_h = storage.file_hash(temp_path)
+                    if file_h in existing_hashes:
+                        os.remove(temp_path)
+                        self._log(f"   ↳ Doublon ignoré → {filename}")
+                        continue
+                    phash = None
+                    if near_tree is not None:
+                        phash = image_similarity.dhash(temp_path)
+                        if phash is not None and near_tree.find(phash, near_duplicate_distance):
                             os.remove(temp_path)
-                            self._log(f"   ↳ Doublon ignoré → {filename}")
+                            self._log(f"   ↳ Quasi-doublon ignoré → {filename}")
                             continue
-                        existing_hashes.add(file_h)
-
-                        if os.path.exists(final_path):
-                            os.remove(final_path)
-                        os.rename(temp_path, final_path)
-
-                        self._log(f"   ✅ Image {i+1} → {filename}")
-                        self._log(f"      ↪️ Texte ALT : {alt_text}")
-                        if preview_callback:
-                            preview_callback(final_path, None)
-                        time.sleep(random.uniform(1, 2))
-                    except Exception as img_err:
-                        self._log(f"   ❌ Échec de téléchargement pour image {i+1} : {img_err}")
-                        failed.append((url, src))
+                    # Claimed last so a rejected download leaves no index row
+                    if shard is not None and not storage.claim_image_digest(final_path, file_h):
+                        os.remove(temp_path)
+                        self._log(f"   ↳ Doublon ignoré → {filename}")
+                        continue
+                    existing_hashes.add(file_h)
+
+                    if os.path.exists(final_path):
+                        os.remove(final_path)
+                    os.rename(temp_path, final_path)
+                    if phash is not None:
+                        near_tree.add(phash)
+                    storage.record_image_hash(final_path, file_h, phash)
+
+                    self._log(f"   ✅ Image {i+1} → {filename}")
+                    self._log(f"      ↪️ Texte ALT : {alt_text}")
+                    if preview_callback:
+                        preview_callback(final_path, None)
+                except Exception as img_err:
+                    self._log(f"   ❌ Échec de téléchargement pour image {i+1} : {img_err}")
+                    errors.append((src, img_err))
+            if errors and (final or not self._schedule_retry(retries, page_url, page_url, errors[0][1])):
+                failed.extend((page_url, src) for src, _ in errors)
+            elif not errors:
+                self.checkpoint.record("images", page_url, "done")
+            self._log(f"📁 Téléchargement terminé pour : {folder_name}")
 
-                self._log(f"📁 Téléchargement terminé pour : {folder_name}")
-            except Exception as e:
-                self._log(f"❌ Erreur sur la page {url} : {e}")
+        try:
+            for idx, (url, _) in enumerate(retries.iter_work(((u, u) for u in urls), should_stop), start=1):
+                self._log(f"\n🔍 Produit {min(finished + 1, total)}/{total} : {url}")
 
-            if progress_callback:
-                progress_callback(int(idx / total * 100))
-            self._log("-" * 80)
-            time.sleep(random.uniform(1.5, 3))
+                try:
+                    profile = profiles.for_url(url)
+                    driver = self._load_page(pool, driver, url, profile.ready_selectors)
+
+                    raw_title = driver.title.strip().split("|")[0].strip()
+                    folder_name = self.clean_filename(raw_title)
+                    folder = os.path.join(dest_folder, folder_name)
+                    os.makedirs(folder, exist_ok=True)
+
+                    images = profile.extract_driver(driver).get("gallery", [])
+                    self._log(f"🖼️ {len(images)} image(s) trouvée(s)")
+
+                    # Downloads run in the background while the next page loads.
+                    downloads = []
+                    for i, src in enumerate(images):
+                        src_type = image_probe.url_type(src)
+                        if wanted_type and src_type and src_type != wanted_type:
+                            continue
+                        temp_name = f"temp_{idx}_{i}.webp" if shard is None else f"temp_{shard}_{idx}_{i}.webp"
+                        temp_path = os.path.join(folder, temp_name)
+                        downloads.append((i, src, temp_path, downloader.submit(src, temp_path, probe)))
+                    if pending:
+                        finish(pending)
+                    pending = (url, folder, folder_name, downloads)
+                except Exception as e:
+                    self._log(f"❌ Erreur sur la page {url} : {e}")
+                    if self._schedule_retry(retries, url, url, e):
+                        self._log("-" * 80)
+                        continue
 
-        driver.quit()
+                finished += 1
+                if progress_callback:
+                    progress_callback(int(min(finished, total) / total * 100))
+                self._log("-" * 80)
+            if should_stop():
+                self._log("⏹ Interruption demandée.")
+                progress_callback(100)
+            if pending:
+                finish(pending, final=True)
+        finally:
+            downloader.close()
+            self.checkpoint.flush()
+            pool.release(driver)
+            self._release_browser_pool()
 
         if failed:
             self._log("\n❗Images échouées :")
@@ -1145,6 +1486,22 @@ class WooCommerceScraper(BaseScraper):
             progress_callback(100)
         return "Scraping images terminé"
 
+    def _variant_images_by_click(self, driver, profile):
+        """Click each visible swatch of the loaded page and read the gallery."""
+        variants = {}
+        labels = driver.find_elements(By.CSS_SELECTOR, profile.swatch)
+        for label in [l for l in labels if l.is_displayed()]:
+            try:
+                variant_name = label.find_element(By.CSS_SELECTOR, profile.swatch_name).text.strip()
+            except Exception:
+                continue
+            before = gallery_sources(driver, profile.gallery)
+            label.click()
+            wait_gallery_change(driver, profile.gallery, before)
+            images = driver.find_elements(By.CSS_SELECTOR, profile.gallery)
+            variants[variant_name] = [src for src in (img.get_attribute("src") for img in images) if src]
+        return variants
+
     def scrap_images_variantes(
         self,
         items,
@@ -1155,80 +1512,61 @@ class WooCommerceScraper(BaseScraper):
         should_stop=lambda: False,
         headless=True,
     ):
-        driver_path = self.chrome_driver_path
+        driver_path = self._resolve_driver_path()
         binary_path = self.chrome_binary_path
         if not driver_path:
-            try:
-                driver_path = ChromeDriverManager().install()
-            except Exception as e:
-                self._log(f"❌ Impossible de télécharger ChromeDriver : {e}")
-                self._log("➡️ Spécifiez CHROME_DRIVER_PATH pour un mode hors-ligne.")
-                return pd.DataFrame()
+            return pd.DataFrame()
         progress_callback = progress_callback or self._update_progress
-
-        options = webdriver.ChromeOptions()
-        if binary_path:
-            options.binary_location = binary_path
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        if headless:
-            options.add_argument("--headless")
-        service = Service(executable_path=driver_path)
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.execute_cdp_cmd(
-            "Page.addScriptToEvaluateOnNewDocument",
-            {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"},
-        )
+        profiles = self.load_profiles()
+        pool = self._browser_pool(driver_path, binary_path, headless)
+        driver = pool.acquire()
 
         rows = []
         mapping = {}
         total = len(items)
-        for idx, prod in enumerate(items, start=1):
-            if should_stop():
-                progress_callback(100)
-                break
-            prod_id = prod.get("id")
-            url = prod.get("url")
-            try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 3.5))
-
-                labels = driver.find_elements(By.CSS_SELECTOR, "label.color-swatch")
-                visible_labels = [l for l in labels if l.is_displayed()]
-                for label in visible_labels:
-                    try:
-                        variant_name = label.find_element(By.CSS_SELECTOR, "span.sr-only").text.strip()
-                    except Exception:
-                        continue
-                    label.click()
-                    time.sleep(1)
-                    images = driver.find_elements(By.CSS_SELECTOR, ".product-gallery__media img")
-                    for img in images:
-                        src = img.get_attribute("src")
-                        if not src:
-                            continue
-                        base = os.path.splitext(os.path.basename(urlparse(src).path))[0]
-                        filename = self.slugify(name_pattern.format(
-                            id=prod_id,
-                            variant=variant_name,
-                            name=base,
-                        )) + ".webp"
-                        link = f"{domain}/{upload_path}/{filename}"
-                        rows.append({
-                            "id produit": prod_id,
-                            "variante": variant_name,
-                            "url concurrent": src,
-                            "nom image": filename,
-                            "lien wordpress": link,
-                        })
-                        mapping.setdefault(prod_id, {}).setdefault(variant_name, []).append(filename)
-            except Exception as e:
-                self._log(f"❌ Erreur sur {url} → {e}")
-            if progress_callback:
-                progress_callback(int(idx / total * 100))
-
-        driver.quit()
+        try:
+            for idx, prod in enumerate(items, start=1):
+                if should_stop():
+                    progress_callback(100)
+                    break
+                prod_id = prod.get("id")
+                url = prod.get("url")
+                profile = profiles.for_url(url)
+                try:
+                    html = self._fetch_http(url, (VARIATIONS_SELECTOR,))
+                    variants = variation_images(html_parse.parse(html, VARIATIONS_STRAINER)) if html else None
+                    if variants is None:
+                        driver = self._load_page(pool, driver, url, profile.ready_selectors)
+                        variants = variation_images(html_parse.parse(driver.page_source, VARIATIONS_STRAINER))
+                    if variants is None:
+                        variants = self._variant_images_by_click(driver, profile)
+                    else:
+                        self._log(f"🧩 {url} : {len(variants)} variante(s) lues sans clic")
+
+                    for variant_name, sources in variants.items():
+                        for src in sources:
+                            base = os.path.splitext(os.path.basename(urlparse(src).path))[0]
+                            filename = self.slugify(name_pattern.format(
+                                id=prod_id,
+                                variant=variant_name,
+                                name=base,
+                            )) + ".webp"
+                            link = f"{domain}/{upload_path}/{filename}"
+                            rows.append({
+                                "id produit": prod_id,
+                                "variante": variant_name,
+                                "url concurrent": src,
+                                "nom image": filename,
+                                "lien wordpress": link,
+                            })
+                            mapping.setdefault(prod_id, {}).setdefault(variant_name, []).append(filename)
+                except Exception as e:
+                    self._log(f"❌ Erreur sur {url} → {e}")
+                if progress_callback:
+                    progress_callback(int(idx / total * 100))
+        finally:
+            pool.release(driver)
+            self._release_browser_pool()
 
         if mapping:
             mapping_path = os.path.join(self.results_dir or self.base_dir, "mapping_images_variantes.json")
@@ -1272,3 +1610,26 @@ class WooCommerceScraper(BaseScraper):
             self._log(f"Erreur list fiches: {e}")
 
 
+def _scrap_images_shard(shard, urls, dest_folder, settings, options, events, stop):
+    """Process entry point of one shard of a parallel image scrape."""
+    scraper = WooCommerceScraper(settings["base_dir"])
+    for name in _SHARD_SETTINGS:
+        setattr(scraper, name, settings[name])
+    scraper._log = lambda message: events.put(("log", shard, str(message)))
+    result = None
+    try:
+        result = scraper._scrap_images(
+            urls,
+            dest_folder,
+            settings["driver_path"],
+            settings["binary_path"],
+            lambda value: events.put(("progress", shard, value)),
+            lambda *paths: events.put(("preview", shard, paths)),
+            stop.is_set,
+            shard=shard,
+            **options,
+        )
+    except Exception as e:
+        scraper._log(f"❌ Processus d'images {shard} interrompu : {e}")
+    finally:
+        events.put(("done", shard, result))
@@ -0,0 +1,106 @@
+"""Skip downloads a text-only page load does not need.
+
+Product and fiche pages are opened only to read a title, a price and a
+description, yet Chrome still fetches the gallery, web fonts, videos and
+analytics scripts.  A :class:`ResourcePolicy` names the resource types
+and URL patterns to refuse:
+
+* Selenium drivers get them as ``Network.setBlockedURLs`` wildcards
+  (:meth:`ResourcePolicy.url_patterns`, applied by
+  :meth:`browser_pool.BrowserPool.block_urls`);
+* Playwright contexts abort matching requests from a route handler
+  (:meth:`ResourcePolicy.route`, installed by
+  :class:`async_engine.PagePool`).
+
+The scraper reads its policy from ``BLOCK_RESOURCE_TYPES`` and
+``BLOCK_URL_PATTERNS`` in ``config.toml``.
+
+Blocked ``<img>`` elements keep their ``src`` attribute, so image URLs
+can still be read from the DOM.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+import config
+
+# File extensions standing for each blockable resource type.  CDP cannot
+# filter by type, so the Selenium path blocks these extensions instead.
+TYPE_EXTENSIONS = {
+    "image": ("jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "m4a", "mov", "m3u8"),
+    "stylesheet": ("css",),
+}
+
+TRACKER_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*tiktok.com*",
+    "*pinterest.com/ct*",
+)
+
+
+@dataclass(frozen=True)
+class ResourcePolicy:
+    """Resource *types* and URL *patterns* (``*`` wildcards) to block."""
+
+    types: frozenset = frozenset({"image", "font", "media"})
+    patterns: tuple = TRACKER_PATTERNS
+
+    def __post_init__(self):
+        unknown = set(self.types) - set(TYPE_EXTENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown resource types: {', '.join(sorted(unknown))}")
+        object.__setattr__(self, "types", frozenset(self.types))
+        object.__setattr__(self, "patterns", tuple(self.patterns))
+
+    @classmethod
+    def from_config(cls) -> "ResourcePolicy":
+        """Policy of ``BLOCK_RESOURCE_TYPES`` and ``BLOCK_URL_PATTERNS``.
+
+        Both are comma separated; the extra patterns add to
+        :data:`TRACKER_PATTERNS`, and ``none`` as types disables blocking.
+        """
+        types = str(getattr(config, "BLOCK_RESOURCE_TYPES", "image,font,media") or "")
+        extra = str(getattr(config, "BLOCK_URL_PATTERNS", "") or "")
+        if types.strip().lower() == "none":
+            return cls.disabled()
+        return cls(
+            types=frozenset(t.strip().lower() for t in types.split(",") if t.strip()),
+            patterns=TRACKER_PATTERNS + tuple(p.strip() for p in extra.split(",") if p.strip()),
+        )
+
+    @classmethod
+    def disabled(cls) -> "ResourcePolicy":
+        return cls(types=frozenset(), patterns=())
+
+    def __bool__(self) -> bool:
+        return bool(self.types or self.patterns)
+
+    def url_patterns(self) -> list[str]:
+        """Wildcards for ``Network.setBlockedURLs`` (query strings included)."""
+        urls = [f"*.{ext}" for t in sorted(self.types) for ext in TYPE_EXTENSIONS[t]]
+        urls += [f"*.{ext}?*" for t in sorted(self.types) for ext in TYPE_EXTENSIONS[t]]
+        return urls + list(self.patterns)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        """Return ``True`` if a request of *resource_type* to *url* is refused."""
+        if resource_type in self.types:
+            return True
+        return any(fnmatchcase(url, pattern) for pattern in self.patterns)
+
+    async def route(self, route) -> None:
+        """Playwright ``page.route`` handler applying this policy."""
+        request = route.request
+        if self.blocks(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
@@ -0,0 +1,212 @@
+"""Streaming writers for scraping results.
+
+The product and recap spreadsheets used to be built from lists kept for
+the whole run and written by pandas at the end.  A :class:`RowSink`
+receives each row as it is produced instead:
+
+* :class:`CsvSink` writes through to disk every ``flush_every`` rows;
+* :class:`ExcelSink` spools rows the same way to ``<name>.part.csv`` and
+  converts them to an openpyxl write-only workbook on close;
+* :class:`ParquetSink` writes a row group every ``flush_every`` rows
+  (needs ``pyarrow``).
+
+Rows go to ``<path>.part`` which replaces *path* on :meth:`RowSink.close`,
+so a previous file is never left half written.  Sinks close in a
+``finally`` block: the rows scraped before an error are kept, and after a
+hard kill the CSV spool of the CSV and Excel formats still holds them.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Mapping
+
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - optional dependency may be missing
+    pa = pq = None
+
+# Column order of the WooCommerce import file
+WOOCOMMERCE_COLUMNS = (
+    "ID Produit",
+    "Type",
+    "SKU",
+    "Name",
+    "Parent",
+    "Attribute 1 name",
+    "Attribute 1 value(s)",
+    "Attribute 1 default",
+    "Regular price",
+    "Nom du dossier",
+)
+
+RECAP_COLUMNS = ("Nom du fichier", "H1", "Lien", "Statut")
+
+
+class RowSink:
+    """Append rows of *columns* to the file at *path*."""
+
+    def __init__(self, path: str, columns, flush_every: int = 200):
+        self.path = path
+        self.part_path = path + ".part"
+        self.columns = tuple(columns)
+        self.flush_every = max(1, int(flush_every))
+        self.count = 0
+        self._unflushed = 0
+        self._closed = False
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._open()
+
+    def write(self, row) -> None:
+        """Append *row*, a mapping by column name or a sequence in column order."""
+        if isinstance(row, Mapping):
+            values = [row.get(column) for column in self.columns]
+        else:
+            values = list(row)
+            if len(values) != len(self.columns):
+                raise ValueError(f"Expected {len(self.columns)} values, got {len(values)}")
+        self._write(values)
+        self.count += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def write_many(self, rows) -> None:
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> None:
+        self._unflushed = 0
+        self._flush()
+
+    def close(self) -> None:
+        """Finish the file and move it to :attr:`path`."""
+        if self._closed:
+            return
+        self._closed = True
+        self._close()
+        self._finish()
+        os.replace(self.part_path, self.path)
+
+    def discard(self) -> None:
+        """Drop the rows written so far and keep any previous file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Format specific ---------------------------------------------------
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _write(self, values: list) -> None:
+        raise NotImplementedError
+
+    def _flush(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+    def _finish(self) -> None:
+        """Complete :attr:`part_path` once the rows are closed."""
+
+
+class CsvSink(RowSink):
+    extension = "csv"
+
+    @property
+    def csv_path(self) -> str:
+        """File the rows are written to while the sink is open."""
+        return self.part_path
+
+    def _open(self):
+        # The BOM lets Excel detect UTF-8
+        self._file = open(self.csv_path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def _write(self, values):
+        self._writer.writerow(["" if v is None else v for v in values])
+
+    def _flush(self):
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class ExcelSink(CsvSink):
+    """CSV spool converted to a workbook on close; cells are written as text."""
+
+    extension = "xlsx"
+
+    @property
+    def csv_path(self) -> str:
+        return os.path.splitext(self.path)[0] + ".part.csv"
+
+    def _finish(self):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        with open(self.csv_path, newline="", encoding="utf-8-sig") as f:
+            for values in csv.reader(f):
+                sheet.append([v if v != "" else None for v in values])
+        workbook.save(self.part_path)
+        os.remove(self.csv_path)
+
+    def discard(self):
+        super().discard()
+        if os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+
+
+class ParquetSink(RowSink):
+    extension = "parquet"
+
+    def _open(self):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for Parquet results")
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._writer = pq.ParquetWriter(self.part_path, self._schema)
+        self._rows = []
+
+    def _write(self, values):
+        self._rows.append(["" if v is None else str(v) for v in values])
+
+    def _flush(self):
+        if self._rows:
+            columns = list(zip(*self._rows))
+            self._writer.write_table(pa.Table.from_arrays([pa.array(c, pa.string()) for c in columns],
+                                                          schema=self._schema))
+            self._rows = []
+
+    def _close(self):
+        self._flush()
+        self._writer.close()
+
+
+FORMATS = {sink.extension: sink for sink in (ExcelSink, CsvSink, ParquetSink)}
+
+
+def open_sink(path: str, columns, fmt: str | None = None, flush_every: int = 200) -> RowSink:
+    """Open the sink of *fmt* (default: the extension of *path*).
+
+    The extension of *path* is replaced by the one of *fmt*, so
+    ``woocommerce_mix.xlsx`` becomes ``woocommerce_mix.csv`` in CSV.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or ExcelSink.extension).lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown results format: {fmt}")
+    return FORMATS[fmt](os.path.splitext(path)[0] + "." + fmt, columns, flush_every)
@@ -0,0 +1,213 @@
+"""Retry failed scraping items with backoff, between fresh items.
+
+:func:`classify` sorts an exception into a failure class.  Each class has
+its own base delay and attempt budget (:data:`RETRY_POLICIES`); the delay
+doubles with every attempt of the item and gets +/-50 % jitter.
+Throttling (HTTP 429/503) and DNS failures concern the whole host, so the
+host cools down and its fresh items are deferred instead of tried.
+
+:meth:`RetryQueue.iter_work` yields the fresh items with the retries that
+came due slipped in between, so a failing host never stalls the run, and
+waits for the last retries once the fresh items are exhausted;
+:meth:`RetryQueue.aiter_work` does the same for the asyncio engine.  Retries
+and give-ups are recorded in the checkpoint journal with their class and
+next attempt time, so a resumed run keeps counting attempts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+TIMEOUT = "timeout"
+THROTTLED = "throttled"
+DNS = "dns"
+SELECTOR = "selector"
+OTHER = "other"
+
+
+class RetryPolicy(NamedTuple):
+    base_delay: float
+    max_attempts: int
+
+
+RETRY_POLICIES = {
+    TIMEOUT: RetryPolicy(5.0, 4),
+    THROTTLED: RetryPolicy(30.0, 5),
+    DNS: RetryPolicy(60.0, 3),
+    SELECTOR: RetryPolicy(10.0, 2),
+    OTHER: RetryPolicy(10.0, 2),
+}
+
+# Failures that say nothing about the item but a lot about its host
+HOST_WIDE = {THROTTLED, DNS}
+
+_DNS_MARKERS = (
+    "name_not_resolved",
+    "nameresolutionerror",
+    "name or service not known",
+    "nodename nor servname",
+    "getaddrinfo failed",
+    "temporary failure in name resolution",
+    "failed to resolve",
+)
+_TIMEOUT_MARKERS = ("timeout", "timed out", "err_connection_timed_out")
+# Status codes only count next to "HTTP" or the reason, never inside a URL
+_THROTTLED_RE = re.compile(
+    r"\bhttp(?:/[\d.]+)?\s+(?:429|503)\b"
+    r"|\b(?:429|503)\s+(?:client|server)\s+error\b"
+    r"|too many requests|service unavailable"
+)
+_SELECTOR_MARKERS = ("introuvable", "nosuchelement", "no such element")
+
+
+def classify(error: BaseException) -> str:
+    """Return the failure class of *error*."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) in (429, 503):
+        return THROTTLED
+    text = f"{type(error).__name__} {error}".lower()
+    if isinstance(error, socket.gaierror) or any(m in text for m in _DNS_MARKERS):
+        return DNS
+    if isinstance(error, TimeoutError) or any(m in text for m in _TIMEOUT_MARKERS):
+        return TIMEOUT
+    if _THROTTLED_RE.search(text):
+        return THROTTLED
+    if any(m in text for m in _SELECTOR_MARKERS):
+        return SELECTOR
+    return OTHER
+
+
+def _host(url) -> str:
+    return urlparse(url or "").netloc or (url or "")
+
+
+class RetryQueue:
+    """Failed items of one scraping *step* waiting for another attempt.
+
+    *journal* is a :class:`storage.CheckpointJournal`; without one the
+    queue only lives for the current run.
+    """
+
+    def __init__(self, journal=None, step: str = "", policies=None, max_delay: float = 600.0):
+        self.journal = journal
+        self.step = step
+        self.policies = dict(RETRY_POLICIES, **(policies or {}))
+        self.max_delay = max_delay
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._attempts: dict = {}
+        self._host_until: dict = {}
+        self._in_flight = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def settle(self) -> None:
+        """Report that an item yielded by :meth:`aiter_work` came back.
+
+        Call it before recording the outcome, retry included.
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+
+    def attempts(self, item_id) -> int:
+        """Number of failed attempts of *item_id* so far."""
+        if item_id not in self._attempts:
+            self._attempts[item_id] = self.journal.attempts(self.step, item_id) if self.journal else 0
+        return self._attempts[item_id]
+
+    def delay(self, kind: str, attempts: int) -> float:
+        policy = self.policies.get(kind, self.policies[OTHER])
+        return min(self.max_delay, policy.base_delay * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+
+    def schedule(self, item_id, url, error: BaseException) -> float | None:
+        """Queue *item_id* again after *error*.
+
+        Returns the delay before the retry, or ``None`` when the attempt
+        budget of the failure class is spent and the item is given up.
+        """
+        kind = classify(error)
+        attempts = self.attempts(item_id) + 1
+        self._attempts[item_id] = attempts
+        if attempts >= self.policies.get(kind, self.policies[OTHER]).max_attempts:
+            self._record(item_id, "error", error, kind)
+            return None
+        delay = self.delay(kind, attempts)
+        due = time.monotonic() + delay
+        if kind in HOST_WIDE:
+            host = _host(url)
+            self._host_until[host] = max(self._host_until.get(host, 0.0), due)
+        heapq.heappush(self._heap, (due, next(self._seq), item_id, url))
+        self._record(item_id, "retry", error, kind, datetime.now() + timedelta(seconds=delay))
+        return delay
+
+    def _record(self, item_id, status, error, kind, next_attempt=None) -> None:
+        if self.journal is not None:
+            self.journal.record(
+                self.step, item_id, status, str(error), error_class=kind, next_attempt=next_attempt
+            )
+
+    def _due(self, should_stop):
+        while self._heap and not should_stop():
+            now = time.monotonic()
+            due, _, item_id, url = self._heap[0]
+            if due > now:
+                return
+            heapq.heappop(self._heap)
+            hold = self._host_until.get(_host(url), 0.0)
+            if hold > now:
+                heapq.heappush(self._heap, (hold, next(self._seq), item_id, url))
+                continue
+            yield item_id, url
+
+    def iter_work(self, fresh, should_stop=lambda: False, wait: bool = True):
+        """Yield ``(item_id, url)`` pairs of *fresh* with due retries in between.
+
+        Fresh items of a host cooling down are deferred until it may be hit
+        again.  With *wait*, pending retries are waited for at the end;
+        otherwise they stay in the journal for the next run.
+        """
+        for item_id, url in fresh:
+            if should_stop():
+                return
+            yield from self._due(should_stop)
+            hold = self._host_until.get(_host(url), 0.0)
+            if url and hold > time.monotonic():
+                heapq.heappush(self._heap, (hold, next(self._seq), item_id, url))
+                continue
+            yield item_id, url
+        while wait and self._heap and not should_stop():
+            pause = self._heap[0][0] - time.monotonic()
+            if pause > 0:
+                # Short naps keep should_stop responsive
+                time.sleep(min(pause, 0.5))
+                continue
+            yield from self._due(should_stop)
+
+    async def aiter_work(self, fresh, should_stop=lambda: False):
+        """Asynchronous :meth:`iter_work` that always waits for the retries.
+
+        Items are processed concurrently, so a failure may be scheduled
+        after the fresh items ran out: the iteration only ends once every
+        yielded item was reported back through :meth:`settle` and no retry
+        is pending.  Waiting never blocks the event loop.
+        """
+        for pair in self.iter_work(fresh, should_stop, wait=False):
+            self._in_flight += 1
+            yield pair
+        while (self._heap or self._in_flight) and not should_stop():
+            pause = self._heap[0][0] - time.monotonic() if self._heap else 0.05
+            if pause > 0:
+                await asyncio.sleep(min(pause, 0.5))
+                continue
+            for pair in self._due(should_stop):
+                self._in_flight += 1
+                yield pair
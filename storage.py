@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
-from typing import List, Tuple
+import time
+from datetime import datetime
+from typing import Iterable, List, Set, Tuple
 from urllib.parse import urlparse
 
+from sqlalchemy import String, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+
 import config
 import db
-from db import SessionLocal
+import image_similarity
+from db import SessionLocal, migrations
 from db.models import (
     Base,
+    CheckpointItem,
+    FetchMeta,
     Product,
     Variant,
     Competitor,
     Preference,
     Selector,
+    ImageHash,
 )
 
 
@@ -23,36 +35,107 @@ def db_path(base_dir=None) -> str:
 
 
 def init_db() -> None:
-    """Create all tables bound to the current engine."""
+    """Create all tables bound to the current engine and upgrade old schemas."""
     Base.metadata.create_all(bind=db.engine)
+    migrations.upgrade(db.engine)
 
 
 def _get_session():
     return SessionLocal()
 
 
-def upsert_product(product_id: str, name: str, sku: str, price: str, dossier: str) -> None:
+def upsert_products_bulk(rows: Iterable[dict]) -> int:
+    """Insert or update product dicts in one transaction.
+
+    Each dict carries ``product_id``, ``name``, ``sku``, ``price`` and
+    ``dossier``.  Returns the number of rows written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    stmt = sqlite_insert(Product)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Product.product_id],
+        set_={col: stmt.excluded[col] for col in ("name", "sku", "price", "dossier")},
+    )
     with _get_session() as session:
-        obj = session.get(Product, product_id)
-        if obj is None:
-            obj = Product(product_id=product_id)
-            session.add(obj)
-        obj.name = name
-        obj.sku = sku
-        obj.price = price
-        obj.dossier = dossier
+        session.execute(stmt, rows)
         session.commit()
+    return len(rows)
 
 
-def upsert_variant(product_id: str, sku: str, name: str, price: str) -> None:
+def upsert_variants_bulk(rows: Iterable[dict]) -> int:
+    """Insert or update variant dicts (``product_id``, ``sku``, ``name``, ``price``)."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    stmt = sqlite_insert(Variant)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Variant.product_id, Variant.sku],
+        set_={col: stmt.excluded[col] for col in ("name", "price")},
+    )
     with _get_session() as session:
-        obj = session.query(Variant).get((product_id, sku))
-        if obj is None:
-            obj = Variant(product_id=product_id, sku=sku)
-            session.add(obj)
-        obj.name = name
-        obj.price = price
+        session.execute(stmt, rows)
         session.commit()
+    return len(rows)
+
+
+def upsert_product(product_id: str, name: str, sku: str, price: str, dossier: str) -> None:
+    upsert_products_bulk([
+        {"product_id": product_id, "name": name, "sku": sku, "price": price, "dossier": dossier}
+    ])
+
+
+def upsert_variant(product_id: str, sku: str, name: str, price: str) -> None:
+    upsert_variants_bulk([{"product_id": product_id, "sku": sku, "name": name, "price": price}])
+
+
+class UpsertBuffer:
+    """Collect product and variant rows and write them in batches.
+
+    Rows are keyed by primary key, so a later row for the same product or
+    variant replaces the pending one.  The buffer flushes by itself once
+    ``batch_size`` products are pending and when used as a context manager.
+    Callbacks registered with :meth:`on_flush` run once the rows pending at
+    that time are committed.
+    """
+
+    def __init__(self, batch_size: int = 100):
+        self.batch_size = batch_size
+        self._products: dict = {}
+        self._variants: dict = {}
+        self._callbacks: list = []
+
+    def on_flush(self, callback) -> None:
+        """Call *callback* after the next flush, e.g. to journal an item as done."""
+        self._callbacks.append(callback)
+
+    def add_product(self, product_id: str, name: str, sku: str, price: str, dossier: str) -> None:
+        self._products[product_id] = {
+            "product_id": product_id, "name": name, "sku": sku, "price": price, "dossier": dossier,
+        }
+        if len(self._products) >= self.batch_size:
+            self.flush()
+
+    def add_variant(self, product_id: str, sku: str, name: str, price: str) -> None:
+        self._variants[(product_id, sku)] = {
+            "product_id": product_id, "sku": sku, "name": name, "price": price,
+        }
+
+    def flush(self) -> None:
+        products, self._products = self._products, {}
+        variants, self._variants = self._variants, {}
+        callbacks, self._callbacks = self._callbacks, []
+        upsert_products_bulk(products.values())
+        upsert_variants_bulk(variants.values())
+        for callback in callbacks:
+            callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
 
 
 def record_competitor(product_id: str, title: str, url: str, file_path: str, status: str) -> None:
@@ -62,16 +145,208 @@ def record_competitor(product_id: str, title: str, url: str, file_path: str, sta
         session.commit()
 
 
-def search_products(name: str) -> List[Tuple[str, str, str, str]]:
+def competitor_file(url: str) -> str | None:
+    """Return the fiche file last saved for the competitor page *url*."""
     with _get_session() as session:
-        results = (
-            session.query(Product)
-            .filter(Product.name.like(f"%{name}%"))
-            .all()
+        row = (
+            session.query(Competitor.file_path)
+            .filter(Competitor.url == url, Competitor.status == "OK", Competitor.file_path != "")
+            .order_by(Competitor.id.desc())
+            .first()
         )
+        return row.file_path if row else None
+
+
+def search_products(name: str) -> List[Tuple[str, str, str, str]]:
+    """Return products whose name contains *name* (case-insensitive).
+
+    Terms of three characters or more go through the ``products_fts``
+    trigram index; shorter ones, or databases without FTS5, use ``LIKE``.
+    """
+    with _get_session() as session:
+        results = None
+        if len(name) >= 3:
+            phrase = '"' + name.replace('"', '""') + '"'
+            matches = text("SELECT product_id FROM products_fts WHERE products_fts MATCH :q")
+            try:
+                results = (
+                    session.query(Product)
+                    .filter(Product.product_id.in_(matches.bindparams(q=phrase).columns(product_id=String)))
+                    .all()
+                )
+            except OperationalError:
+                session.rollback()
+        if results is None:
+            results = (
+                session.query(Product)
+                .filter(Product.name.like(f"%{name}%"))
+                .all()
+            )
         return [(p.product_id, p.name, p.sku, p.price) for p in results]
 
 
+# ---------------------------------------------------------------------------
+# Checkpoint journal
+
+CHECKPOINT_STEP = "checkpoint_step"
+
+
+def record_checkpoint_items(rows: Iterable[dict]) -> int:
+    """Upsert checkpoint rows, adding their ``attempts`` to the stored count."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    stmt = sqlite_insert(CheckpointItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CheckpointItem.step, CheckpointItem.item_id],
+        set_={
+            "status": stmt.excluded.status,
+            "attempts": CheckpointItem.attempts + stmt.excluded.attempts,
+            "error": stmt.excluded.error,
+            "error_class": stmt.excluded.error_class,
+            "next_attempt": stmt.excluded.next_attempt,
+            "output_path": stmt.excluded.output_path,
+            "updated": stmt.excluded.updated,
+        },
+    )
+    with _get_session() as session:
+        session.execute(stmt, rows)
+        session.commit()
+    return len(rows)
+
+
+class CheckpointJournal:
+    """Per-item progress of a scraping run, committed in batches.
+
+    Every item of a step is recorded with its status (``done`` or
+    ``error``), attempt count, last error and output path.  Rows are
+    written every ``batch_size`` items or ``interval`` seconds, so a killed
+    run loses at most the last batch, and resuming is a single query on
+    the items already done.
+    """
+
+    def __init__(self, batch_size: int = 50, interval: float = 2.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: dict = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, step: str, item_id: str, status: str, error: str | None = None,
+               output_path: str | None = None, error_class: str | None = None,
+               next_attempt: datetime | None = None) -> None:
+        key = (step, str(item_id))
+        attempts = self._pending[key]["attempts"] + 1 if key in self._pending else 1
+        self._pending[key] = {
+            "step": step,
+            "item_id": str(item_id),
+            "status": status,
+            "attempts": attempts,
+            "error": error,
+            "error_class": error_class,
+            "next_attempt": next_attempt,
+            "output_path": output_path,
+            "updated": datetime.now(),
+        }
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._last_flush = time.monotonic()
+        record_checkpoint_items(pending.values())
+
+    def current_step(self) -> str | None:
+        return get_preference(CHECKPOINT_STEP) or None
+
+    def begin(self, step: str, resume: bool = False) -> None:
+        """Make *step* the step to resume; forget its items unless *resume*."""
+        self.flush()
+        set_preference(CHECKPOINT_STEP, step)
+        if not resume:
+            self.forget(step)
+
+    def forget(self, step: str) -> None:
+        """Drop the recorded items of *step*."""
+        self.flush()
+        with _get_session() as session:
+            session.query(CheckpointItem).filter_by(step=step).delete()
+            session.commit()
+
+    def attempts(self, step: str, item_id: str) -> int:
+        """Return how many times *item_id* was recorded in *step*."""
+        self.flush()
+        with _get_session() as session:
+            item = session.get(CheckpointItem, (step, str(item_id)))
+            return (item.attempts or 0) if item else 0
+
+    def done_ids(self, step: str) -> Set[str]:
+        self.flush()
+        with _get_session() as session:
+            rows = session.query(CheckpointItem.item_id).filter_by(step=step, status="done")
+            return {row.item_id for row in rows}
+
+    def pending(self, step: str, ids: Iterable[str]) -> List[str]:
+        """Return the ids of *ids* not yet done in *step*, in order."""
+        done = self.done_ids(step)
+        return [i for i in ids if str(i) not in done]
+
+    def clear(self) -> None:
+        self._pending = {}
+        with _get_session() as session:
+            session.query(CheckpointItem).delete()
+            session.commit()
+        set_preference(CHECKPOINT_STEP, "")
+
+    def import_legacy(self, path: str) -> bool:
+        """Move a ``scraping_checkpoint.json`` file into the journal."""
+        if not os.path.isfile(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        step = data.get("step")
+        if step:
+            self.begin(step)
+            for item_id in data.get("processed", []):
+                self.record(step, item_id, "done")
+            self.flush()
+        os.remove(path)
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Fetch metadata for incremental runs
+
+def fields_hash(*fields) -> str:
+    """Return a stable digest of extracted page fields."""
+    data = json.dumps(fields, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def get_fetch_meta(url: str) -> dict | None:
+    """Return ``etag``, ``last_modified`` and ``content_hash`` stored for *url*."""
+    with _get_session() as session:
+        row = session.get(FetchMeta, url)
+        if row is None:
+            return None
+        return {"etag": row.etag, "last_modified": row.last_modified, "content_hash": row.content_hash}
+
+
+def save_fetch_meta(url: str, etag: str | None, last_modified: str | None, content_hash: str) -> None:
+    stmt = sqlite_insert(FetchMeta).values(
+        url=url, etag=etag, last_modified=last_modified, content_hash=content_hash, updated=datetime.now()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FetchMeta.url],
+        set_={col: stmt.excluded[col] for col in ("etag", "last_modified", "content_hash", "updated")},
+    )
+    with _get_session() as session:
+        session.execute(stmt)
+        session.commit()
+
+
 # ---------------------------------------------------------------------------
 # Preference helpers
 
@@ -102,8 +377,19 @@ def load_selectors() -> dict:
         return {sel.domain: sel.selector for sel in session.query(Selector).all()}
 
 
-def save_selector(url: str, selector: str) -> None:
-    """Persist selector for given *url* (domain key)."""
+def load_field_selectors() -> dict:
+    """Return the saved selectors bound to a field as {domain: {field: selector}}."""
+    with _get_session() as session:
+        rows = session.query(Selector).filter(Selector.field.isnot(None), Selector.field != "").all()
+        return {sel.domain: {sel.field: sel.selector} for sel in rows if sel.selector}
+
+
+def save_selector(url: str, selector: str, field: str | None = None) -> None:
+    """Persist selector for given *url* (domain key).
+
+    *field* names the extraction profile field the selector reads; without
+    it the selector is only kept for the visual selector tool.
+    """
     domain = urlparse(url).netloc or url
     with _get_session() as session:
         obj = session.query(Selector).filter_by(domain=domain).first()
@@ -111,5 +397,128 @@ def save_selector(url: str, selector: str) -> None:
             obj = Selector(domain=domain)
             session.add(obj)
         obj.selector = selector
+        obj.field = field or None
+        session.commit()
+
+
+
+# ---------------------------------------------------------------------------
+# Image hash index
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 hex digest of the file at *path*."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sync_image_index(folder: str, perceptual: bool = False) -> Set[str]:
+    """Refresh the hash index for *folder* and return all known digests.
+
+    Only files whose size or mtime changed since the last call are hashed
+    again; entries for files that disappeared are dropped.  In-progress
+    downloads (``temp_*`` and ``*.part``) are ignored.  With *perceptual*
+    the dHash of every indexed file is filled in as well.
+    """
+    root = os.path.abspath(folder)
+    prefix = os.path.join(root, "")
+    digests: Set[str] = set()
+    with _get_session() as session:
+        known = {
+            row.path: row
+            for row in session.query(ImageHash).filter(ImageHash.path.startswith(prefix, autoescape=True))
+        }
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                if name.endswith(".part") or name.startswith("temp_"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                    row = known.pop(path, None)
+                    if row is None:
+                        row = ImageHash(path=path)
+                        session.add(row)
+                    elif row.size != st.st_size or row.mtime != st.st_mtime:
+                        row.phash = None
+                    else:
+                        digests.add(row.digest)
+                        if perceptual and row.phash is None:
+                            row.phash = _phash_hex(path)
+                        continue
+                    row.digest = file_hash(path)
+                    row.size = st.st_size
+                    row.mtime = st.st_mtime
+                    if perceptual:
+                        row.phash = _phash_hex(path)
+                    digests.add(row.digest)
+                except OSError:
+                    continue
+        for row in known.values():
+            session.delete(row)
+        session.commit()
+    return digests
+
+
+def _phash_hex(path: str) -> str | None:
+    value = image_similarity.dhash(path)
+    return None if value is None else image_similarity.to_hex(value)
+
+
+def image_digests(folder: str) -> Set[str]:
+    """Return the digests indexed under *folder*, without syncing it."""
+    prefix = os.path.join(os.path.abspath(folder), "")
+    with _get_session() as session:
+        rows = session.query(ImageHash.digest).filter(ImageHash.path.startswith(prefix, autoescape=True))
+        return {r.digest for r in rows if r.digest}
+
+
+def claim_image_digest(path: str, digest: str) -> bool:
+    """Index *path* under *digest* unless another file already has it.
+
+    The check and the insert are one statement, so when parallel image
+    scrapers download the same picture only one of them may save it.  The
+    size, mtime and perceptual hash of a file previously at *path* are
+    cleared until :func:`record_image_hash` indexes the new one.
+    """
+    stmt = text(
+        "INSERT INTO image_hashes (path, digest) SELECT :path, :digest "
+        "WHERE NOT EXISTS (SELECT 1 FROM image_hashes WHERE digest = :digest AND path != :path) "
+        "ON CONFLICT(path) DO UPDATE SET digest = excluded.digest, size = NULL, mtime = NULL, phash = NULL"
+    )
+    with _get_session() as session:
+        result = session.execute(stmt, {"path": os.path.abspath(path), "digest": digest})
         session.commit()
+        return result.rowcount > 0
+
+
+def image_phashes(folder: str) -> List[int]:
+    """Return the perceptual hashes indexed under *folder*."""
+    prefix = os.path.join(os.path.abspath(folder), "")
+    with _get_session() as session:
+        rows = (
+            session.query(ImageHash.phash)
+            .filter(ImageHash.path.startswith(prefix, autoescape=True), ImageHash.phash.isnot(None))
+            .all()
+        )
+    return [image_similarity.from_hex(r.phash) for r in rows]
 
+
+def record_image_hash(path: str, digest: str | None = None, phash: int | None = None) -> str:
+    """Index the file at *path*, hashing it unless *digest* is given."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    digest = digest or file_hash(path)
+    with _get_session() as session:
+        row = session.get(ImageHash, path)
+        if row is None:
+            row = ImageHash(path=path)
+            session.add(row)
+        row.size = st.st_size
+        row.mtime = st.st_mtime
+        row.digest = digest
+        row.phash = None if phash is None else image_similarity.to_hex(phash)
+        session.commit()
+    return digest
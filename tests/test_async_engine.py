@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from async_engine import HostRateLimiter, TokenBucket, run_bounded
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_limits_in_flight_tasks():
+    in_flight = 0
+    peak = 0
+    results = {}
+
+    async def handler(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if item == 3:
+            raise ValueError("boom")
+        return item * 2
+
+    def on_result(item, result, error):
+        results[item] = error if error else result
+
+    await run_bounded(range(20), handler, 4, on_result)
+
+    assert peak == 4
+    assert len(results) == 20
+    assert isinstance(results[3], ValueError)
+    assert results[5] == 10
+
+
+@pytest.mark.asyncio
+async def test_run_bounded_stops_feeding():
+    seen = []
+    await run_bounded(range(100), lambda i: asyncio.sleep(0), 2,
+                      lambda item, r, e: seen.append(item),
+                      should_stop=lambda: len(seen) >= 5)
+    assert len(seen) < 100
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 3 / 50 * 0.9
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_is_per_host():
+    limiter = HostRateLimiter(rate=1, burst=1)
+    start = time.monotonic()
+    await limiter.wait("http://a.example/1")
+    await limiter.wait("http://b.example/1")
+    assert time.monotonic() - start < 0.5
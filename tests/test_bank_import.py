@@ -1,8 +1,12 @@
+from datetime import date
+
 import pandas as pd
 import pytest
 
 from accounting import (
     import_releve,
+    iter_releve,
+    importer_releve_par_lots,
     InMemoryStorage,
     ComptaValidationError,
     ComptaImportError,
@@ -43,3 +47,154 @@ def test_import_releve_bad_extension(tmp_path):
     txt.write_text("dummy")
     with pytest.raises(ComptaImportError):
         import_releve(str(txt))
+
+
+def test_import_releve_reports_all_invalid_rows(tmp_path):
+    data = pd.DataFrame({
+        'Date': ['2023-01-01', 'pas une date', '2023-01-03', '2023-01-04'],
+        'Libellé': ['Achat', 'Frais', 'Vente', 'TVA'],
+        'Montant': [10.0, 5.0, 'abc', -3.0],
+        'Type': ['débit', 'débit', 'crédit', 'virement'],
+    })
+    path = tmp_path / 'releve.csv'
+    data.to_csv(path, index=False)
+    storage = InMemoryStorage()
+
+    with pytest.raises(ComptaValidationError) as excinfo:
+        import_releve(str(path), storage)
+
+    assert excinfo.value.errors == [
+        'Ligne 3 : Date invalide : pas une date',
+        'Ligne 4 : Montant invalide : abc',
+        'Ligne 5 : Montant négatif : -3.0',
+        'Ligne 5 : Type invalide : virement',
+    ]
+    assert str(excinfo.value).startswith('3 ligne(s) invalide(s)')
+    assert storage.list_transactions() == []
+
+
+def test_import_releve_header_only(tmp_path):
+    path = tmp_path / 'vide.csv'
+    path.write_text('Date,Libellé,Montant,Type\n', encoding='utf-8')
+    assert import_releve(str(path)) == []
+
+
+def test_import_releve_date_format_and_categories(tmp_path):
+    data = pd.DataFrame({
+        'Date': ['02/01/2023', '31/12/2023'],
+        'Libellé': ['Achat fournisseur', None],
+        'Montant': [10, 20],
+        'Type': ['Débit', 'CREDIT'],
+    })
+    path = tmp_path / 'releve.csv'
+    data.to_csv(path, index=False)
+
+    txs = import_releve(str(path), date_format='%d/%m/%Y')
+
+    assert [tx.date for tx in txs] == [date(2023, 1, 2), date(2023, 12, 31)]
+    assert [tx.categorie for tx in txs] == ['Fournisseur', 'Autre']
+    assert txs[1].description == '' and txs[1].credit == 'BANQUE'
+    assert len({tx.id for tx in txs}) == 2
+
+    with pytest.raises(ComptaValidationError):
+        import_releve(str(path), date_format='%Y-%m-%d')
+
+
+def test_sql_storage_bulk_insert(tmp_path, monkeypatch):
+    import db
+    from accounting import SQLStorage, Transaction
+    from accounting import storage as accounting_storage
+
+    db.init_engine(tmp_path / 'compta.db')
+    monkeypatch.setattr(accounting_storage, 'engine', db.engine)
+    storage = SQLStorage()
+    txs = [Transaction(date(2023, 1, i), f'op {i}', float(i), 'BANQUE', '') for i in range(1, 4)]
+    storage.add_transactions(txs)
+    txs[0].categorie = 'Frais'
+    storage.add_transactions(txs[:1])
+
+    stored = {tx.id: tx for tx in storage.list_transactions()}
+    assert set(stored) == {tx.id for tx in txs}
+    assert stored[txs[0].id].categorie == 'Frais'
+
+
+def _releve(n, **overrides):
+    data = {
+        'Date': [f'2023-01-{i % 28 + 1:02d}' for i in range(n)],
+        'Libellé': ['Achat fournisseur'] * n,
+        'Montant': [float(i + 1) for i in range(n)],
+        'Type': ['débit', 'crédit'] * (n // 2) + ['débit'] * (n % 2),
+    }
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+def test_iter_releve_csv_batches_and_progress(tmp_path):
+    path = tmp_path / 'releve.csv'
+    _releve(10).to_csv(path, index=False)
+    progress = []
+
+    lots = list(iter_releve(str(path), chunksize=4, progress_callback=progress.append))
+
+    assert [len(lot) for lot in lots] == [4, 4, 2]
+    assert [tx.montant for lot in lots for tx in lot] == [float(i + 1) for i in range(10)]
+    assert progress == sorted(progress) and progress[-1] == 100
+
+
+def test_iter_releve_reports_file_line_numbers(tmp_path):
+    montants = [1.0] * 10
+    montants[6] = -1.0
+    path = tmp_path / 'releve.csv'
+    _releve(10, Montant=montants).to_csv(path, index=False)
+    lots = iter_releve(str(path), chunksize=4)
+    assert len(next(lots)) == 4
+    with pytest.raises(ComptaValidationError) as excinfo:
+        next(lots)
+    assert excinfo.value.errors == ['Ligne 8 : Montant négatif : -1.0']
+
+
+def test_iter_releve_xlsx_line_numbers_count_blank_rows(tmp_path):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Date', 'Libellé', 'Montant', 'Type'])
+    ws.append(['2023-01-01', 'Achat', 1.0, 'débit'])
+    ws.append([None, None, None, None])
+    ws.append([None, None, None, None])
+    ws.append(['2023-01-02', 'Achat', 'abc', 'débit'])
+    path = tmp_path / 'releve.xlsx'
+    wb.save(path)
+    with pytest.raises(ComptaValidationError) as excinfo:
+        list(iter_releve(str(path), chunksize=1))
+    assert excinfo.value.errors == ['Ligne 5 : Montant invalide : abc']
+
+
+def test_importer_releve_par_lots_xlsx_read_only(tmp_path):
+    path = tmp_path / 'releve.xlsx'
+    _releve(7).to_excel(path, index=False)
+    storage = InMemoryStorage()
+    progress = []
+
+    assert importer_releve_par_lots(str(path), storage, chunksize=3, progress_callback=progress.append) == 7
+    assert len(storage.list_transactions()) == 7
+    assert storage.list_transactions()[0].date == date(2023, 1, 1)
+    assert progress[-1] == 100
+
+    # Three checks while validating, then a stop after the first stored batch
+    checks = iter([False, False, False, True])
+    stopped = InMemoryStorage()
+    assert importer_releve_par_lots(str(path), stopped, chunksize=3, should_stop=lambda: next(checks)) == 3
+    assert importer_releve_par_lots(str(path), stopped, chunksize=3, should_stop=lambda: True) == 0
+
+
+def test_importer_releve_par_lots_stores_nothing_when_a_later_batch_is_invalid(tmp_path):
+    montants = [1.0] * 10
+    montants[8] = 'abc'
+    path = tmp_path / 'releve.csv'
+    _releve(10, Montant=montants).to_csv(path, index=False)
+    storage = InMemoryStorage()
+    with pytest.raises(ComptaValidationError) as excinfo:
+        importer_releve_par_lots(str(path), storage, chunksize=4)
+    assert excinfo.value.errors == ['Ligne 10 : Montant invalide : abc']
+    assert storage.list_transactions() == []
@@ -0,0 +1,89 @@
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    launched = 0
+
+    def __init__(self, service=None, options=None):
+        FakeDriver.launched += 1
+        self.alive = True
+        self.heap = 0
+        self.quit_called = False
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap}]}
+        return {}
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("dead")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _pool(monkeypatch, **kwargs):
+    FakeDriver.launched = 0
+    monkeypatch.setattr(browser_pool.webdriver, "Chrome", FakeDriver)
+    return BrowserPool("driver", **kwargs)
+
+
+def test_pool_reuses_warm_driver(monkeypatch):
+    pool = _pool(monkeypatch)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is first
+    assert FakeDriver.launched == 1
+    pool.release(second)
+    pool.close()
+    assert first.quit_called
+
+
+def test_pool_replaces_unhealthy_driver(monkeypatch):
+    pool = _pool(monkeypatch)
+    drv = pool.acquire()
+    pool.release(drv)
+    drv.alive = False
+    new = pool.acquire()
+    assert new is not drv
+    assert drv.quit_called
+
+
+def test_recycle_on_page_count_and_memory(monkeypatch):
+    pool = _pool(monkeypatch, max_pages=3, max_memory_mb=100)
+    drv = pool.acquire()
+    assert pool.recycle_if_needed(drv) is drv
+    assert pool.recycle_if_needed(drv) is drv
+    fresh = pool.recycle_if_needed(drv)
+    assert fresh is not drv and drv.quit_called
+
+    fresh.heap = 200 * 1024 * 1024
+    again = pool.recycle_if_needed(fresh)
+    assert again is not fresh
+    assert FakeDriver.launched == 3
+
+
+def test_failed_restart_does_not_grow_the_pool(monkeypatch):
+    pool = _pool(monkeypatch, max_size=1, max_pages=1)
+    drv = pool.acquire()
+
+    def broken(service=None, options=None):
+        raise RuntimeError("chrome crashed")
+
+    monkeypatch.setattr(browser_pool.webdriver, "Chrome", broken)
+    try:
+        pool.recycle_if_needed(drv)
+    except RuntimeError:
+        pass
+    finally:
+        pool.release(drv)
+    assert drv.quit_called and not pool._idle
+
+    monkeypatch.setattr(browser_pool.webdriver, "Chrome", FakeDriver)
+    fresh = pool.acquire()
+    assert fresh is not drv and pool._created == 1
@@ -18,3 +18,15 @@ def test_rapport_par_categorie():
     totals = rapport_par_categorie([tx1, tx2], date(2023, 1, 1), date(2023, 1, 31))
     assert totals["Fournisseur"] == 50.0
     assert totals["Client"] == 120.0
+
+
+def test_categoriser_libelles_matches_single_transactions():
+    import pandas as pd
+    from accounting.categorization import categoriser_libelles
+
+    libelles = ["Paiement client", "Achat fournisseur", "frais TVA", "Loyer", "Paiement client", None]
+    expected = [
+        categoriser_automatiquement(Transaction(date.today(), lib or "", 1.0, "BANQUE", ""))
+        for lib in libelles
+    ]
+    assert list(categoriser_libelles(pd.Series(libelles))) == expected
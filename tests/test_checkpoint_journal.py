@@ -0,0 +1,55 @@
+import json
+
+import db
+import storage
+from db.models import CheckpointItem
+
+
+def _journal(tmp_path, **kwargs):
+    db.init_engine(tmp_path / "ckpt.db")
+    storage.init_db()
+    return storage.CheckpointJournal(**kwargs)
+
+
+def test_items_are_committed_in_batches(tmp_path):
+    journal = _journal(tmp_path, batch_size=3, interval=3600)
+    journal.begin("variantes")
+    for i in range(4):
+        journal.record("variantes", str(i), "done")
+    # A run killed now keeps the first batch only
+    fresh = storage.CheckpointJournal()
+    assert fresh.done_ids("variantes") == {"0", "1", "2"}
+    assert journal.pending("variantes", ["0", "1", "2", "3", "4"]) == ["4"]
+
+
+def test_attempts_error_and_output_path(tmp_path):
+    journal = _journal(tmp_path, batch_size=1)
+    journal.begin("concurrents")
+    journal.record("concurrents", "7", "error", "timeout")
+    journal.record("concurrents", "7", "done", output_path="/tmp/fiche.txt")
+    with db.SessionLocal() as session:
+        item = session.get(CheckpointItem, ("concurrents", "7"))
+        assert (item.status, item.attempts, item.error, item.output_path) == ("done", 2, None, "/tmp/fiche.txt")
+
+
+def test_begin_without_resume_forgets_step_items(tmp_path):
+    journal = _journal(tmp_path, batch_size=1)
+    journal.begin("variantes")
+    journal.record("variantes", "1", "done")
+    journal.begin("variantes", resume=True)
+    assert journal.done_ids("variantes") == {"1"}
+    assert journal.current_step() == "variantes"
+    journal.begin("variantes")
+    assert journal.done_ids("variantes") == set()
+    journal.clear()
+    assert journal.current_step() is None
+
+
+def test_legacy_json_checkpoint_is_imported(tmp_path):
+    journal = _journal(tmp_path)
+    legacy = tmp_path / "scraping_checkpoint.json"
+    legacy.write_text(json.dumps({"step": "concurrents", "processed": ["1", "2"]}))
+    assert journal.import_legacy(str(legacy))
+    assert not legacy.exists()
+    assert journal.current_step() == "concurrents"
+    assert journal.done_ids("concurrents") == {"1", "2"}
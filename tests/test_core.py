@@ -37,21 +37,19 @@ async def test_scrap_produits_parsing(monkeypatch, tmp_path):
         "http://var": variable_html.read_text(),
     }
 
-    async def fake_scrape(self, browser, url):
+    async def fake_scrape(self, browser, url, pages=None):
         return html_map[url]
 
     monkeypatch.setattr(scraper_woocommerce, "async_playwright", lambda: DummyPlay())
-    monkeypatch.setattr(ScraperCore, "async_scrape_product", fake_scrape)
-
-    captured = {}
-    monkeypatch.setattr(pd.DataFrame, "to_excel", lambda self, path, index=False: captured.setdefault("df", self))
+    monkeypatch.setattr(scraper_woocommerce.WooCommerceScraper, "async_scrape_product", fake_scrape)
+    monkeypatch.setattr(scraper_woocommerce.HttpFetcher, "fetch", lambda self, url, required=(): None)
 
     core = ScraperCore(base_dir=tmp_path)
     id_url_map = {"1": "http://simple", "2": "http://var"}
     ids = ["1", "2"]
     ok, err = await core._scrap_produits_par_ids_async(id_url_map, ids, [], None, lambda: False, True)
 
-    df = captured.get("df")
+    df = pd.read_excel(core.fichier_excel, dtype=str)
     assert ok == 2
     assert err == 0
     assert len(df) == 4
@@ -67,3 +65,78 @@ async def test_scrap_produits_parsing(monkeypatch, tmp_path):
 def test_clean_helpers():
     assert ScraperCore.clean_name("Crème Brûlée-") == "creme brulee"
     assert ScraperCore.clean_filename("Crème Brûlée!.jpg") == "creme-bruleejpg"
+
+
+@pytest.mark.asyncio
+async def test_incremental_fiches_skip_unchanged_pages(monkeypatch, tmp_path):
+    pages = {"http://a": "<h1>Fiche A</h1><div id='product_description'><p>Texte</p></div>"}
+    monkeypatch.setattr(scraper_woocommerce, "async_playwright", lambda: DummyPlay())
+    monkeypatch.setattr(
+        scraper_woocommerce.HttpFetcher, "fetch", lambda self, url, required=(), validators=None: pages[url]
+    )
+    core = ScraperCore(base_dir=tmp_path)
+    run = lambda: core._scrap_fiches_concurrents_async(  # noqa: E731
+        {"1": "http://a"}, ["1"], [], None, lambda: False, True, None, True
+    )
+    statuses = lambda: list(pd.read_excel(core.recap_excel_path)["Statut"])  # noqa: E731
+    assert await run() == (1, 0)
+    assert statuses() == ["Extraction OK"]
+    path = tmp_path / core.save_directory / "fiche-a.txt"
+    os.utime(path, (0, 0))
+
+    assert await run() == (1, 0)
+    assert statuses() == [scraper_woocommerce.FICHE_UNCHANGED]
+    assert path.stat().st_mtime == 0
+
+    pages["http://a"] = pages["http://a"].replace("Texte", "Nouveau texte")
+    await run()
+    assert statuses() == ["Extraction OK"]
+    assert "Nouveau texte" in path.read_text()
+
+
+@pytest.mark.asyncio
+async def test_fiche_errors_are_recorded_once_given_up(monkeypatch, tmp_path):
+    import db
+    import retry_queue
+    from db.models import Competitor
+
+    monkeypatch.setitem(retry_queue.RETRY_POLICIES, retry_queue.SELECTOR, retry_queue.RetryPolicy(0.0, 2))
+    monkeypatch.setattr(scraper_woocommerce, "async_playwright", lambda: DummyPlay())
+    monkeypatch.setattr(
+        scraper_woocommerce.HttpFetcher, "fetch", lambda self, url, required=(), validators=None: "<h1>Fiche A</h1>"
+    )
+    core = ScraperCore(base_dir=tmp_path)
+    assert await core._scrap_fiches_concurrents_async(
+        {"1": "http://a"}, ["1"], [], None, lambda: False, True
+    ) == (0, 1)
+
+    with db.SessionLocal() as session:
+        rows = [(c.title, c.status) for c in session.query(Competitor).all()]
+    assert rows == [("Fiche A", "Description introuvable")]
+
+
+@pytest.mark.asyncio
+async def test_not_modified_fiche_is_saved_again_when_its_file_is_missing(monkeypatch, tmp_path):
+    page = "<h1>Fiche A</h1><div id='product_description'><p>Texte</p></div>"
+
+    def fetch(self, url, required=(), validators=None):
+        if validators and validators[0]:
+            return scraper_woocommerce.NOT_MODIFIED
+        self.validators[url] = ('"v1"', None)
+        return page
+
+    monkeypatch.setattr(scraper_woocommerce, "async_playwright", lambda: DummyPlay())
+    monkeypatch.setattr(scraper_woocommerce.HttpFetcher, "fetch", fetch)
+    core = ScraperCore(base_dir=tmp_path)
+    run = lambda: core._scrap_fiches_concurrents_async(  # noqa: E731
+        {"1": "http://a"}, ["1"], [], None, lambda: False, True, None, True
+    )
+    statuses = lambda: list(pd.read_excel(core.recap_excel_path)["Statut"])  # noqa: E731
+    await run()
+    await run()
+    assert statuses() == [scraper_woocommerce.FICHE_UNCHANGED]
+
+    core._plugin.save_directory = str(tmp_path / "autres_fiches")
+    await run()
+    assert statuses() == ["Extraction OK"]
+    assert (tmp_path / "autres_fiches" / "fiche-a.txt").exists()
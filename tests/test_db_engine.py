@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+
+import config
+import db
+import storage
+
+
+def test_engine_applies_sqlite_profile(tmp_path):
+    engine = db.init_engine(tmp_path / "tuned.db")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == int(config.SQLITE_BUSY_TIMEOUT_MS)
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -int(config.SQLITE_CACHE_SIZE_KB)
+
+
+def test_readers_are_not_blocked_by_open_write(tmp_path):
+    db.init_engine(tmp_path / "wal.db")
+    storage.init_db()
+    storage.upsert_product("1", "Shoe", "S1", "10", "shoe")
+
+    with db.engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("UPDATE products SET name = 'Boot'"))
+        assert storage.search_products("Shoe") == [("1", "Shoe", "S1", "10")]
+        writer.rollback()
+
+
+def test_invalid_profile_value_is_rejected(monkeypatch):
+    monkeypatch.setattr(config, "SQLITE_JOURNAL_MODE", "WAL; DROP TABLE products")
+    with pytest.raises(ValueError):
+        db.sqlite_profile()
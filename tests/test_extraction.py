@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import html_parse
+from extraction import (
+    DEFAULT_PROFILE,
+    SELENIUM_EXTRACT_JS,
+    VARIATIONS_STRAINER,
+    ExtractionProfile,
+    ProfileRegistry,
+    variation_images,
+)
+from plugins.woocommerce import WooCommerceScraper
+
+PAGE = """
+<html><body>
+<h1 class="product__title">Bottes</h1>
+<p class="price"><del>99,00 €</del> <ins><span class="amount">79,50 €</span></ins></p>
+<div class="summary"><div class="desc"><p>Cuir <a href="/cuir">pleine fleur</a></p></div></div>
+</body></html>
+"""
+
+
+def test_registry_merges_json_profiles_and_saved_selectors(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({
+        "www.boots.example": {"title": "h1.product__title", "price": [".price ins .amount", ".price"]},
+        "broken.example": {"colour": ".x"},
+    }))
+    registry = ProfileRegistry.load(str(path), {
+        "boots.example": {"description": ".summary .desc"},
+        "other.example": {"gallery": "#d img"},
+        "bad.example": {"colour": ".x"},
+    })
+
+    boots = registry.for_url("https://boots.example/p/1")
+    assert boots.title == ("h1.product__title",)
+    assert boots.description[0] == ".summary .desc"
+    assert boots.gallery == DEFAULT_PROFILE.gallery
+    # A selector only goes into the field it was saved for
+    other = registry.for_url("http://other.example/x")
+    assert other.gallery == "#d img"
+    assert other.description == DEFAULT_PROFILE.description
+    assert registry.for_url("http://bad.example/x") is DEFAULT_PROFILE
+    assert registry.for_url("http://broken.example/x") is DEFAULT_PROFILE
+    assert registry.for_url("http://unknown.example/") is DEFAULT_PROFILE
+
+
+def test_profile_extracts_from_strained_parse():
+    profile = ExtractionProfile.from_dict({
+        "title": "h1.product__title",
+        "price": [".price ins .amount"],
+        "description": ".summary .desc",
+    })
+    soup = html_parse.parse(PAGE, profile.product_strainer)
+    assert profile.product_fields(soup) == ("Bottes", "79.50", [])
+
+    title, description = profile.fiche_parts(html_parse.parse(PAGE, profile.fiche_strainer))
+    assert title.get_text() == "Bottes"
+    assert description.find("a")["href"] == "/cuir"
+    assert profile.fiche_required == ("h1.product__title", ".summary .desc")
+
+
+def test_complex_selectors_disable_the_strainer():
+    profile = ExtractionProfile.from_dict({"price": ["[itemprop=price]"]})
+    assert profile.product_strainer is None
+    assert DEFAULT_PROFILE.product_strainer is not None
+
+
+def test_driver_fields_come_from_a_single_script_call():
+    class Driver:
+        calls = []
+
+        def execute_script(self, script, args):
+            self.calls.append((script, args))
+            return {"title": "Sac", "price": "79,90 €", "swatches": ["Noir", "Bleu"], "gallery": []}
+
+        def find_element(self, *a):
+            raise AssertionError("no per-field round-trips")
+
+    driver = Driver()
+    fields = WooCommerceScraper._product_fields_from_driver(driver, DEFAULT_PROFILE)
+    assert fields == ("Sac", "79.90", ["Noir", "Bleu"])
+    assert driver.calls == [(SELENIUM_EXTRACT_JS, DEFAULT_PROFILE.js_args)]
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        ExtractionProfile.from_dict({"colour": ".x"})
+
+
+def test_variation_images_without_colour_attribute_and_ajax_fallback():
+    html = """<form class="variations_form" data-product_variations='[
+      {"attributes": {"attribute_modele": "Classique"}, "image": {"full_src": "http://img/a.jpg"}},
+      {"attributes": {"attribute_modele": ""}, "image": {"src": "http://img/any.jpg"}}
+    ]'></form>"""
+    assert variation_images(html_parse.parse(html, VARIATIONS_STRAINER)) == {"Classique": ["http://img/a.jpg"]}
+    ajax = "<form class='variations_form' data-product_variations='false'></form>"
+    assert variation_images(html_parse.parse(ajax, VARIATIONS_STRAINER)) is None
+    assert variation_images(html_parse.parse(PAGE, VARIATIONS_STRAINER)) is None
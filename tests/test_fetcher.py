@@ -0,0 +1,124 @@
+import os
+
+import pytest
+import requests
+
+import db
+import storage
+from fetcher import BROWSER, BROWSER_AFTER_MISSES, HTTP, NOT_MODIFIED, HttpFetcher, has_selectors
+from plugins.woocommerce import PRODUCT_REQUIRED
+from retry_queue import THROTTLED, classify
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+class FakeResponse:
+    def __init__(self, text, status=200, headers=None):
+        self.text = text
+        self.status_code = status
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, text):
+        self.text = text
+        self.calls = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.calls.append(url)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return FakeResponse("", 304)
+        return FakeResponse(self.text, headers={"ETag": '"v1"', "Last-Modified": "Mon, 12 Oct 2026 08:00:00 GMT"})
+
+
+def _setup(tmp_path):
+    db.init_engine(tmp_path / "f.db")
+    storage.init_db()
+
+
+def test_has_selectors_on_saved_page():
+    html = open(os.path.join(DATA_DIR, "variable.html")).read()
+    assert has_selectors(html, PRODUCT_REQUIRED)
+    assert not has_selectors("<html><body><p>js app</p></body></html>", PRODUCT_REQUIRED)
+
+
+def test_fetch_records_http_tier(tmp_path):
+    _setup(tmp_path)
+    html = open(os.path.join(DATA_DIR, "simple.html")).read()
+    fetcher = HttpFetcher()
+    fetcher.session = FakeSession(html)
+    assert fetcher.fetch("http://shop.example/p1", PRODUCT_REQUIRED) == html
+    assert storage.get_preference("fetch_tier:shop.example") == HTTP
+
+
+def test_browser_tier_skips_http(tmp_path):
+    _setup(tmp_path)
+    fetcher = HttpFetcher()
+    fetcher.session = FakeSession("<div id='app'></div>")
+    for n in range(BROWSER_AFTER_MISSES):
+        assert fetcher.tier("http://spa.example/p1") is None
+        assert fetcher.fetch(f"http://spa.example/p{n}", PRODUCT_REQUIRED) is None
+        fetcher.record_tier(f"http://spa.example/p{n}", BROWSER)
+
+    again = HttpFetcher()
+    again.session = FakeSession("")
+    assert again.fetch("http://spa.example/p9", PRODUCT_REQUIRED) is None
+    assert again.session.calls == []
+
+
+def test_page_without_price_does_not_switch_domain_to_browser(tmp_path):
+    _setup(tmp_path)
+    html = open(os.path.join(DATA_DIR, "simple.html")).read()
+    fetcher = HttpFetcher()
+    fetcher.session = FakeSession(html.replace("price", "sold-out"))
+    for n in range(BROWSER_AFTER_MISSES):
+        assert fetcher.fetch(f"http://shop.example/p{n}", PRODUCT_REQUIRED) is None
+        fetcher.record_tier(f"http://shop.example/p{n}", BROWSER)
+    assert fetcher.tier("http://shop.example/p9") is None
+
+
+def test_failed_request_does_not_switch_domain_to_browser(tmp_path):
+    _setup(tmp_path)
+
+    class DownSession(FakeSession):
+        def get(self, url, timeout=None, headers=None):
+            raise requests.ConnectionError("connection reset")
+
+    fetcher = HttpFetcher()
+    fetcher.session = DownSession("")
+    assert fetcher.fetch("http://shop.example/p1", PRODUCT_REQUIRED) is None
+    fetcher.record_tier("http://shop.example/p1", BROWSER)
+    assert fetcher.tier("http://shop.example/p2") is None
+    assert storage.get_preference("fetch_tier:shop.example") in (None, "")
+
+
+def test_throttled_fetch_raises_for_the_retry_queue(tmp_path):
+    _setup(tmp_path)
+
+    class ThrottledSession(FakeSession):
+        def get(self, url, timeout=None, headers=None):
+            resp = requests.Response()
+            resp.status_code = 429
+            resp.url = url
+            return resp
+
+    fetcher = HttpFetcher()
+    fetcher.session = ThrottledSession("")
+    with pytest.raises(requests.HTTPError) as info:
+        fetcher.fetch("http://shop.example/p1", PRODUCT_REQUIRED)
+    assert classify(info.value) == THROTTLED
+
+
+def test_conditional_fetch_returns_not_modified(tmp_path):
+    _setup(tmp_path)
+    html = open(os.path.join(DATA_DIR, "simple.html")).read()
+    fetcher = HttpFetcher()
+    fetcher.session = FakeSession(html)
+    url = "http://shop.example/p1"
+    assert fetcher.fetch(url, PRODUCT_REQUIRED) == html
+    validators = fetcher.validators[url]
+    assert validators == ('"v1"', "Mon, 12 Oct 2026 08:00:00 GMT")
+    assert fetcher.fetch(url, PRODUCT_REQUIRED, validators) is NOT_MODIFIED
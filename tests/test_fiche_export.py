@@ -0,0 +1,74 @@
+import json
+import os
+
+from fiche_export import export_batches
+
+
+def _fiches(folder, start, stop):
+    for i in range(start, stop):
+        (folder / f"{i:04d}.txt").write_text(f"<h1>Produit {i}</h1><p>desc</p>\n", encoding="utf-8")
+
+
+def test_first_export_matches_plain_json_dump(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    src.mkdir()
+    _fiches(src, 0, 5)
+    assert export_batches(str(src), str(out), batch_size=2, log=lambda m: None) == (3, 3)
+
+    text = (out / "batch_1.json").read_text(encoding="utf-8")
+    expected = [
+        {"id": i + 1, "id_source": f"{i:04d}", "nom": f"{i:04d}.txt",
+         "h1": f"Produit {i}", "html": f"<h1>Produit {i}</h1><p>desc</p>"}
+        for i in range(2)
+    ]
+    assert text == json.dumps(expected, ensure_ascii=False, indent=2)
+
+
+def test_reexport_only_touches_changed_batches(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    src.mkdir()
+    _fiches(src, 0, 95)
+    quiet = lambda m: None
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (10, 10)
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (0, 10)
+
+    _fiches(src, 95, 100)
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (1, 10)
+    last = json.loads((out / "batch_10.json").read_text(encoding="utf-8"))
+    assert [r["id"] for r in last] == list(range(91, 101))
+
+    (src / "0003.txt").write_text("<h1>Modifié</h1>", encoding="utf-8")
+    os.remove(src / "0015.txt")
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (2, 10)
+    first = json.loads((out / "batch_1.json").read_text(encoding="utf-8"))
+    second = json.loads((out / "batch_2.json").read_text(encoding="utf-8"))
+    assert first[3]["h1"] == "Modifié"
+    assert len(second) == 9 and 16 not in [r["id"] for r in second]
+
+
+def test_ndjson_output_replaces_json_batches(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    src.mkdir()
+    _fiches(src, 0, 3)
+    export_batches(str(src), str(out), batch_size=2, log=lambda m: None)
+    export_batches(str(src), str(out), batch_size=2, fmt="ndjson", log=lambda m: None)
+
+    assert sorted(p.name for p in out.glob("batch_*")) == ["batch_1.ndjson", "batch_2.ndjson"]
+    lines = (out / "batch_2.ndjson").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["nom"] for line in lines] == ["0002.txt"]
+
+
+def test_batch_with_unreadable_fiche_is_exported_again(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    src.mkdir()
+    _fiches(src, 0, 2)
+    (src / "0001.txt").write_bytes(b"<h1>\xff</h1>")
+    quiet = lambda m: None
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (1, 1)
+    assert len(json.loads((out / "batch_1.json").read_text(encoding="utf-8"))) == 1
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (1, 1)
+
+    _fiches(src, 1, 2)
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (1, 1)
+    assert len(json.loads((out / "batch_1.json").read_text(encoding="utf-8"))) == 2
+    assert export_batches(str(src), str(out), batch_size=10, log=quiet) == (0, 1)
@@ -0,0 +1,57 @@
+from bs4 import BeautifulSoup
+
+import html_parse
+from extraction import DEFAULT_PROFILE
+
+PRODUCT = """
+<html><head><title>Sac</title><script>var x = "<h1>no</h1>";</script></head><body>
+<nav><ul>""" + "<li><a href='/c'>Catégorie</a></li>" * 50 + """</ul></nav>
+<h1 class="product-info__title">Sac <em>Voyage</em></h1>
+<div class="summary"><span class="woocommerce-Price-amount amount">49,90 €</span></div>
+<sale-price class="text-lg">39,90 €</sale-price>
+<label class="color-swatch"><span class="sr-only">Noir</span></label>
+<label class="color-swatch"><span class="sr-only">Rouge</span></label>
+<footer>""" + "<p>texte</p>" * 50 + """</footer>
+</body></html>
+"""
+
+FICHE = """
+<html><body><h1 class="product-single__title">Sac Voyage</h1>
+<div class="accordion__content"><div class="prose"><p>Un <a href="/x">sac</a> solide.</p></div></div>
+<div class="prose"><p>Autre</p></div></body></html>
+"""
+
+
+def test_strained_parse_extracts_the_same_product_fields():
+    full = BeautifulSoup(PRODUCT, "html.parser")
+    strained = html_parse.parse(PRODUCT, DEFAULT_PROFILE.product_strainer)
+
+    for sel in ("h1", "sale-price.text-lg", ".woocommerce-Price-amount", "label.color-swatch span.sr-only"):
+        assert [str(e) for e in strained.select(sel)] == [str(e) for e in full.select(sel)]
+    assert not strained.find("footer") and not strained.find("li")
+
+
+def test_strained_parse_keeps_the_description_block():
+    full = BeautifulSoup(FICHE, "html.parser")
+    strained = html_parse.parse(FICHE, DEFAULT_PROFILE.fiche_strainer)
+    container = strained.find("div", class_="accordion__content")
+    assert str(container.find("div", class_="prose")) == str(
+        full.find("div", class_="accordion__content").find("div", class_="prose")
+    )
+    assert strained.find("h1", class_="product-single__title").get_text() == "Sac Voyage"
+
+
+def test_strainer_for_required_selectors():
+    strainer = html_parse.strainer_for(DEFAULT_PROFILE.product_required)
+    assert html_parse.strainer_for(DEFAULT_PROFILE.product_required) is strainer
+    soup = html_parse.parse(PRODUCT, strainer)
+    assert soup.select_one(".woocommerce-Price-amount") is not None
+    assert not soup.find("label") and not soup.find("li")
+    # Selectors starting with an attribute or a pseudo-class need the whole page
+    assert html_parse.strainer_for(("[data-x]",)) is None
+
+
+def test_benchmark_reports_each_configuration():
+    timings = html_parse.benchmark(PRODUCT, DEFAULT_PROFILE.product_strainer, repeat=2)
+    assert {"html.parser", "html.parser+strainer"} <= set(timings)
+    assert all(ms > 0 for ms in timings.values())
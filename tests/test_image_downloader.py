@@ -0,0 +1,66 @@
+import threading
+import time
+
+from image_downloader import ImageDownloader
+
+
+class FakeResponse:
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+
+    def __enter__(self):
+        with self.session.lock:
+            self.session.active += 1
+            self.session.peak = max(self.session.peak, self.session.active)
+        return self
+
+    def __exit__(self, *exc):
+        with self.session.lock:
+            self.session.active -= 1
+
+    def raise_for_status(self):
+        if "missing" in self.url:
+            raise IOError("404")
+
+    def iter_content(self, size):
+        time.sleep(0.02)
+        yield self.url.encode()
+        yield b"-end"
+
+
+class FakeSession:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def get(self, url, stream=False, timeout=None):
+        return FakeResponse(self, url)
+
+    def close(self):
+        pass
+
+
+def test_downloads_stream_to_disk(tmp_path):
+    session = FakeSession()
+    with ImageDownloader(max_workers=8, per_host=2, session=session) as dl:
+        futures = [dl.submit(f"http://cdn/img{i}.webp", str(tmp_path / f"{i}.webp")) for i in range(6)]
+        paths = [f.result() for f in futures]
+
+    assert (tmp_path / "3.webp").read_bytes() == b"http://cdn/img3.webp-end"
+    assert len(paths) == 6
+    assert session.peak == 2
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_failed_download_raises(tmp_path):
+    with ImageDownloader(session=FakeSession()) as dl:
+        fut = dl.submit("http://cdn/missing.webp", str(tmp_path / "x.webp"))
+        try:
+            fut.result()
+        except IOError:
+            pass
+        else:
+            raise AssertionError("expected failure")
+    assert not (tmp_path / "x.webp").exists()
@@ -0,0 +1,108 @@
+import struct
+
+import image_probe
+from image_downloader import ImageDownloader
+from image_probe import ImageInfo, image_info, probe_url
+
+
+def png(w, h):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", w, h) + b"\x08\x02\x00\x00\x00"
+
+
+def jpeg(w, h):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc2" + struct.pack(">HBHH", 17, 8, h, w) + b"\x03" + b"\x00" * 9
+    return b"\xff\xd8" + app0 + sof + b"\xff\xda"
+
+
+def webp(chunk, payload):
+    return b"RIFF" + struct.pack("<I", 100) + b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+
+
+def avif(w, h):
+    ftyp = struct.pack(">I", 20) + b"ftypavif" + b"\x00" * 4 + b"mif1"
+    thumb = struct.pack(">I", 20) + b"ispe" + b"\x00" * 4 + struct.pack(">II", 160, 120)
+    main = struct.pack(">I", 20) + b"ispe" + b"\x00" * 4 + struct.pack(">II", w, h)
+    return ftyp + b"meta" + thumb + main
+
+
+def test_image_info_reads_common_headers():
+    assert image_info(png(640, 480)) == ImageInfo("png", 640, 480)
+    assert image_info(jpeg(1200, 800)) == ImageInfo("jpeg", 1200, 800)
+    assert image_info(b"GIF89a" + struct.pack("<HH", 32, 16)) == ImageInfo("gif", 32, 16)
+    lossy = b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 1024, 768)
+    assert image_info(webp(b"VP8 ", lossy)) == ImageInfo("webp", 1024, 768)
+    bits = (300 - 1) | ((200 - 1) << 14)
+    assert image_info(webp(b"VP8L", b"\x2f" + struct.pack("<I", bits))) == ImageInfo("webp", 300, 200)
+    ext = b"\x10\x00\x00\x00" + (2000 - 1).to_bytes(3, "little") + (1500 - 1).to_bytes(3, "little")
+    assert image_info(webp(b"VP8X", ext)) == ImageInfo("webp", 2000, 1500)
+    assert image_info(avif(1600, 900)) == ImageInfo("avif", 1600, 900)
+    assert image_info(b"<html>") is None
+    assert image_info(b"\xff\xd8\xff\xe0") == ImageInfo("jpeg")
+
+
+def test_type_from_url_and_content_type():
+    assert image_probe.url_type("https://cdn/x/photo.JPG?v=2") == "jpeg"
+    assert image_probe.url_type("https://cdn/x/photo") is None
+    assert image_probe.normalize_type("image/webp; charset=binary") == "webp"
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self.body = body
+        self.headers = headers
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            self.read += size
+            yield self.body[i:i + size]
+
+
+class FakeSession:
+    """Ignores ``Range`` and serves the whole body, like some CDNs do."""
+
+    def __init__(self, bodies, content_type="image/png"):
+        self.bodies = bodies
+        self.content_type = content_type
+        self.responses = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        resp = FakeResponse(self.bodies[url], {"Content-Type": self.content_type})
+        self.responses.append((headers, resp))
+        return resp
+
+    def close(self):
+        pass
+
+
+def test_probe_stops_reading_after_header():
+    session = FakeSession({"http://cdn/a.png": png(50, 50) + b"\x00" * 500_000})
+    assert probe_url(session, "http://cdn/a.png") == ImageInfo("png", 50, 50)
+    headers, resp = session.responses[0]
+    assert headers["Range"] == f"bytes=0-{image_probe.PROBE_BYTES - 1}"
+    assert resp.read <= image_probe.PROBE_BYTES
+
+
+def test_downloader_skips_rejected_images(tmp_path):
+    session = FakeSession({
+        "http://cdn/small.png": png(80, 80) + b"\x00" * 100,
+        "http://cdn/large.png": png(1200, 900) + b"\x00" * 100,
+    })
+    accept = lambda info: info.width >= 500
+    with ImageDownloader(session=session) as dl:
+        small = dl.submit("http://cdn/small.png", str(tmp_path / "s.png"), accept)
+        large = dl.submit("http://cdn/large.png", str(tmp_path / "l.png"), accept)
+        assert small.result() is None
+        assert large.result() == str(tmp_path / "l.png")
+    assert not (tmp_path / "s.png").exists()
+    assert image_probe.probe_file(str(tmp_path / "l.png")) == ImageInfo("png", 1200, 900)
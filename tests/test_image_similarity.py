@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+import pytest
+
+import db
+import storage
+from image_similarity import BKTree, dhash, hamming
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _gradient(path, size, noise=0):
+    x = np.linspace(0, 255, size[0])
+    y = np.linspace(0, 255, size[1])[:, None]
+    px = (x * 0.7 + y * 0.3) % 256
+    if noise:
+        px = px + np.random.default_rng(1).normal(0, noise, px.shape)
+    Image.fromarray(np.clip(px, 0, 255).astype("uint8")).save(path)
+
+
+def test_dhash_matches_resized_copies(tmp_path):
+    _gradient(tmp_path / "big.png", (800, 600))
+    _gradient(tmp_path / "small.png", (200, 150), noise=3)
+    Image.fromarray(np.random.default_rng(2).integers(0, 255, (150, 200), dtype="uint8")).save(
+        tmp_path / "other.png"
+    )
+
+    big, small, other = (dhash(str(tmp_path / n)) for n in ("big.png", "small.png", "other.png"))
+    assert hamming(big, small) <= 6
+    assert hamming(big, other) > 16
+    assert dhash(str(tmp_path / "missing.png")) is None
+
+
+def test_bktree_finds_neighbours_like_a_linear_scan():
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(500)]
+    tree = BKTree(hashes)
+    probe = hashes[42] ^ 0b101
+    expected = sorted((hamming(probe, h), h) for h in hashes if hamming(probe, h) <= 10)
+    assert tree.find(probe, 10) == expected
+    assert tree.find(probe, 10)[0] == (2, hashes[42])
+
+
+def test_index_stores_perceptual_hashes(tmp_path):
+    db.init_engine(tmp_path / "idx.db")
+    storage.init_db()
+    folder = tmp_path / "images"
+    folder.mkdir()
+    _gradient(folder / "a.png", (300, 200))
+
+    storage.sync_image_index(str(folder))
+    assert storage.image_phashes(str(folder)) == []
+    storage.sync_image_index(str(folder), perceptual=True)
+    assert storage.image_phashes(str(folder)) == [dhash(str(folder / "a.png"))]
+
+    _gradient(folder / "b.png", (200, 200))
+    value = dhash(str(folder / "b.png"))
+    assert storage.record_image_hash(str(folder / "b.png"), "digest-b", value) == "digest-b"
+    assert value in storage.image_phashes(str(folder))
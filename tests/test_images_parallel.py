@@ -0,0 +1,73 @@
+import queue
+import threading
+
+from plugins import woocommerce
+
+
+class ThreadContext:
+    """Stand-in for a spawn context running the shards in threads."""
+
+    Queue = queue.Queue
+    Event = threading.Event
+
+    @staticmethod
+    def Process(target, args, name):
+        return threading.Thread(target=target, args=args, name=name)
+
+
+def test_shards_split_urls_and_aggregate_progress(monkeypatch, tmp_path):
+    shards = {}
+
+    def fake_shard(shard, urls, dest_folder, settings, options, events, stop):
+        shards[shard] = (urls, settings["driver_path"], options["suffix"])
+        events.put(("log", shard, f"shard {shard}"))
+        events.put(("preview", shard, (f"tmp{shard}", None)))
+        events.put(("progress", shard, 100))
+        events.put(("done", shard, "ok"))
+
+    monkeypatch.setattr(woocommerce.multiprocessing, "get_context", lambda method: ThreadContext)
+    monkeypatch.setattr(woocommerce, "_scrap_images_shard", fake_shard)
+    scraper = woocommerce.WooCommerceScraper(base_dir=str(tmp_path))
+    progress, previews = [], []
+
+    result = scraper.scrap_images(
+        ["u1", "u2", "u3", "u4", "u5"],
+        str(tmp_path / "images"),
+        driver_path="chromedriver",
+        suffix="alt",
+        progress_callback=progress.append,
+        preview_callback=lambda *paths: previews.append(paths),
+        workers=2,
+    )
+
+    assert result == "Scraping images terminé"
+    assert shards == {0: (["u1", "u3", "u5"], "chromedriver", "alt"), 1: (["u2", "u4"], "chromedriver", "alt")}
+    assert sorted(previews) == [("tmp0", None), ("tmp1", None)]
+    # 3 of 5 urls in shard 0, 2 in shard 1
+    assert progress[0] in (40, 60) and progress[1:] == [100, 100]
+    assert {"shard 0", "shard 1"} <= set(scraper._logs)
+
+
+def test_shard_target_runs_in_a_spawned_process(tmp_path):
+    ctx = woocommerce.multiprocessing.get_context("spawn")
+    events, stop = ctx.Queue(), ctx.Event()
+    settings = {
+        "base_dir": str(tmp_path),
+        "driver_path": "chromedriver",
+        "binary_path": None,
+        **{name: getattr(woocommerce.WooCommerceScraper(str(tmp_path)), name) for name in woocommerce._SHARD_SETTINGS},
+    }
+    # an invalid pool size fails the shard before any browser is launched
+    settings["browser_pool_options"] = {"max_size": "invalid"}
+    process = ctx.Process(
+        target=woocommerce._scrap_images_shard,
+        args=(3, ["u1"], str(tmp_path / "images"), settings, {}, events, stop),
+        name="images-3",
+    )
+    process.start()
+    received = [events.get(timeout=60) for _ in range(2)]
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
+    assert received[0][:2] == ("log", 3) and "interrompu" in received[0][2]
+    assert received[1] == ("done", 3, None)
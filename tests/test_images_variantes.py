@@ -1,7 +1,5 @@
 import json
 
-import pytest
-
 from scraper_core import ScraperCore
 
 
@@ -51,6 +49,10 @@ class DummyDriver:
     def get(self, url):
         self.current_url = url
 
+    @property
+    def page_source(self):
+        return self.pages[self.current_url].get("html", "<html></html>")
+
     def find_elements(self, by=None, value=None):
         page = self.pages[self.current_url]
         if value == "label.color-swatch":
@@ -81,6 +83,7 @@ def test_scrap_images_variantes(monkeypatch, tmp_path):
         "webdriver_manager.chrome.ChromeDriverManager.install", lambda self=None: "driver"
     )
     monkeypatch.setattr("time.sleep", lambda *a, **k: None)
+    monkeypatch.setattr("fetcher.HttpFetcher.fetch", lambda self, url, required=(): None)
 
     core = ScraperCore(base_dir=tmp_path)
     items = [{"id": "99", "url": "http://p1"}]
@@ -100,3 +103,63 @@ def test_scrap_images_variantes(monkeypatch, tmp_path):
     assert mapping_path.exists()
     mapping = json.loads(mapping_path.read_text())
     assert "99" in mapping and "Red" in mapping["99"]
+
+
+def test_browser_fallback_reuses_http_host_slot(monkeypatch, tmp_path):
+    pages = {"http://p1": {"variants": {"Red": ["http://img/red1.webp"]}}}
+    monkeypatch.setattr(
+        "selenium.webdriver.Chrome", lambda service=None, options=None: DummyDriver(pages)
+    )
+    monkeypatch.setattr(
+        "webdriver_manager.chrome.ChromeDriverManager.install", lambda self=None: "driver"
+    )
+    monkeypatch.setattr("time.sleep", lambda *a, **k: None)
+    monkeypatch.setattr("fetcher.HttpFetcher.fetch", lambda self, url, required=(): None)
+
+    core = ScraperCore(base_dir=tmp_path)
+    waits = []
+    monkeypatch.setattr(core._plugin.politeness, "wait", waits.append)
+    core.scrap_images_variantes([{"id": "99", "url": "http://p1"}], "https://wp", "upload", "{id}-{variant}-{name}")
+
+    assert waits == ["http://p1"]
+
+
+VARIATIONS_HTML = """
+<form class="variations_form cart" data-product_variations='[
+  {"attributes": {"attribute_pa_couleur": "rouge", "attribute_pa_taille": "s"},
+   "image": {"src": "http://img/red1.webp"},
+   "variation_gallery_images": [{"src": "http://img/red1.webp"}, {"src": "http://img/red2.webp"}]},
+  {"attributes": {"attribute_pa_couleur": "rouge", "attribute_pa_taille": "m"},
+   "image": {"src": "http://img/red1.webp"}},
+  {"attributes": {"attribute_pa_couleur": "bleu", "attribute_pa_taille": "s"},
+   "image": {"src": "http://img/blue1.webp"}}
+]'>
+  <select name="attribute_pa_couleur">
+    <option value="">Choisir</option><option value="rouge">Rouge</option><option value="bleu">Bleu</option>
+  </select>
+</form>
+"""
+
+
+def test_scrap_images_variantes_reads_embedded_variations(monkeypatch, tmp_path):
+    pages = {"http://p1": {"variants": {}, "html": VARIATIONS_HTML}}
+    clicks = []
+    monkeypatch.setattr(DummyLabel, "click", lambda self: clicks.append(self.name))
+    monkeypatch.setattr(
+        "selenium.webdriver.Chrome", lambda service=None, options=None: DummyDriver(pages)
+    )
+    monkeypatch.setattr(
+        "webdriver_manager.chrome.ChromeDriverManager.install", lambda self=None: "driver"
+    )
+    monkeypatch.setattr("fetcher.HttpFetcher.fetch", lambda self, url, required=(): VARIATIONS_HTML)
+
+    core = ScraperCore(base_dir=tmp_path)
+    items = [{"id": "7", "url": "http://p1"}]
+    df = core.scrap_images_variantes(items, "https://wp", "upload", "{id}-{variant}-{name}")
+
+    assert not clicks
+    assert list(zip(df["variante"], df["url concurrent"])) == [
+        ("Rouge", "http://img/red1.webp"),
+        ("Rouge", "http://img/red2.webp"),
+        ("Bleu", "http://img/blue1.webp"),
+    ]
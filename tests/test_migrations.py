@@ -0,0 +1,56 @@
+import sqlite3
+
+from sqlalchemy import text
+
+import db
+import storage
+from db import migrations
+
+
+def test_search_uses_fts_and_follows_updates(tmp_path):
+    db.init_engine(tmp_path / "fts.db")
+    storage.init_db()
+    storage.upsert_products_bulk([
+        {"product_id": "1", "name": "Sac à dos Voyage", "sku": "S1", "price": "10", "dossier": "a"},
+        {"product_id": "2", "name": "Sandale", "sku": "S2", "price": "20", "dossier": "b"},
+    ])
+    storage.upsert_product("2", "Sac banane", "S2", "20", "b")
+
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM products_fts")).scalar() == 2
+    assert sorted(r[0] for r in storage.search_products("SAC")) == ["1", "2"]
+    assert storage.search_products("voyage") == [("1", "Sac à dos Voyage", "S1", "10")]
+    assert storage.search_products("ndal") == []
+    assert [r[0] for r in storage.search_products("ba")] == ["2"]
+
+
+def test_upgrade_brings_old_database_up_to_date(tmp_path):
+    path = tmp_path / "old.db"
+    con = sqlite3.connect(path)
+    con.executescript(
+        """
+        CREATE TABLE products (product_id VARCHAR PRIMARY KEY, name VARCHAR, sku VARCHAR,
+                               price VARCHAR, dossier VARCHAR);
+        CREATE TABLE competitors (id INTEGER PRIMARY KEY, product_id VARCHAR, title VARCHAR,
+                                  url VARCHAR, file_path VARCHAR, status VARCHAR);
+        CREATE TABLE image_hashes (path VARCHAR PRIMARY KEY, size INTEGER, mtime FLOAT, digest VARCHAR);
+        INSERT INTO products VALUES ('7', 'Chaussure rouge', 'C7', '15', 'c');
+        """
+    )
+    con.close()
+
+    db.init_engine(path)
+    storage.init_db()
+
+    with db.engine.connect() as conn:
+        assert migrations.schema_version(conn) == len(migrations.MIGRATIONS)
+        cols = {r[1] for r in conn.exec_driver_sql("PRAGMA table_info(image_hashes)")}
+        indexes = {r[1] for r in conn.exec_driver_sql("PRAGMA index_list(competitors)")}
+        plan = " ".join(str(r[-1]) for r in conn.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT status, count(id) FROM competitors GROUP BY status"
+        ))
+    assert "phash" in cols
+    assert {"ix_competitors_status", "ix_competitors_product_id"} <= indexes
+    assert "COVERING INDEX ix_competitors_status" in plan
+    assert storage.search_products("rouge") == [("7", "Chaussure rouge", "C7", "15")]
+    assert migrations.upgrade(db.engine) == len(migrations.MIGRATIONS)
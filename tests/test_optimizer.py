@@ -49,3 +49,58 @@ def test_optimize_unsupported(tmp_path):
     opt = ImageOptimizer('optipng', 'cwebp')
     log = opt.optimize_file(str(file))
     assert 'Format non supporté' in log
+
+
+def _fake_tools(monkeypatch, calls, delay=0.0):
+    import threading
+    import time
+    lock = threading.Lock()
+
+    def fake_run(cmd, capture_output=True, text=True):
+        with lock:
+            calls.append(cmd[-1])
+        time.sleep(delay)
+        with open(cmd[-1], 'ab') as f:
+            f.write(b'-opt')
+
+        class R:
+            returncode = 0
+            stderr = ''
+        return R()
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+
+def test_parallel_folder_keeps_order(monkeypatch, tmp_path):
+    calls = []
+    _fake_tools(monkeypatch, calls, delay=0.01)
+    files = [tmp_path / f'{i:02d}.png' for i in range(12)]
+    for f in files:
+        f.write_bytes(b'x')
+    opt = ImageOptimizer('optipng', 'cwebp', workers=4)
+
+    logs = opt.optimize_folder(str(tmp_path))
+    walked = [line.split(']')[0][1:] for line in logs]
+    assert sorted(walked) == sorted(str(f) for f in files)
+    assert walked == [p for p in opt._eligible(str(tmp_path))]
+    assert all('PNG optimisé' in line for line in logs)
+
+
+def test_manifest_skips_already_optimized(monkeypatch, tmp_path):
+    calls = []
+    _fake_tools(monkeypatch, calls)
+    (tmp_path / 'a.png').write_bytes(b'a')
+    (tmp_path / 'b.png').write_bytes(b'b')
+    opt = ImageOptimizer('optipng', 'cwebp', workers=2)
+
+    opt.optimize_folder(str(tmp_path), ordered=False)
+    assert len(calls) == 2
+
+    calls.clear()
+    (tmp_path / 'b.png').write_bytes(b'b, edited')
+    logs = opt.optimize_folder(str(tmp_path))
+    assert calls == [str(tmp_path / 'b.png')]
+    assert any('Déjà optimisé' in line for line in logs)
+
+    calls.clear()
+    ImageOptimizer('optipng', 'cwebp', use_manifest=False).optimize_folder(str(tmp_path))
+    assert len(calls) == 2
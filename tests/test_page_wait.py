@@ -0,0 +1,76 @@
+import time
+
+import page_wait
+from page_wait import HostScheduler, gallery_sources, wait_gallery_change, wait_ready
+
+
+class ScriptedDriver:
+    """Driver whose ``execute_script`` returns the next scripted state."""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        return self.states[min(self.calls, len(self.states)) - 1]
+
+
+class NoScriptDriver:
+    pass
+
+
+def test_wait_ready_waits_for_selector_and_idle_network():
+    loading = {"complete": False, "found": False, "resources": 3}
+    ready = {"complete": True, "found": True, "resources": 5}
+    driver = ScriptedDriver([loading, loading, ready])
+    assert wait_ready(driver, ["h1"], timeout=2, idle=0.05, poll=0.01)
+    # Two polls while loading, then enough polls to see the network idle
+    assert driver.calls > 3
+
+
+def test_wait_ready_caps_idle_grace_on_busy_pages():
+    busy = iter(range(10**6))
+    driver = ScriptedDriver([])
+    driver.execute_script = lambda script, *args: {"complete": True, "found": True, "resources": next(busy)}
+    start = time.monotonic()
+    assert wait_ready(driver, ["h1"], timeout=5, idle=0.5, grace=0.05, poll=0.01)
+    assert time.monotonic() - start < 1
+
+
+def test_wait_ready_times_out_when_selector_missing():
+    driver = ScriptedDriver([{"complete": True, "found": False, "resources": 1}])
+    start = time.monotonic()
+    assert not wait_ready(driver, ["h1"], timeout=0.1, idle=0, poll=0.01)
+    assert time.monotonic() - start < 1
+
+
+def test_waits_return_immediately_without_scripts():
+    driver = NoScriptDriver()
+    assert wait_ready(driver, ["h1"], timeout=5) is None
+    before = gallery_sources(driver, "img")
+    assert before is None
+    assert not wait_gallery_change(driver, "img", before, timeout=5)
+
+
+def test_wait_gallery_change_detects_swap():
+    driver = ScriptedDriver([["a.jpg"], ["b.jpg"]])
+    before = gallery_sources(driver, "img")
+    assert wait_gallery_change(driver, "img", before, timeout=1, settle=0.02, poll=0.01)
+
+
+def test_wait_gallery_change_gives_up_on_identical_gallery():
+    driver = ScriptedDriver([["a.jpg"]])
+    before = gallery_sources(driver, "img")
+    assert not wait_gallery_change(driver, "img", before, timeout=0.05, poll=0.01)
+
+
+def test_host_scheduler_spaces_same_host_only(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(page_wait.time, "monotonic", lambda: clock[0])
+    sched = HostScheduler(min_interval=1.0, jitter=0)
+    assert sched.delay("https://a.example/p1") == 0
+    assert sched.delay("https://a.example/p2") == 1.0
+    assert sched.delay("https://b.example/p1") == 0
+    clock[0] += 5
+    assert sched.delay("https://a.example/p3") == 0
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import config
+from browser_pool import BrowserPool
+from resource_blocking import TRACKER_PATTERNS, ResourcePolicy
+
+
+def test_policy_blocks_types_and_patterns():
+    policy = ResourcePolicy(types={"image", "font"}, patterns=("*googletagmanager.com*",))
+    assert policy.blocks("image", "https://shop.example/a.jpg")
+    assert policy.blocks("script", "https://www.googletagmanager.com/gtm.js?id=1")
+    assert not policy.blocks("script", "https://shop.example/app.js")
+    assert not policy.blocks("document", "https://shop.example/p/1")
+
+
+def test_url_patterns_cover_query_strings():
+    patterns = ResourcePolicy(types={"font"}, patterns=()).url_patterns()
+    assert "*.woff2" in patterns
+    assert "*.woff2?*" in patterns
+    assert not any("jpg" in p for p in patterns)
+
+
+def test_unknown_type_rejected():
+    with pytest.raises(ValueError):
+        ResourcePolicy(types={"video"})
+
+
+def test_from_config(monkeypatch):
+    monkeypatch.setattr(config, "BLOCK_RESOURCE_TYPES", "image, stylesheet", raising=False)
+    monkeypatch.setattr(config, "BLOCK_URL_PATTERNS", "*chat.example*", raising=False)
+    policy = ResourcePolicy.from_config()
+    assert policy.types == {"image", "stylesheet"}
+    assert policy.patterns == TRACKER_PATTERNS + ("*chat.example*",)
+    monkeypatch.setattr(config, "BLOCK_RESOURCE_TYPES", "none", raising=False)
+    assert not ResourcePolicy.from_config()
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = type("Req", (), {"resource_type": resource_type, "url": url})()
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+def test_playwright_route_handler():
+    policy = ResourcePolicy()
+    image, doc = FakeRoute("image", "https://shop.example/a.webp"), FakeRoute("document", "https://shop.example/")
+    asyncio.run(policy.route(image))
+    asyncio.run(policy.route(doc))
+    assert image.outcome == "abort"
+    assert doc.outcome == "continue"
+
+
+class CdpDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        return {}
+
+
+def test_pool_blocks_urls_once_per_pattern_set():
+    pool = BrowserPool("driver")
+    drv = CdpDriver()
+    pool.block_urls(drv, ["*.png"])
+    pool.block_urls(drv, ["*.png"])
+    assert drv.commands == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": ["*.png"]})]
+    pool.block_urls(drv, [])
+    assert drv.commands[-1] == ("Network.setBlockedURLs", {"urls": []})
@@ -0,0 +1,76 @@
+import csv
+
+import pandas as pd
+import pytest
+
+from result_sinks import RECAP_COLUMNS, WOOCOMMERCE_COLUMNS, CsvSink, open_sink
+
+
+def test_excel_rows_follow_canonical_columns(tmp_path):
+    path = tmp_path / "woocommerce_mix.xlsx"
+    with open_sink(str(path), WOOCOMMERCE_COLUMNS) as sink:
+        sink.write({"Name": "Shoe", "ID Produit": "1", "Type": "simple"})
+        sink.write_many([{"ID Produit": "2", "Type": "variable", "Attribute 1 value(s)": "Red | Green"}])
+        assert not path.exists()
+        sink.flush()
+        # A killed run keeps the flushed rows in the CSV spool
+        with open(tmp_path / "woocommerce_mix.part.csv", encoding="utf-8-sig", newline="") as f:
+            assert len(list(csv.reader(f))) == 3
+
+    df = pd.read_excel(path, dtype=str)
+    assert tuple(df.columns) == WOOCOMMERCE_COLUMNS
+    assert list(df["ID Produit"]) == ["1", "2"]
+    assert df.loc[1, "Attribute 1 value(s)"] == "Red | Green"
+    assert pd.isna(df.loc[0, "Parent"])
+    assert not (tmp_path / "woocommerce_mix.part.csv").exists()
+
+
+def test_csv_rows_reach_disk_every_flush(tmp_path):
+    path = tmp_path / "recap.xlsx"
+    sink = open_sink(str(path), RECAP_COLUMNS, fmt="csv", flush_every=2)
+    assert isinstance(sink, CsvSink) and sink.path.endswith("recap.csv")
+    sink.write(("a.txt", "A", "http://a", "Extraction OK"))
+    sink.write(("?", "?", "http://b", "Extraction Échec"))
+    sink.write(("c.txt", "C", "http://c", "Extraction OK"))
+    # A killed run keeps the flushed rows in the .part file
+    with open(sink.part_path, encoding="utf-8-sig", newline="") as f:
+        assert len(list(csv.reader(f))) == 3
+    sink.close()
+    with open(sink.path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(RECAP_COLUMNS) and len(rows) == 4
+
+
+def test_discard_keeps_previous_file(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("previous")
+    sink = open_sink(str(path), RECAP_COLUMNS)
+    sink.write(("x", "x", "x", "x"))
+    sink.discard()
+    assert path.read_text() == "previous"
+    assert not (tmp_path / "out.csv.part").exists()
+
+    sink = open_sink(str(tmp_path / "out.xlsx"), RECAP_COLUMNS)
+    sink.write(("x", "x", "x", "x"))
+    sink.discard()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.csv"]
+
+
+def test_bad_rows_and_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out.xlsx"), RECAP_COLUMNS, fmt="ods")
+    sink = open_sink(str(tmp_path / "out.csv"), RECAP_COLUMNS)
+    with pytest.raises(ValueError):
+        sink.write(("too", "short"))
+    sink.discard()
+
+
+def test_parquet_row_groups(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "woocommerce_mix.xlsx"
+    with open_sink(str(path), WOOCOMMERCE_COLUMNS, fmt="parquet", flush_every=1) as sink:
+        sink.write({"ID Produit": "1", "Regular price": 9.5})
+        sink.write({"ID Produit": "2"})
+    df = pd.read_parquet(tmp_path / "woocommerce_mix.parquet")
+    assert list(df["ID Produit"]) == ["1", "2"]
+    assert list(df["Regular price"]) == ["9.5", ""]
@@ -0,0 +1,128 @@
+import asyncio
+import socket
+
+import pytest
+import requests
+
+import db
+import retry_queue
+import storage
+from async_engine import run_bounded
+from db.models import CheckpointItem
+from retry_queue import DNS, OTHER, SELECTOR, THROTTLED, TIMEOUT, RetryPolicy, RetryQueue, classify
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(retry_queue.time, "monotonic", c.monotonic)
+    monkeypatch.setattr(retry_queue.time, "sleep", c.sleep)
+    monkeypatch.setattr(retry_queue.random, "uniform", lambda a, b: 1.0)
+    return c
+
+
+def _http_error(code):
+    resp = requests.Response()
+    resp.status_code = code
+    return requests.HTTPError(f"{code} Error", response=resp)
+
+
+def test_classify():
+    assert classify(_http_error(429)) == THROTTLED
+    assert classify(_http_error(503)) == THROTTLED
+    assert classify(socket.gaierror(-2, "Name or service not known")) == DNS
+    assert classify(Exception("unknown error: net::ERR_NAME_NOT_RESOLVED")) == DNS
+    assert classify(requests.Timeout("Read timed out")) == TIMEOUT
+    assert classify(ValueError("Titre produit introuvable")) == SELECTOR
+    assert classify(_http_error(404)) == OTHER
+    assert classify(Exception("HTTP 429 on https://shop.test/a")) == THROTTLED
+    assert classify(Exception("503 Server Error: Service Unavailable for url")) == THROTTLED
+    assert classify(Exception("Failed to load https://shop.test/produit-1503")) == OTHER
+    assert classify(Exception("Failed to load https://shop.test/produit-429")) == OTHER
+
+
+def test_backoff_grows_until_budget_spent(clock):
+    queue = RetryQueue(policies={TIMEOUT: RetryPolicy(5.0, 3)})
+    err = TimeoutError("slow")
+    assert queue.schedule("a", "http://x/a", err) == 5.0
+    assert queue.schedule("a", "http://x/a", err) == 10.0
+    assert queue.schedule("a", "http://x/a", err) is None
+    assert queue.attempts("a") == 3
+
+
+def test_retries_are_interleaved_with_fresh_items(clock):
+    queue = RetryQueue(policies={OTHER: RetryPolicy(2.0, 3)})
+    seen = []
+    fresh = [(str(i), f"http://shop{i}/p") for i in range(5)]
+    for item_id, url in queue.iter_work(fresh):
+        seen.append(item_id)
+        if item_id == "0" and seen.count("0") == 1:
+            queue.schedule(item_id, url, RuntimeError("boom"))
+        clock.now += 1.0
+    # "0" comes back as soon as its delay elapsed, before the fresh tail
+    assert seen == ["0", "1", "0", "2", "3", "4"]
+
+
+def test_throttled_host_defers_its_fresh_items(clock):
+    queue = RetryQueue()
+    seen = []
+    fresh = [("1", "http://slow/1"), ("2", "http://slow/2"), ("3", "http://fast/3")]
+    for item_id, url in queue.iter_work(fresh):
+        seen.append((item_id, clock.now))
+        if item_id == "1" and len(seen) == 1:
+            queue.schedule(item_id, url, _http_error(429))
+    assert [s[0] for s in seen] == ["1", "3", "1", "2"]
+    assert all(t >= 1030.0 for item, t in seen[2:])
+
+
+def test_retries_are_persisted_in_journal(tmp_path, clock):
+    db.init_engine(tmp_path / "retry.db")
+    storage.init_db()
+    journal = storage.CheckpointJournal(batch_size=1)
+    journal.begin("concurrents")
+    RetryQueue(journal, "concurrents").schedule("9", "http://x/9", _http_error(503))
+    with db.SessionLocal() as session:
+        item = session.get(CheckpointItem, ("concurrents", "9"))
+        assert (item.status, item.error_class, item.attempts) == ("retry", THROTTLED, 1)
+        assert item.next_attempt is not None
+    # A new run keeps counting attempts from the journal
+    assert RetryQueue(journal, "concurrents").attempts("9") == 1
+    assert "9" not in journal.done_ids("concurrents")
+
+
+def test_async_work_waits_for_retries_of_items_in_flight(monkeypatch):
+    monkeypatch.setattr(retry_queue.random, "uniform", lambda a, b: 1.0)
+    queue = RetryQueue(policies={THROTTLED: RetryPolicy(0.05, 3)})
+    done = []
+    failed = set()
+
+    async def handler(item):
+        await asyncio.sleep(0.01)
+        if item[0] == "1" and "1" not in failed:
+            failed.add("1")
+            raise _http_error(429)
+        return item[0]
+
+    def on_result(item, result, error):
+        queue.settle()
+        if error is not None:
+            queue.schedule(item[0], item[1], error)
+        else:
+            done.append(result)
+
+    fresh = [("1", "http://slow/1"), ("2", "http://slow/2"), ("3", "http://fast/3")]
+    asyncio.run(run_bounded(queue.aiter_work(fresh), handler, 2, on_result))
+    # The retry and the item deferred by the cooldown both ran
+    assert sorted(done) == ["1", "2", "3"]
+    assert len(queue) == 0
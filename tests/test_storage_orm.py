@@ -3,6 +3,7 @@ from pathlib import Path
 
 import db
 import storage
+from db.models import ImageHash, Product, Variant
 
 
 def test_upsert_and_search(tmp_path):
@@ -16,3 +17,93 @@ def test_upsert_and_search(tmp_path):
 
     results = storage.search_products("Test")
     assert results == [("1", "Test Shoe", "SKU1", "10")]
+
+
+def test_image_index_rehashes_only_changed_files(tmp_path, monkeypatch):
+    db.init_engine(tmp_path / "idx.db")
+    storage.init_db()
+    folder = tmp_path / "images"
+    (folder / "a").mkdir(parents=True)
+    (folder / "a" / "one.webp").write_bytes(b"one")
+    (folder / "two.webp").write_bytes(b"two")
+    (folder / "temp_0.webp").write_bytes(b"pending")
+
+    first = storage.sync_image_index(str(folder))
+    assert first == {storage.file_hash(str(folder / "a" / "one.webp")),
+                     storage.file_hash(str(folder / "two.webp"))}
+
+    hashed = []
+    real_hash = storage.file_hash
+    monkeypatch.setattr(storage, "file_hash", lambda p: hashed.append(p) or real_hash(p))
+    (folder / "two.webp").write_bytes(b"two, edited")
+    (folder / "a" / "one.webp").unlink()
+    second = storage.sync_image_index(str(folder))
+
+    assert hashed == [str(folder / "two.webp")]
+    assert second == {real_hash(str(folder / "two.webp"))}
+
+
+def test_bulk_upserts_update_existing_rows(tmp_path):
+    db.init_engine(tmp_path / "bulk.db")
+    storage.init_db()
+    storage.upsert_product("1", "Old", "S1", "10", "old")
+
+    with storage.UpsertBuffer(batch_size=2) as buf:
+        buf.add_product("1", "Shoe", "S1", "12", "shoe")
+        buf.add_variant("1", "S1-RED", "Red", "12")
+        buf.add_variant("1", "S1-RED", "Rouge", "11")
+        buf.add_product("2", "Boot", "S2", "30", "boot")
+        buf.add_product("3", "Sock", "S3", "5", "sock")
+
+    assert storage.upsert_variants_bulk([]) == 0
+    with db.SessionLocal() as s:
+        products = {p.product_id: (p.name, p.price) for p in s.query(Product)}
+        variants = [(v.sku, v.name, v.price) for v in s.query(Variant)]
+    assert products == {"1": ("Shoe", "12"), "2": ("Boot", "30"), "3": ("Sock", "5")}
+    assert variants == [("S1-RED", "Rouge", "11")]
+
+
+def test_upsert_buffer_runs_callbacks_after_commit(tmp_path):
+    db.init_engine(tmp_path / "callbacks.db")
+    storage.init_db()
+    journal = storage.CheckpointJournal(batch_size=1)
+    journal.begin("variantes")
+    buf = storage.UpsertBuffer(batch_size=10)
+    buf.add_product("1", "Shoe", "S1", "12", "shoe")
+    buf.on_flush(lambda: journal.record("variantes", "1", "done"))
+    # A run killed now leaves the item to scrape again
+    assert journal.done_ids("variantes") == set()
+
+    buf.flush()
+    assert journal.done_ids("variantes") == {"1"}
+    with db.SessionLocal() as s:
+        assert s.get(Product, "1").name == "Shoe"
+
+
+def test_claim_image_digest_keeps_first_file(tmp_path):
+    db.init_engine(tmp_path / "claim.db")
+    storage.init_db()
+    first = tmp_path / "a" / "one.webp"
+    assert storage.claim_image_digest(str(first), "d1")
+    assert storage.claim_image_digest(str(first), "d1")
+    assert not storage.claim_image_digest(str(tmp_path / "b" / "one.webp"), "d1")
+    assert storage.image_digests(str(tmp_path / "a")) == {"d1"}
+
+    # Claiming the path of an indexed file forgets the old file's stats
+    first.parent.mkdir()
+    first.write_bytes(b"old")
+    storage.record_image_hash(str(first), "d1")
+    assert storage.claim_image_digest(str(first), "d2")
+    with db.SessionLocal() as s:
+        row = s.get(ImageHash, str(first))
+        assert (row.digest, row.size, row.mtime) == ("d2", None, None)
+    assert storage.image_digests(str(tmp_path / "b")) == set()
+
+
+def test_saved_selectors_keep_their_field(tmp_path):
+    db.init_engine(tmp_path / "selectors.db")
+    storage.init_db()
+    storage.save_selector("https://boots.example/p/1", ".summary .desc", "description")
+    storage.save_selector("https://other.example/x", "#picked")
+    assert storage.load_selectors() == {"boots.example": ".summary .desc", "other.example": "#picked"}
+    assert storage.load_field_selectors() == {"boots.example": {"description": ".summary .desc"}}
@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import db
+import storage
+import work_queue
+from work_queue import QueueJournal, WorkQueue, run_worker
+
+
+def _queue(tmp_path, **kwargs):
+    db.init_engine(tmp_path / "queue.db")
+    storage.init_db()
+    return WorkQueue(**kwargs)
+
+
+def _clock(monkeypatch, start=datetime(2026, 1, 1)):
+    now = [start]
+    monkeypatch.setattr(work_queue, "_now", lambda: now[0])
+    return now
+
+
+def test_claims_are_disjoint_and_in_order(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue("variantes", {"A": "http://a", "B": "http://b", "C": "http://c"})
+    _, first = queue.claim("variantes", "w1", 2)
+    _, second = queue.claim("variantes", "w2", 2)
+    assert first == [("A", "http://a"), ("B", "http://b")]
+    assert second == [("C", "http://c")]
+    assert queue.claim("variantes", "w3", 2)[1] == []
+
+
+def test_ack_release_and_reenqueue(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue("concurrents", [("1", "http://x/1"), ("2", "http://x/2")])
+    lease, _ = queue.claim("concurrents", "w1", 5)
+    assert queue.ack(lease, "concurrents", "1")
+    assert queue.release(lease) == 1
+    assert queue.counts("concurrents") == {"done": 1, "pending": 1}
+
+    queue.enqueue("concurrents", {"1": "http://x/1"})
+    assert queue.counts("concurrents")["done"] == 1
+    queue.enqueue("concurrents", {"1": "http://x/1"}, reset=True)
+    assert queue.counts("concurrents") == {"pending": 2}
+
+
+def test_expired_lease_is_reclaimed_and_stale_ack_ignored(tmp_path, monkeypatch):
+    now = _clock(monkeypatch)
+    queue = _queue(tmp_path, lease_seconds=60, max_attempts=2)
+    queue.enqueue("variantes", {"A": "http://a"})
+    dead, _ = queue.claim("variantes", "w1")
+
+    now[0] += timedelta(seconds=30)
+    assert queue.heartbeat(dead) == 1
+    now[0] += timedelta(seconds=59)
+    assert queue.claim("variantes", "w2")[1] == []
+
+    now[0] += timedelta(seconds=2)
+    alive, items = queue.claim("variantes", "w2")
+    assert items == [("A", "http://a")]
+    assert not queue.ack(dead, "variantes", "A")
+
+    # Second expiry spends the attempt budget
+    now[0] += timedelta(seconds=61)
+    assert queue.claim("variantes", "w3")[1] == []
+    assert queue.counts() == {"failed": 1}
+
+
+def test_queue_journal_acknowledges_done_and_errors(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue("variantes", {"A": "a", "B": "b", "C": "c"})
+    lease, _ = queue.claim("variantes", "w1", 3)
+    journal = QueueJournal(queue, lease)
+    journal.record("variantes", "A", "done")
+    journal.record("variantes", "B", "retry", "timeout")
+    journal.record("variantes", "C", "error", "404")
+    assert queue.counts("variantes") == {"done": 1, "failed": 1, "leased": 1}
+    assert journal.tried == {"B"}
+
+
+def test_items_tried_on_every_claim_end_up_failed(tmp_path):
+    queue = _queue(tmp_path, max_attempts=2)
+    queue.enqueue("variantes", {"A": "a", "B": "b"})
+    for _ in range(2):
+        lease, items = queue.claim("variantes", "w1")
+        assert [i for i, _ in items] == ["A", "B"]
+        journal = QueueJournal(queue, lease)
+        assert journal.attempts("variantes", "A") == queue.attempts("variantes", "A") - 1
+        journal.record("variantes", "A", "retry", "timeout")
+        # "B" was never reached: its claim does not count
+        assert queue.release(lease, journal.tried) == 2
+    assert queue.attempts("variantes", "B") == 0
+    _, items = queue.claim("variantes", "w1")
+    assert items == [("B", "b")]
+    assert queue.counts("variantes") == {"failed": 1, "leased": 1}
+
+
+class FakeScraper:
+    def __init__(self, base_dir):
+        self.base_dir = str(base_dir)
+        self.checkpoint = storage.CheckpointJournal()
+        self.fichier_excel = "main.xlsx"
+        self.recap_excel_path = "recap.xlsx"
+        self.calls = []
+        self.warm = 0
+
+    @contextmanager
+    def shared_browsers(self):
+        self.warm += 1
+        yield
+
+    def scrap_produits_par_ids(self, id_url_map, ids, processed_ids, should_stop=lambda: False, **kwargs):
+        self.calls.append((list(ids), self.fichier_excel, kwargs))
+        for item_id in ids:
+            self.checkpoint.record("variantes", item_id, "done")
+        return len(ids), 0
+
+    def scrap_fiches_concurrents(self, id_url_map, ids, processed_ids, should_stop=lambda: False, **kwargs):
+        return 0, len(ids)
+
+
+def test_run_worker_drains_queue_in_batches(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue("variantes", {str(i): f"http://x/{i}" for i in range(5)})
+    queue.enqueue("concurrents", {"1": "http://x/1"})
+    scraper = FakeScraper(tmp_path)
+    journal = scraper.checkpoint
+
+    batches = run_worker(scraper, queue, ["variantes"], worker="w1", batch_size=2, headless=True)
+    assert batches == 3
+    assert [ids for ids, _, _ in scraper.calls] == [["0", "1"], ["2", "3"], ["4"]]
+    assert len({path for _, path, _ in scraper.calls}) == 3
+    assert scraper.calls[0][2] == {"headless": True}
+    assert queue.counts("variantes") == {"done": 5}
+    assert scraper.checkpoint is journal and scraper.fichier_excel == "main.xlsx"
+
+    assert scraper.warm == 1
+
+    # A step acknowledging nothing is skipped instead of looping
+    queue.enqueue("variantes", {"5": "http://x/5"})
+    assert run_worker(scraper, queue, ["concurrents", "variantes"], worker="w1") == 2
+    assert queue.counts("concurrents") == {"pending": 1}
+    assert queue.counts("variantes") == {"done": 6}
+
+
+def test_run_worker_fails_items_without_url(tmp_path):
+    from plugins.woocommerce import WooCommerceScraper
+
+    scraper = WooCommerceScraper(base_dir=str(tmp_path))
+    queue = _queue(tmp_path)
+    queue.enqueue("concurrents", {"1": ""})
+
+    assert run_worker(scraper, queue, ["concurrents"], worker="w1", driver_path="chromedriver") == 1
+    assert queue.counts("concurrents") == {"failed": 1}
@@ -2,7 +2,6 @@ import sys
 import os
 import subprocess
 import json
-import hashlib
 from collections import deque
 
 from PySide6.QtCore import (
@@ -1121,22 +1120,9 @@ class MainWindow(QMainWindow):
     def _save_selected_images(self):
         if not getattr(self, "pending_images", None):
             return
-        dest_hashes = set()
-
-        def file_hash(path):
-            h = hashlib.sha256()
-            with open(path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            return h.hexdigest()
-
-        for root, _, files in os.walk(self.input_img_folder.text() or os.path.join(self.scraper.base_dir, "images")):
-            for f in files:
-                fp = os.path.join(root, f)
-                try:
-                    dest_hashes.add(file_hash(fp))
-                except Exception:
-                    pass
+        dest_hashes = storage.sync_image_index(
+            self.input_img_folder.text() or os.path.join(self.scraper.base_dir, "images")
+        )
 
         for i in range(self.preview_list.count()):
             item = self.preview_list.item(i)
@@ -1145,7 +1131,7 @@ class MainWindow(QMainWindow):
                 if os.path.exists(temp_path):
                     os.remove(temp_path)
                 continue
-            h = file_hash(temp_path)
+            h = storage.file_hash(temp_path)
             if h in dest_hashes:
                 os.remove(temp_path)
                 continue
@@ -1154,6 +1140,7 @@ class MainWindow(QMainWindow):
             if os.path.exists(final_path):
                 os.remove(final_path)
             os.rename(temp_path, final_path)
+            storage.record_image_hash(final_path, h)
 
         show_success("Images sauvegardées", self)
         self.preview_list.clear()
@@ -1273,7 +1260,7 @@ class MainWindow(QMainWindow):
 
         def task(progress_callback, should_stop):
             total = len(image_files)
-            for i, log in enumerate(optimizer.iter_optimize_folder(folder), 1):
+            for i, log in enumerate(optimizer.iter_optimize_folder(folder, ordered=False), 1):
                 if should_stop():
                     break
                 self.console_output_optimizer.outputWritten.emit(log)
@@ -22,6 +22,7 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QTextEdit,
     QSystemTrayIcon,
+    QProgressBar,
 )
 from ui.components import (
     RoundButton,
@@ -38,7 +39,7 @@ from pathlib import Path
 import tomllib
 from ui import style
 
-from ui.base_window import MainWindow
+from ui.base_window import MainWindow, Worker
 from ui.style import apply_theme
 from ui.responsive import ResponsiveMixin
 import config
@@ -52,7 +53,9 @@ import matplotlib.pyplot as plt
 import db
 import scheduler
 from accounting import (
-    import_releve,
+    importer_releve_par_lots,
+    InMemoryStorage,
+    ComptaError,
     Transaction,
     JournalEntry,
     CATEGORIES_KEYWORDS,
@@ -308,6 +311,11 @@ class DashboardWindow(ResponsiveMixin, MainWindow):
         btn_layout.addStretch(1)
         layout.addLayout(btn_layout)
 
+        self.progress_import = QProgressBar()
+        self.progress_import.setRange(0, 100)
+        self.progress_import.hide()
+        layout.addWidget(self.progress_import)
+
         # filters
         filter_layout = QHBoxLayout()
         self.filter_start = QDateEdit()
@@ -532,18 +540,46 @@ class DashboardWindow(ResponsiveMixin, MainWindow):
         if not path:
             return
         logger.info("D\u00e9but import du fichier %s", path)
-        try:
-            self.journal_transactions = import_releve(path)
-        except Exception as e:
-            logger.exception("Erreur lors de l'import du relev\u00e9 %s", path)
-            QMessageBox.critical(self, "Erreur d'import", str(e))
-            return
-        logger.info(
-            "Import du fichier %s termin\u00e9 : %d lignes trait\u00e9es",
-            path,
-            len(self.journal_transactions),
-        )
-        self._apply_journal_filters()
+        lots = InMemoryStorage()
+
+        def task(progress_callback, should_stop):
+            # Les erreurs reviennent comme résultat pour être affichées ici
+            try:
+                return importer_releve_par_lots(
+                    path, lots, progress_callback=progress_callback, should_stop=should_stop
+                )
+            except Worker._StopException:
+                raise
+            except Exception as e:
+                if not isinstance(e, ComptaError):
+                    logger.exception("Erreur inattendue lors de l'import du relev\u00e9 %s", path)
+                return e
+
+        def on_result(res):
+            self.progress_import.hide()
+            self.btn_import_tx.setEnabled(True)
+            if isinstance(res, Exception):
+                logger.error("Erreur lors de l'import du relev\u00e9 %s : %s", path, res)
+                QMessageBox.critical(self, "Erreur d'import", str(res))
+                return
+            self.journal_transactions = lots.list_transactions()
+            logger.info(
+                "Import du fichier %s termin\u00e9 : %d lignes trait\u00e9es",
+                path,
+                len(self.journal_transactions),
+            )
+            self._apply_journal_filters()
+
+        worker = Worker(task)
+        worker.progress.connect(self.progress_import.setValue)
+        worker.result.connect(on_result)
+        worker.finished.connect(lambda: self._threads.remove(worker))
+        worker.finished.connect(worker.deleteLater)
+        self._threads.append(worker)
+        self.progress_import.setValue(0)
+        self.progress_import.show()
+        self.btn_import_tx.setEnabled(False)
+        worker.start()
 
     # ------------------------------------------------------------------
     def _add_transaction(self):
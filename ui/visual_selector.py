@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QLineEdit,
+    QComboBox,
 )
 from PySide6.QtWebEngineWidgets import QWebEngineView
 from PySide6.QtWebChannel import QWebChannel
@@ -17,6 +18,7 @@ import logging
 
 from urllib.parse import urlparse
 import storage
+from extraction import PROFILE_FIELDS
 
 # Try loading qwebchannel.js from the packaged resources first.
 _local_qwebchannel = os.path.join(
@@ -42,8 +44,12 @@ def load_selectors():
     return storage.load_selectors()
 
 
-def save_selector(url: str, selector: str) -> None:
-    storage.save_selector(url, selector)
+def load_field_selectors():
+    return storage.load_field_selectors()
+
+
+def save_selector(url: str, selector: str, field: str | None = None) -> None:
+    storage.save_selector(url, selector, field)
 
 
 class JSBridge(QObject):
@@ -221,7 +227,13 @@ class VisualSelectorPage(QWidget):
         self.btn_copy = QPushButton("Copier")
         self.btn_test = QPushButton("Tester")
         self.btn_save = QPushButton("Sauvegarder")
+        # Champ de profil lu par le sélecteur lors du scraping (aucun : non utilisé)
+        self.combo_field = QComboBox()
+        self.combo_field.addItem("Aucun champ", "")
+        for field in PROFILE_FIELDS:
+            self.combo_field.addItem(field, field)
         sel_layout.addWidget(self.input_selector)
+        sel_layout.addWidget(self.combo_field)
         sel_layout.addWidget(self.btn_copy)
         sel_layout.addWidget(self.btn_test)
         sel_layout.addWidget(self.btn_save)
@@ -252,9 +264,12 @@ class VisualSelectorPage(QWidget):
             if not self.selector_window.isVisible():
                 self.selector_window.show()
             self.selector_window.load_url(url)
-            saved = load_selectors().get(urlparse(url).netloc)
+            domain = urlparse(url).netloc
+            saved = load_selectors().get(domain)
             if saved:
                 self.input_selector.setText(saved)
+            field = next(iter(load_field_selectors().get(domain, {})), "")
+            self.combo_field.setCurrentIndex(max(self.combo_field.findData(field), 0))
 
     def copy_selector(self):
         QApplication.clipboard().setText(self.input_selector.text())
@@ -263,7 +278,7 @@ class VisualSelectorPage(QWidget):
         url = self.input_url.text().strip()
         selector = self.input_selector.text().strip()
         if url and selector:
-            save_selector(url, selector)
+            save_selector(url, selector, self.combo_field.currentData() or None)
 
     def _on_window_closed(self) -> None:
         pass
@@ -0,0 +1,334 @@
+"""Durable work queue shared by scraping worker processes.
+
+A coordinator enqueues the ``(id, url)`` pairs of a step
+(:meth:`WorkQueue.enqueue`) into the ``queue_items`` table.  Workers claim
+batches (:meth:`WorkQueue.claim`): a claim is a single ``UPDATE`` that
+leases the items under a fresh token until ``lease_until``, so two
+workers never get the same item.  While a batch is scraped a heartbeat
+thread extends the lease; items are acknowledged one by one as the
+scraper records them in its journal (:class:`QueueJournal`).  The items
+of a worker that died come back when their lease expires, and items
+claimed ``max_attempts`` times without being acknowledged are marked
+failed.
+
+Workers on several machines may share the queue through the database of
+a common ``BASE_DIR``; network filesystems need
+``SQLITE_JOURNAL_MODE = "DELETE"`` since WAL relies on shared memory, and
+the machines' clocks should agree to within a fraction of the lease.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, literal_column, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import config
+from db import SessionLocal
+from db.models import QueueItem
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# Scraper method run for each step, with the same arguments
+STEPS = {
+    "variantes": "scrap_produits_par_ids",
+    "concurrents": "scrap_fiches_concurrents",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now()
+
+
+def worker_id() -> str:
+    """Name of the current process, unique across machines."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Leased queue of scraping items stored in SQLite."""
+
+    def __init__(self, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = max_attempts
+
+    def enqueue(self, step: str, items, reset: bool = False) -> int:
+        """Add ``(item_id, url)`` pairs (or an ``{id: url}`` mapping) to *step*.
+
+        Items already queued keep their status unless *reset*, which puts
+        them back to pending with no attempts.
+        """
+        pairs = items.items() if hasattr(items, "items") else items
+        now = _now()
+        rows = [
+            {"step": step, "item_id": str(i), "url": url, "status": PENDING, "attempts": 0, "updated": now}
+            for i, url in pairs
+        ]
+        if not rows:
+            return 0
+        stmt = sqlite_insert(QueueItem)
+        columns = ["url", "status", "attempts", "updated"] if reset else ["url"]
+        set_ = {col: stmt.excluded[col] for col in columns}
+        if reset:
+            set_.update(worker=None, lease=None, lease_until=None, error=None)
+        stmt = stmt.on_conflict_do_update(index_elements=[QueueItem.step, QueueItem.item_id], set_=set_)
+        with SessionLocal() as session:
+            session.execute(stmt, rows)
+            session.commit()
+        return len(rows)
+
+    def claim(self, step: str, worker: str, limit: int = 20) -> tuple[str, list[tuple[str, str]]]:
+        """Lease up to *limit* items of *step* for *worker*.
+
+        Returns the lease token and the ``(item_id, url)`` pairs, oldest
+        first.  Pending items and items whose lease expired are eligible.
+        """
+        now = _now()
+        token = uuid.uuid4().hex
+        expired = and_(QueueItem.status == LEASED, QueueItem.lease_until < now)
+        exhausted = QueueItem.attempts >= self.max_attempts
+        with SessionLocal() as session:
+            session.execute(
+                update(QueueItem)
+                .where(QueueItem.step == step, expired, exhausted)
+                .values(status=FAILED, error="Bail expiré", lease=None, updated=now)
+            )
+            session.execute(
+                update(QueueItem)
+                .where(QueueItem.step == step, QueueItem.status == PENDING, exhausted)
+                .values(status=FAILED, error="Tentatives épuisées", updated=now)
+            )
+            eligible = (
+                select(QueueItem.item_id)
+                .where(QueueItem.step == step, or_(QueueItem.status == PENDING, expired))
+                .order_by(literal_column("rowid"))
+                .limit(limit)
+            )
+            session.execute(
+                update(QueueItem)
+                .where(QueueItem.step == step, QueueItem.item_id.in_(eligible.scalar_subquery()))
+                .values(
+                    status=LEASED,
+                    worker=worker,
+                    lease=token,
+                    lease_until=now + timedelta(seconds=self.lease_seconds),
+                    attempts=QueueItem.attempts + 1,
+                    updated=now,
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+            rows = session.execute(
+                select(QueueItem.item_id, QueueItem.url)
+                .where(QueueItem.lease == token)
+                .order_by(literal_column("rowid"))
+            ).all()
+        return token, [(row.item_id, row.url) for row in rows]
+
+    def _update_leased(self, token: str, *where, **values) -> int:
+        with SessionLocal() as session:
+            result = session.execute(
+                update(QueueItem)
+                .where(QueueItem.lease == token, QueueItem.status == LEASED, *where)
+                .values(updated=_now(), **values),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+            return result.rowcount
+
+    def heartbeat(self, lease: str) -> int:
+        """Extend the items still held under *lease*; return their number."""
+        return self._update_leased(lease, lease_until=_now() + timedelta(seconds=self.lease_seconds))
+
+    def ack(self, lease: str, step: str, item_id: str, ok: bool = True, error: str | None = None) -> bool:
+        """Mark an item done (or failed); ``False`` if the lease was lost."""
+        return bool(
+            self._update_leased(
+                lease,
+                QueueItem.step == step,
+                QueueItem.item_id == str(item_id),
+                status=DONE if ok else FAILED,
+                error=error,
+                lease=None,
+            )
+        )
+
+    def release(self, lease: str, tried=()) -> int:
+        """Give back the items of *lease* not acknowledged.
+
+        The claim of items never tried is not counted as an attempt; the
+        ids of *tried* keep it, so an item failing on every claim ends up
+        failed.
+        """
+        tried = [str(i) for i in tried]
+        values = {"status": PENDING, "lease": None, "lease_until": None}
+        kept = self._update_leased(lease, QueueItem.item_id.in_(tried), **values) if tried else 0
+        return kept + self._update_leased(lease, attempts=QueueItem.attempts - 1, **values)
+
+    def attempts(self, step: str, item_id: str) -> int:
+        """Number of claims of *item_id* so far, the current one included."""
+        with SessionLocal() as session:
+            item = session.get(QueueItem, (step, str(item_id)))
+            return (item.attempts or 0) if item else 0
+
+    def counts(self, step: str | None = None) -> dict[str, int]:
+        """Number of items by status, for *step* or all steps."""
+        query = select(QueueItem.status, func.count()).group_by(QueueItem.status)
+        if step is not None:
+            query = query.where(QueueItem.step == step)
+        with SessionLocal() as session:
+            return dict(session.execute(query).all())
+
+    @contextmanager
+    def keep_alive(self, lease: str, interval: float | None = None):
+        """Renew *lease* from a background thread while the block runs."""
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat(lease)
+                except Exception as e:  # database busy: try again on next beat
+                    logger.warning("Heartbeat failed for lease %s: %s", lease, e)
+
+        thread = threading.Thread(target=beat, name="queue-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+class QueueJournal:
+    """Checkpoint journal acknowledging queue items as they are recorded.
+
+    Stands in for :class:`storage.CheckpointJournal` while a worker runs a
+    batch: ``done`` and ``error`` records acknowledge the item, retries
+    keep it leased and are remembered in :attr:`tried`.  Earlier claims
+    count as failed attempts for the retry queue.  Resuming is the queue's
+    job, so the rest is a no-op.
+    """
+
+    def __init__(self, queue: WorkQueue, lease: str):
+        self.queue = queue
+        self.lease = lease
+        self.tried: set[str] = set()
+
+    def record(self, step, item_id, status, error=None, output_path=None, error_class=None, next_attempt=None):
+        if status in (DONE, "error"):
+            self.queue.ack(self.lease, step, item_id, ok=status == DONE, error=error)
+            self.tried.discard(str(item_id))
+        else:
+            self.tried.add(str(item_id))
+
+    def flush(self):
+        pass
+
+    def current_step(self):
+        return None
+
+    def begin(self, step, resume=False):
+        pass
+
+    def forget(self, step):
+        pass
+
+    def attempts(self, step, item_id):
+        return max(0, self.queue.attempts(step, item_id) - 1)
+
+    def done_ids(self, step):
+        return set()
+
+    def pending(self, step, ids):
+        return list(ids)
+
+    def clear(self):
+        pass
+
+
+def run_worker(core, queue: WorkQueue, steps=tuple(STEPS), worker: str | None = None, batch_size: int = 20,
+               should_stop=lambda: False, **scrape_kwargs) -> int:
+    """Claim and scrape batches of *steps* until the queue is empty.
+
+    *core* is a scraper (or :class:`scraper_core.ScraperCore`); each batch
+    writes its Excel files under ``queue_outputs`` so workers never
+    overwrite each other.  Returns the number of batches run.
+    """
+    plugin = getattr(core, "_plugin", core)
+    worker = worker or worker_id()
+    out_dir = os.path.join(plugin.base_dir, "queue_outputs")
+    os.makedirs(out_dir, exist_ok=True)
+    saved = plugin.checkpoint, plugin.fichier_excel, plugin.recap_excel_path
+    batches = 0
+    try:
+        # Browsers stay warm from one batch to the next
+        with plugin.shared_browsers():
+            for step in steps:
+                scrape = getattr(plugin, STEPS[step])
+                while not should_stop():
+                    lease, items = queue.claim(step, worker, batch_size)
+                    if not items:
+                        break
+                    batches += 1
+                    journal = plugin.checkpoint = QueueJournal(queue, lease)
+                    plugin.fichier_excel = os.path.join(out_dir, f"woocommerce_mix-{worker}-{batches}.xlsx")
+                    plugin.recap_excel_path = os.path.join(out_dir, f"recap_concurrents-{worker}-{batches}.xlsx")
+                    try:
+                        with queue.keep_alive(lease):
+                            scrape(dict(items), [i for i, _ in items], [], should_stop=should_stop, **scrape_kwargs)
+                    finally:
+                        released = queue.release(lease, journal.tried)
+                    if released == len(items) and not should_stop():
+                        # Nothing acknowledged: the scraper cannot run this step here
+                        logger.error("Worker %s made no progress on %s, skipping the step", worker, step)
+                        break
+    finally:
+        plugin.checkpoint, plugin.fichier_excel, plugin.recap_excel_path = saved
+    return batches
+
+
+def _worker_main(base_dir, steps, batch_size, lease_seconds, scrape_kwargs):
+    from scraper_core import ScraperCore
+
+    core = ScraperCore(
+        base_dir=base_dir,
+        chrome_driver_path=config.CHROME_DRIVER_PATH,
+        chrome_binary_path=config.CHROME_BINARY_PATH,
+    )
+    run_worker(core, WorkQueue(lease_seconds), steps, batch_size=batch_size, **scrape_kwargs)
+
+
+def start_workers(count: int, base_dir, steps=tuple(STEPS), batch_size: int = 20, lease_seconds: float = 120.0,
+                  **scrape_kwargs) -> list:
+    """Start *count* worker processes and return them.
+
+    Processes are spawned so each one opens its own browser and database
+    connections.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(
+            target=_worker_main,
+            args=(base_dir, tuple(steps), batch_size, lease_seconds, scrape_kwargs),
+            name=f"scrape-worker-{n}",
+        )
+        for n in range(count)
+    ]
+    for process in processes:
+        process.start()
+    return processes